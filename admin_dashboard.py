@@ -5,24 +5,53 @@ Admin dashboard maka view and manage records.
 naa diri table view naay search, update, and delete na function.
 """
 from PyQt6.QtWidgets import *
-from PyQt6.QtCore import Qt
-from styles import Styles
-from dialogs import UpdateRecordDialog
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from dialogs import UpdateRecordDialog, ExportDialog, DiagnosticsDialog
+from records_model import ResidentTableModel
+from resident_export import export_residents
+from instrumentation import metrics
 
 
 class AdminDashboard(QWidget):
     """Admin dashboard window for managing resident records"""
 
+    # Milliseconds to wait after the last keystroke before searching
+    SEARCH_DEBOUNCE_MS = 250
+
+    # Milliseconds between checks for records changed by other stations while the dashboard is shown
+    CHANGE_POLL_MS = 3000
+
+    # Rows written so far by a running export; emitted from the export worker's thread
+    export_progress = pyqtSignal(int)
+
     def __init__(self, db_manager, main_window):
         super().__init__()
         self.db_manager = db_manager
         self.main_window = main_window
+        self.db_worker = main_window.db_worker
+        self.export_worker = main_window.export_worker
+        self.diagnostics_dialog = None
         self.setWindowTitle("Admin Dashboard")
-        self.showMaximized()
-        self.setStyleSheet("background-color: #f5f5f5; font-family: 'Segoe UI';")
+        self.setProperty("page", "admin")
         self._setup_ui()
         self.load_table_data()
 
+        # Other stations write to the same file and can't notify us, so poll the changelog
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(self.CHANGE_POLL_MS)
+        self.change_timer.timeout.connect(self.model.sync)
+
+        # Queued onto the GUI thread, since the export runs on its own worker
+        self.export_progress.connect(self._on_export_progress)
+
+    def showEvent(self, event):
+        self.change_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.change_timer.stop()
+        super().hideEvent(event)
+
     def _setup_ui(self):
         """Initialize UI components"""
         layout = QVBoxLayout(self)
@@ -31,36 +60,24 @@ class AdminDashboard(QWidget):
         # Title
         title = QLabel("Registration Records")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 24px;
-            font-weight: bold;
-            color: #0D47A1;
-            margin-bottom: 20px;
-        """)
+        title.setProperty("role", "dashboardTitle")
         layout.addWidget(title)
 
         # Search bar
         search_layout = QHBoxLayout()
         search_label = QLabel("Search:")
-        search_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #333;")
+        search_label.setProperty("role", "searchLabel")
 
         self.search_field = QLineEdit()
-        self.search_field.setPlaceholderText("Search by surname or first name...")
-        self.search_field.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 2px solid #999999;
-                border-radius: 6px;
-                font-size: 13px;
-                background-color: white;
-                min-width: 300px;
-                color: black;  /* Set text color to black */
-            }
-            QLineEdit:focus {
-                border: 2px solid #1976D2;
-            }
-        """)
-        self.search_field.textChanged.connect(self.search_records)
+        self.search_field.setPlaceholderText("Search by name, street, voter's ID or contact number...")
+        self.search_field.setObjectName("searchField")
+        # Keystrokes restart the timer, so only a pause in typing triggers a search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_records)
+        self.search_field.textChanged.connect(self.search_timer.start)
+        self.search_field.returnPressed.connect(self.search_records)
 
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_field)
@@ -77,16 +94,14 @@ class AdminDashboard(QWidget):
 
     def _create_table(self):
         """Create and configure the records table"""
-        table = QTableWidget()
-        table.setColumnCount(17)
-        table.setHorizontalHeaderLabels([
-            "ID", "Surname", "First Name", "Middle Name", "Sex", "Date of Birth",
-            "Age", "Place of Birth", "Civil Status", "Nationality",
-            "Street", "Contact Number", "Email", "Years of Residency",
-            "Voter's ID", "Household Relation", "Emergency Contact"
-        ])
-
-        table.setStyleSheet(Styles.TABLE_STYLE)
+        self.model = ResidentTableModel(self.db_manager, self.db_worker, self)
+        self.model.first_page_loaded.connect(self._on_first_page_loaded)
+        self.model.load_failed.connect(self._show_database_error)
+
+        table = QTableView()
+        table.setModel(self.model)
+
+        table.setObjectName("recordsTable")
         table.setShowGrid(False)
         table.verticalHeader().setVisible(False)
         table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -94,6 +109,8 @@ class AdminDashboard(QWidget):
         table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         table.horizontalHeader().setStretchLastSection(False)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        # Fixed row heights so the view never measures rows it hasn't shown
+        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
         return table
 
@@ -102,149 +119,121 @@ class AdminDashboard(QWidget):
         button_layout = QHBoxLayout()
 
         delete_btn = QPushButton("Delete Record")
-        delete_btn.setStyleSheet(Styles.BUTTON_DANGER + """
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
+        delete_btn.setProperty("variant", "danger")
         delete_btn.clicked.connect(self.delete_record)
 
         update_btn = QPushButton("Update Record")
-        update_btn.setStyleSheet(Styles.BUTTON_WARNING)
+        update_btn.setProperty("variant", "warning")
         update_btn.clicked.connect(self.update_record)
 
         refresh_btn = QPushButton("Refresh Data")
-        refresh_btn.setStyleSheet(Styles.BUTTON_SUCCESS)
+        refresh_btn.setProperty("variant", "success")
         refresh_btn.clicked.connect(self.load_table_data)
 
+        self.export_btn = QPushButton("Export Records")
+        self.export_btn.setProperty("variant", "primary")
+        self.export_btn.clicked.connect(self.export_records)
+
+        diagnostics_btn = QPushButton("Diagnostics")
+        diagnostics_btn.setProperty("variant", "secondary")
+        diagnostics_btn.clicked.connect(self.show_diagnostics)
+
         back_btn = QPushButton("Back to Main Menu")
-        back_btn.setStyleSheet(Styles.BUTTON_SECONDARY)
+        back_btn.setProperty("variant", "secondary")
         back_btn.clicked.connect(self.go_back)
 
         button_layout.addWidget(delete_btn)
         button_layout.addWidget(update_btn)
         button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(self.export_btn)
         button_layout.addStretch()
+        button_layout.addWidget(diagnostics_btn)
         button_layout.addWidget(back_btn)
 
         return button_layout
 
     def _show_message(self, icon, title, text, buttons=QMessageBox.StandardButton.Ok):
         """Helper for styled QMessageBox with black text"""
-        msg = QMessageBox(icon, title, text, buttons, self)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: white;
-            }
-            QLabel {
-                color: black;
-                font-size: 13px;
-            }
-            QPushButton {
-                background-color: #1976D2;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #0D47A1;
-            }
-        """)
+        msg = QMessageBox(self)
+        # Named before the buttons are added, so they are polished with the message box style
+        msg.setObjectName("messageBox")
+        msg.setIcon(icon)
+        msg.setWindowTitle(title)
+        msg.setText(text)
+        msg.setStandardButtons(buttons)
         return msg.exec()
 
     def load_table_data(self):
-        """Load registration records from database into the table"""
-        self.table.setRowCount(0)
+        """Show all registration records; if they are already loaded, only fetch what changed"""
+        self.search_timer.stop()
+        self.search_field.blockSignals(True)
         self.search_field.clear()
-        records = self.db_manager.get_all_records()
-        self._populate_table(records)
+        self.search_field.blockSignals(False)
+        if self.model.search_term == '' and self.model.version is not None:
+            self.model.sync()
+        else:
+            self._show_records('')
 
+    @metrics.measure('ui.admin.search_records')
     def search_records(self):
         """Search and filter records based on search field"""
+        self.search_timer.stop()
         search_term = self.search_field.text().strip()
-        self.table.setRowCount(0)
+        if search_term == self.model.search_term:
+            return
+        if not self.model.refine_search(search_term):
+            self._show_records(search_term)
 
-        if search_term:
-            records = self.db_manager.search_records(search_term)
-        else:
-            records = self.db_manager.get_all_records()
-
-        self._populate_table(records)
-
-    def _populate_table(self, records):
-        """Fill table with record data"""
-        for record in records:
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-
-            self.table.setItem(row_position, 0, QTableWidgetItem(str(record['id'])))
-            self.table.setItem(row_position, 1, QTableWidgetItem(record['surname']))
-            self.table.setItem(row_position, 2, QTableWidgetItem(record['firstname']))
-            self.table.setItem(row_position, 3, QTableWidgetItem(record['middlename']))
-            self.table.setItem(row_position, 4, QTableWidgetItem(record['sex']))
-            self.table.setItem(row_position, 5, QTableWidgetItem(record['dob']))
-            self.table.setItem(row_position, 6, QTableWidgetItem(str(record['age'])))
-            self.table.setItem(row_position, 7, QTableWidgetItem(record['birthplace']))
-            self.table.setItem(row_position, 8, QTableWidgetItem(record['civil_status']))
-            self.table.setItem(row_position, 9, QTableWidgetItem(record['nationality']))
-            self.table.setItem(row_position, 10, QTableWidgetItem(record['street']))
-            self.table.setItem(row_position, 11, QTableWidgetItem(record['contact_number']))
-            self.table.setItem(row_position, 12, QTableWidgetItem(record['email']))
-            self.table.setItem(row_position, 13, QTableWidgetItem(str(record['years_residency'])))
-            self.table.setItem(row_position, 14, QTableWidgetItem(record['voter_id']))
-            self.table.setItem(row_position, 15, QTableWidgetItem(record['household_relation']))
-            self.table.setItem(row_position, 16, QTableWidgetItem(
-                f"{record['emergency_name']} ({record['emergency_relation']}) - {record['emergency_contact']}"
-            ))
+    def _show_records(self, search_term):
+        """Point the table model at a search term; its first page loads in the background"""
+        self.model.set_search_term(search_term)
 
+    @metrics.measure('ui.admin.resize_columns')
+    def _on_first_page_loaded(self):
+        """Size the columns once the first page of records is in"""
         self.table.resizeColumnsToContents()
 
+    def _show_database_error(self, error):
+        """Report a failed background database call"""
+        self._show_message(QMessageBox.Icon.Critical, "Database Error", f"The database request failed:\n{error}")
+
     def delete_record(self):
         """Delete the selected record from database"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
 
         if selected_row < 0:
             self._show_message(QMessageBox.Icon.Warning, "No Selection", "Please select a record to delete.")
             return
 
-        record_id = int(self.table.item(selected_row, 0).text())
-
-        confirm_box = QMessageBox(QMessageBox.Icon.Question,
-                                  "Confirm Delete",
-                                  "Are you sure you want to delete this record?",
-                                  QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                  self)
-        confirm_box.setStyleSheet("""
-            QMessageBox { background-color: white; }
-            QLabel { color: black; font-size: 13px; }
-            QPushButton {
-                background-color: #1976D2;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-            }
-            QPushButton:hover { background-color: #0D47A1; }
-        """)
-        reply = confirm_box.exec()
+        record_id = self.model.record_id(selected_row)
+
+        reply = self._show_message(QMessageBox.Icon.Question, "Confirm Delete",
+                                   "Are you sure you want to delete this record?",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.db_manager.delete_record(record_id)
-            self.load_table_data()
-            self._show_message(QMessageBox.Icon.Information, "Success", "Record deleted successfully!")
+            self.db_worker.submit(self.db_manager.delete_record, record_id,
+                                  on_result=self._on_record_deleted, on_error=self._show_database_error)
+
+    def _on_record_deleted(self, _result):
+        """Drop the deleted record from the table"""
+        self.model.sync()
+        self._show_message(QMessageBox.Icon.Information, "Success", "Record deleted successfully!")
 
     def update_record(self):
         """Update the selected record in database"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
 
         if selected_row < 0:
             self._show_message(QMessageBox.Icon.Warning, "No Selection", "Please select a record to update.")
             return
 
-        record_id = int(self.table.item(selected_row, 0).text())
-        records = self.db_manager.get_all_records()
-        record = next((r for r in records if r['id'] == record_id), None)
+        record_id = self.model.record_id(selected_row)
+        self.db_worker.submit(self.db_manager.get_record, record_id, key='update_lookup',
+                              on_result=self._open_update_dialog, on_error=self._show_database_error)
 
+    def _open_update_dialog(self, record):
+        """Show the update dialog for a record loaded in the background"""
         if not record:
             self._show_message(QMessageBox.Icon.Warning, "Error", "Record not found!")
             return
@@ -252,9 +241,60 @@ class AdminDashboard(QWidget):
         dialog = UpdateRecordDialog(record, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             updated_record = dialog.get_updated_record()
-            self.db_manager.update_record(record_id, updated_record)
-            self.load_table_data()
-            self._show_message(QMessageBox.Icon.Information, "Success", "Record updated successfully!")
+            self.db_worker.submit(self.db_manager.update_record, record['id'], updated_record,
+                                  on_result=self._on_record_updated, on_error=self._show_database_error)
+
+    def _on_record_updated(self, _result):
+        """Show the updated record in the table"""
+        self.model.sync()
+        self._show_message(QMessageBox.Icon.Information, "Success", "Record updated successfully!")
+
+    def export_records(self):
+        """Export the records matching the chosen filters to a file"""
+        dialog = ExportDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        self.export_btn.setEnabled(False)
+        self.export_btn.setText("Exporting...")
+        self.export_worker.submit(export_residents, self.db_manager, dialog.path, **dialog.get_export_options(),
+                                  progress=self.export_progress.emit,
+                                  on_result=lambda count: self._on_records_exported(dialog.path, count),
+                                  on_error=self._on_export_failed)
+
+    def _on_export_progress(self, written):
+        """Show how many rows the running export has written"""
+        if not self.export_btn.isEnabled():
+            self.export_btn.setText(f"Exporting... {written:,} rows")
+
+    def _on_records_exported(self, path, count):
+        """Report a finished export"""
+        self._reset_export_button()
+        self._show_message(QMessageBox.Icon.Information, "Export Complete",
+                           f"Exported {count:,} record(s) to:\n{path}")
+
+    def _on_export_failed(self, error):
+        """Report a failed export"""
+        self._reset_export_button()
+        self._show_message(QMessageBox.Icon.Critical, "Export Failed", f"The export could not be written:\n{error}")
+
+    def _reset_export_button(self):
+        """Make the export button usable again"""
+        self.export_btn.setEnabled(True)
+        self.export_btn.setText("Export Records")
+
+    def show_diagnostics(self):
+        """Open the diagnostics panel beside the dashboard (one per dashboard)"""
+        if self.diagnostics_dialog is None:
+            self.diagnostics_dialog = DiagnosticsDialog(self)
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+        self.diagnostics_dialog.activateWindow()
+
+    def reset(self):
+        """Reload the records when a reused window is shown again"""
+        self.load_table_data()
+        self.table.scrollToTop()
 
     def go_back(self):
         """Return to main window"""
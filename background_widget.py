@@ -0,0 +1,121 @@
+"""
+Background image for the landing page.
+Decodes the image once, off the GUI thread, and paints pre-scaled copies
+kept in QPixmapCache, so repaints and resizes don't rescale the full image.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QImageReader, QPainter, QPixmap, QPixmapCache
+from PyQt6.QtWidgets import QWidget
+
+from instrumentation import metrics
+from startup_trace import tracer
+
+
+class BackgroundWidget(QWidget):
+    """Paints an image stretched to fill the widget.
+
+    While the window is being resized the last smooth copy is stretched
+    with a fast transform; a smooth copy for the new size is made once the
+    size has stopped changing for RESCALE_DELAY_MS.
+    """
+
+    # Quiet time after the last resize before a smooth rescale
+    RESCALE_DELAY_MS = 150
+
+    # QPixmapCache needs room for a few full-screen copies (in KB)
+    CACHE_LIMIT_KB = 32 * 1024
+
+    # Painted until the image has been decoded
+    PLACEHOLDER_COLOR = QColor("#0D47A1")
+
+    def __init__(self, image_path, parent=None, decode_async=True):
+        super().__init__(parent)
+        self.image_path = image_path
+        self._image = None
+        self._pixmap = None
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        if QPixmapCache.cacheLimit() < self.CACHE_LIMIT_KB:
+            QPixmapCache.setCacheLimit(self.CACHE_LIMIT_KB)
+
+        self._rescale_timer = QTimer(self)
+        self._rescale_timer.setSingleShot(True)
+        self._rescale_timer.setInterval(self.RESCALE_DELAY_MS)
+        self._rescale_timer.timeout.connect(self.update)
+
+        if decode_async:
+            decoder = _ImageDecoder(image_path)
+            decoder.signals.decoded.connect(self._set_image)
+            QThreadPool.globalInstance().start(decoder)
+        else:
+            self._set_image(_read_image(image_path))
+
+    def _set_image(self, image):
+        """Start painting a newly decoded image"""
+        if image.isNull():
+            return
+        self._image = image
+        self._pixmap = None
+        self.update()
+
+    def _cache_key(self, size):
+        return f"background:{self.image_path}:{size.width()}x{size.height()}"
+
+    def _scaled_pixmap(self, size):
+        """Return a smooth copy of the image at size, from the cache if possible"""
+        key = self._cache_key(size)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            scaled = self._image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                        Qt.TransformationMode.SmoothTransformation)
+            pixmap = QPixmap.fromImage(scaled)
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def resizeEvent(self, event):
+        """Put off the smooth rescale until resizing pauses"""
+        self._rescale_timer.start()
+        super().resizeEvent(event)
+
+    @metrics.measure('ui.background.paint')
+    def paintEvent(self, event):
+        """Paint the cached copy for this size, or a fast stretch while resizing"""
+        painter = QPainter(self)
+        if self._image is None:
+            painter.fillRect(self.rect(), self.PLACEHOLDER_COLOR)
+            return
+
+        size = self.size()
+        if self._pixmap is not None and self._pixmap.size() == size:
+            painter.drawPixmap(0, 0, self._pixmap)
+        elif self._rescale_timer.isActive() and self._pixmap is not None:
+            painter.drawPixmap(self.rect(), self._pixmap)
+        else:
+            self._pixmap = self._scaled_pixmap(size)
+            painter.drawPixmap(0, 0, self._pixmap)
+
+
+def _read_image(path):
+    """Decode an image file (QImage is safe to use off the GUI thread)"""
+    with tracer.phase("decode background image"):
+        return QImageReader(path).read()
+
+
+class _DecodeSignals(QObject):
+    decoded = pyqtSignal(QImage)
+
+
+class _ImageDecoder(QRunnable):
+    """Decodes an image on the thread pool and emits it from a signals object of its own.
+
+    The widget that asked for the image may be destroyed before decoding
+    finishes; Qt then drops the connection, and nothing touches the widget.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = _DecodeSignals()
+
+    def run(self):
+        self.signals.decoded.emit(_read_image(self.path))
@@ -0,0 +1,152 @@
+"""
+Synthetic resident generator.
+Produces realistic, reproducible resident records for benchmarks: Filipino
+names, the streets and choices offered by the registration form, valid 09
+contact numbers and voter's IDs for adult voters. The same seed always gives
+the same residents.
+
+    python benchmarks/generate_residents.py --rows 100000 residents.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import validators
+from database_manager import DatabaseManager, INSERT_COLUMNS
+from register_window import RegisterWindow
+
+DEFAULT_SEED = 20240601
+
+# Ages and dates of birth are worked out from this day, not today, so a seed
+# gives the same data whenever it is generated
+REFERENCE_DATE = date(2025, 1, 1)
+
+SURNAMES = [
+    "Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Ramos",
+    "Aquino", "Castillo", "Rivera", "Torres", "Flores", "Gonzales", "Lopez", "Perez",
+    "Navarro", "Mercado", "Domingo", "Castro", "Fernandez", "Aguilar", "Pascual", "Soriano",
+    "Salazar", "Valdez", "Gutierrez", "De Leon", "Manalo", "Dizon", "Sarmiento", "Tolentino",
+    "Marquez", "Cabrera", "Lim", "Tan", "Sy", "Ocampo", "Magbanua", "Dimaculangan",
+    "Macaraeg", "Panganiban", "Lacson", "Concepcion", "Evangelista", "Francisco", "Ignacio", "Padilla",
+    "Morales", "Espiritu", "Galang", "Bernardo", "Roxas", "Tuazon", "Cortez", "Buenaventura",
+]
+MALE_NAMES = [
+    "Juan", "Jose", "Mark", "John Paul", "Christian", "Joshua", "Angelo", "Miguel",
+    "Carlo", "Rafael", "Paolo", "Jerome", "Ramon", "Ernesto", "Rodrigo", "Eduardo",
+    "Renato", "Danilo", "Rommel", "Jayson", "Kenneth", "Francis", "Emmanuel", "Nathaniel",
+    "Andres", "Antonio", "Benjie", "Arnel", "Noel", "Rey",
+]
+FEMALE_NAMES = [
+    "Maria", "Ana", "Kristine", "Angelica", "Jasmine", "Mary Joy", "Princess", "Nicole",
+    "Camille", "Patricia", "Rosario", "Teresita", "Luzviminda", "Marites", "Corazon", "Lourdes",
+    "Maricel", "Rowena", "Jocelyn", "Gemma", "Divina", "Erlinda", "Liza", "Shiela",
+    "Andrea", "Bea", "Carmela", "Trisha", "Joanna", "Danica",
+]
+BIRTHPLACES = [
+    "Davao City", "Cebu City", "Manila", "Quezon City", "Cagayan de Oro", "Iloilo City",
+    "General Santos", "Zamboanga City", "Tagum City", "Digos City", "Bacolod City", "Butuan City",
+]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com"]
+# Prefixes of Philippine mobile networks
+MOBILE_PREFIXES = ["0905", "0906", "0915", "0917", "0918", "0919", "0920", "0927", "0939", "0947", "0998", "0999"]
+
+VOTING_AGE = 18
+
+
+def _contact_number(rng):
+    return rng.choice(MOBILE_PREFIXES) + f"{rng.randrange(10 ** 7):07d}"
+
+
+def _voter_id(rng):
+    digits = f"{rng.randrange(10 ** 12):012d}"
+    return f"{digits[:4]}-{digits[4:8]}-{digits[8:]}"
+
+
+def _age(rng):
+    """An age from a young-heavy population pyramid"""
+    return min(int(rng.expovariate(1 / 28)), 100)
+
+
+def generate_residents(count, seed=DEFAULT_SEED):
+    """Yield count residents as tuples in INSERT_COLUMNS order"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        sex = rng.choice(("Male", "Female"))
+        surname = rng.choice(SURNAMES)
+        firstname = rng.choice(MALE_NAMES if sex == "Male" else FEMALE_NAMES)
+        age = _age(rng)
+        dob = REFERENCE_DATE - timedelta(days=age * 365 + rng.randrange(365) + 1)
+        adult = age >= VOTING_AGE
+
+        email = ''
+        if adult and rng.random() < 0.4:
+            email = f"{firstname}.{surname}{rng.randrange(1000)}@{rng.choice(EMAIL_DOMAINS)}"
+            email = email.lower().replace(' ', '')
+
+        record = {
+            'surname': surname,
+            'firstname': firstname,
+            'middlename': rng.choice(SURNAMES) if rng.random() < 0.9 else '',
+            'sex': sex,
+            'dob': dob.strftime("%d/%m/%Y"),
+            'age': age,
+            'birthplace': rng.choice(BIRTHPLACES),
+            'civil_status': rng.choice(RegisterWindow.CIVIL_STATUSES) if adult else "Single",
+            'nationality': "Filipino" if rng.random() < 0.97 else rng.choice(RegisterWindow.NATIONALITIES),
+            'street': rng.choice(RegisterWindow.STREETS),
+            'contact_number': _contact_number(rng) if adult or rng.random() < 0.3 else '',
+            'email': email,
+            'years_residency': rng.randint(0, age),
+            'voter_id': _voter_id(rng) if adult and rng.random() < 0.75 else '',
+            'household_relation': rng.choice(RegisterWindow.HOUSEHOLD_RELATIONS),
+            'emergency_name': f"{rng.choice(FEMALE_NAMES + MALE_NAMES)} {surname}",
+            'emergency_relation': rng.choice(RegisterWindow.EMERGENCY_RELATIONS),
+            'emergency_contact': _contact_number(rng),
+        }
+        yield tuple(record[column] for column in INSERT_COLUMNS)
+
+
+def is_valid(row):
+    """Check a generated row against the registration form's validation rules"""
+    record = dict(zip(INSERT_COLUMNS, row))
+    return not (validators.contact_number_error(record['contact_number'])
+                or validators.contact_number_error(record['emergency_contact'])
+                or validators.email_error(record['email'])
+                or validators.voter_id_error(record['voter_id']))
+
+
+def build_database(path, rows, seed=DEFAULT_SEED):
+    """Create (or add to) a database at path holding rows generated residents"""
+    db_manager = DatabaseManager(path)
+    try:
+        db_manager.add_records(generate_residents(rows, seed), batch_size=10000)
+        db_manager.checkpoint('TRUNCATE')
+    finally:
+        db_manager.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a database of synthetic residents")
+    parser.add_argument('path', help="database file to create")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+
+    start = time.perf_counter()
+    build_database(args.path, args.rows, args.seed)
+    print(f"{args.rows} residents written to {args.path} in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Record memory benchmark.
+Reads every resident of a generated database and reports how much memory
+and time it takes to hold them as Resident records and as the dicts records
+used to be.
+
+    python benchmarks/record_memory.py [--size 100k]
+"""
+import argparse
+import gc
+import json
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from database_manager import RECORD_SELECT, DatabaseManager
+from generate_residents import DEFAULT_SEED
+from resident import Resident
+from suite import SIZES, dataset
+
+
+def as_dicts(rows):
+    """The dicts DatabaseManager built before Resident"""
+    return [dict(zip(Resident.FIELDS, row)) for row in rows]
+
+
+def as_residents(rows):
+    return DatabaseManager._to_records(rows)
+
+
+def measure(convert, rows):
+    """Return (ms to convert, bytes allocated for the records) for one layout"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = convert(rows)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return elapsed_ms, allocated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the memory used by Resident records and dicts")
+    parser.add_argument('--size', default='100k', choices=SIZES)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(dataset(SIZES[args.size], args.seed))
+    rows = conn.execute(f'SELECT {RECORD_SELECT} FROM residents').fetchall()
+    conn.close()
+
+    results = {}
+    for name, convert in (('dict', as_dicts), ('Resident', as_residents)):
+        # Timed without tracemalloc, which slows allocation down
+        start = time.perf_counter()
+        convert(rows)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _, allocated = measure(convert, rows)
+        results[name] = {'convert_ms': round(elapsed_ms, 2), 'bytes': allocated,
+                         'bytes_per_record': round(allocated / len(rows), 1)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{len(rows)} residents (field values shared by both layouts, not counted)")
+        print(f"{'layout':<10}{'convert':>12}{'memory':>12}{'per record':>14}")
+        for name, result in results.items():
+            print(f"{name:<10}{result['convert_ms']:>9.1f} ms{result['bytes'] / 2 ** 20:>9.1f} MB"
+                  f"{result['bytes_per_record']:>12.0f} B")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Cold-start benchmark.
+Launches the application several times with startup tracing on, prints the
+median time of every phase and fails if the landing page takes longer than
+the budget to appear.
+
+    python benchmarks/startup.py [--runs 5] [--budget-ms 1000]
+
+Each run starts a fresh interpreter in a scratch directory holding copies of
+the database and background image, so the real database is never touched.
+Qt runs offscreen unless QT_QPA_PLATFORM is already set.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILES = ("barangay_registration.db", "Borcelle University FINAL_BACKGROUND.png")
+
+BUDGET_ENV = 'BARANGAY_STARTUP_BUDGET_MS'
+DEFAULT_BUDGET_MS = 1000.0
+
+# The phase or mark whose end counts as "started"
+STARTED = "first frame"
+
+
+def run_once(workdir):
+    """Start the app once and return its trace events"""
+    trace_file = os.path.join(workdir, "startup_trace.json")
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), f"--trace-startup={trace_file}", "--exit-after-startup"],
+        cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    with open(trace_file, encoding='utf-8') as file:
+        return json.load(file)['traceEvents']
+
+
+def phase_ends(events):
+    """Map each phase to its duration and each mark to its time since startup, in ms"""
+    return {
+        event['name']: (event['dur'] if event['ph'] == 'X' else event['ts']) / 1000
+        for event in events
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure application cold start")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MS)),
+                        help=f"maximum median time to the first frame (default: ${BUDGET_ENV} or %(default)s)")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = []
+        for _ in range(args.runs):
+            for name in DATA_FILES:
+                shutil.copy(os.path.join(ROOT, name), workdir)
+            runs.append(phase_ends(run_once(workdir)))
+
+    medians = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    started = medians[STARTED]
+    passed = started <= args.budget_ms
+
+    if args.json:
+        print(json.dumps({'runs': args.runs, 'budget_ms': args.budget_ms, 'median_ms': medians, 'passed': passed}, indent=2))
+    else:
+        for name, value in medians.items():
+            print(f"{name:<40} {value:8.1f} ms")
+        print(f"\n{STARTED} after {started:.1f} ms (median of {args.runs}), budget {args.budget_ms:.0f} ms: "
+              f"{'OK' if passed else 'OVER BUDGET'}")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+End-to-end benchmark suite.
+Times database calls (CRUD, search, paging, statistics) and the GUI paths
+built on them (the records table model and view, the statistics window and
+its charts) against generated databases of 1k, 10k, 100k or 1M residents,
+and compares the results with stored baselines.
+
+    python benchmarks/suite.py [--sizes 1k,10k,100k] [--only search]
+    python benchmarks/suite.py --update-baselines
+
+Generated databases are cached in benchmarks/data/. Every size runs on a
+scratch copy, so write benchmarks never change the cache. Qt runs offscreen
+unless QT_QPA_PLATFORM is already set. The run fails when a median is more
+than --tolerance above its baseline; baselines are machine specific, so
+record new ones (--update-baselines) when moving to another machine.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QTableView
+
+import theme
+from database_manager import DatabaseManager, INSERT_COLUMNS
+from generate_residents import DEFAULT_SEED, build_database, generate_residents
+from records_model import ResidentTableModel
+from resident_cache import ResidentColumns
+from statistics_window import BarChartWidget, PieChartWidget
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+DEFAULT_SIZES = ('1k', '10k', '100k')
+
+DATA_DIR = os.path.join(HERE, 'data')
+BASELINE_FILE = os.path.join(HERE, 'baselines.json')
+
+# A median this much above its baseline (0.5 = 50%) is a regression ...
+DEFAULT_TOLERANCE = 0.5
+# ... unless it is also less than this many ms slower, which is noise
+MIN_REGRESSION_MS = 0.5
+
+DEFAULT_REPEAT = 7
+
+SEARCH_TERMS = ("Santos", "dela", "Ruby Street", "0917", "Maria Reyes")
+
+# A statistics window filter that misses the counted table
+STATISTICS_FILTERS = {'street': "Gold Street", 'voter': True, 'min_age': 18}
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark; it is called with a Context and returns the time it measured in ms"""
+    def register(function):
+        BENCHMARKS.append((name, function))
+        return function
+    return register
+
+
+class Context:
+    """What a benchmark works on: a scratch database of a given size and the Qt application"""
+
+    def __init__(self, app, db_manager, rows, seed):
+        self.app = app
+        self.db_manager = db_manager
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self._new_rows = generate_residents(10 ** 9, seed + 1)
+
+    def new_records(self, count):
+        """Residents that aren't in the database yet, as dicts"""
+        return [dict(zip(INSERT_COLUMNS, next(self._new_rows))) for _ in range(count)]
+
+    def random_ids(self, count):
+        return [self.rng.randint(1, self.rows) for _ in range(count)]
+
+
+def timed_ms(function, *args, **kwargs):
+    """Run function once and return (elapsed ms, result)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def per_call_ms(function, calls):
+    """Mean ms per call over a list of argument tuples"""
+    start = time.perf_counter()
+    for args in calls:
+        function(*args)
+    return (time.perf_counter() - start) * 1000 / len(calls)
+
+
+# Database
+
+# Reads of the whole table run first, before the write benchmarks add rows
+@benchmark('db.get_all_records')
+def bench_get_all_records(ctx):
+    """Read every resident into memory"""
+    return timed_ms(ctx.db_manager.get_all_records)[0]
+
+
+@benchmark('db.get_records_1000')
+def bench_get_records(ctx):
+    return timed_ms(ctx.db_manager.get_records, ctx.random_ids(1000))[0]
+
+
+@benchmark('db.add_record')
+def bench_add_record(ctx):
+    return per_call_ms(ctx.db_manager.add_record, [(record,) for record in ctx.new_records(50)])
+
+
+@benchmark('db.add_records_1000')
+def bench_add_records(ctx):
+    records = ctx.new_records(1000)
+    return timed_ms(ctx.db_manager.add_records, records)[0]
+
+
+@benchmark('db.get_record')
+def bench_get_record(ctx):
+    return per_call_ms(ctx.db_manager.get_record, [(record_id,) for record_id in ctx.random_ids(200)])
+
+
+@benchmark('db.update_record')
+def bench_update_record(ctx):
+    calls = list(zip(ctx.random_ids(50), ctx.new_records(50)))
+    return per_call_ms(ctx.db_manager.update_record, calls)
+
+
+@benchmark('db.delete_record')
+def bench_delete_record(ctx):
+    # Deletes what it adds, so repeated runs don't run out of rows
+    ids = [ctx.db_manager.add_record(record) for record in ctx.new_records(50)]
+    return per_call_ms(ctx.db_manager.delete_record, [(record_id,) for record_id in ids])
+
+
+@benchmark('db.get_changes')
+def bench_get_changes(ctx):
+    """Catch up with the last 100 changes, as an open records view does"""
+    version = max(0, ctx.db_manager.data_version() - 100)
+    return timed_ms(ctx.db_manager.get_changes, version)[0]
+
+
+@benchmark('db.search_records')
+def bench_search_records(ctx):
+    """First page of a search nobody ran before (the kept search results are dropped first)"""
+    page_size = ResidentTableModel.PAGE_SIZE
+
+    def search(term):
+        ctx.db_manager._search_cache.clear()
+        return ctx.db_manager.search_records(term, page_size)
+    return per_call_ms(search, [(term,) for term in SEARCH_TERMS])
+
+
+@benchmark('db.search_records_page_5')
+def bench_search_records_page_5(ctx):
+    """A later page of a search, as the records view fetches while scrolling"""
+    page_size = ResidentTableModel.PAGE_SIZE
+    calls = [(term, page_size, 4 * page_size) for term in SEARCH_TERMS]
+    return per_call_ms(ctx.db_manager.search_records, calls)
+
+
+@benchmark('db.page_first')
+def bench_page_first(ctx):
+    return timed_ms(ctx.db_manager.page, limit=ResidentTableModel.PAGE_SIZE)[0]
+
+
+@benchmark('db.get_statistics')
+def bench_get_statistics(ctx):
+    return timed_ms(ctx.db_manager.get_statistics)[0]
+
+
+@benchmark('db.filtered_statistics')
+def bench_filtered_statistics(ctx):
+    return timed_ms(ctx.db_manager.get_statistics, **STATISTICS_FILTERS)[0]
+
+
+@benchmark('db.crosstab')
+def bench_crosstab(ctx):
+    return timed_ms(ctx.db_manager.get_crosstab, 'street', 'age_group', voter=True)[0]
+
+
+@benchmark('db.load_columns')
+def bench_load_columns(ctx):
+    return timed_ms(ResidentColumns.load, ctx.db_manager.connection())[0]
+
+
+# The same queries over the column cache; it stays on for the rest of the run
+@benchmark('db.filtered_statistics_cached')
+def bench_filtered_statistics_cached(ctx):
+    ctx.db_manager.column_cache = True
+    ctx.db_manager.resident_columns(wait=True)
+    return timed_ms(ctx.db_manager.get_statistics, **STATISTICS_FILTERS)[0]
+
+
+@benchmark('db.crosstab_cached')
+def bench_crosstab_cached(ctx):
+    ctx.db_manager.column_cache = True
+    ctx.db_manager.resident_columns(wait=True)
+    return timed_ms(ctx.db_manager.get_crosstab, 'street', 'age_group', voter=True)[0]
+
+
+# GUI
+
+@benchmark('gui.records_model_2000_rows')
+def bench_records_model(ctx):
+    """Fill the admin table model with its first ten pages"""
+    def populate():
+        model = ResidentTableModel(ctx.db_manager)
+        model.set_search_term('')
+        for _ in range(9):
+            model.fetchMore()
+        return model
+    return timed_ms(populate)[0]
+
+
+@benchmark('gui.records_model_search')
+def bench_records_model_search(ctx):
+    model = ResidentTableModel(ctx.db_manager)
+
+    def search(term):
+        ctx.db_manager._search_cache.clear()
+        model.set_search_term(term)
+    return per_call_ms(search, [(term,) for term in SEARCH_TERMS])
+
+
+@benchmark('gui.records_table_paint')
+def bench_records_table_paint(ctx):
+    """Size the columns and paint a full-screen records table"""
+    model = ResidentTableModel(ctx.db_manager)
+    model.set_search_term('')
+    table = QTableView()
+    table.setObjectName("recordsTable")
+    table.setModel(model)
+    table.resize(1280, 800)
+
+    def paint():
+        table.resizeColumnsToContents()
+        return table.grab()
+    return timed_ms(paint)[0]
+
+
+@benchmark('gui.statistics_load')
+def bench_statistics_load(ctx):
+    """Query the statistics and draw both charts, as the statistics window does"""
+    pie, bar = PieChartWidget(), BarChartWidget()
+    pie.resize(600, 500)
+    bar.resize(600, 500)
+
+    def load():
+        stats = ctx.db_manager.get_statistics()
+        pie.set_data(stats['sex'].get('Male', 0), stats['sex'].get('Female', 0))
+        bar.set_data(stats['age_groups'])
+        pie.grab()
+        bar.grab()
+    return timed_ms(load)[0]
+
+
+@benchmark('gui.chart_paint')
+def bench_chart_paint(ctx):
+    stats = ctx.db_manager.get_statistics()
+    pie, bar = PieChartWidget(), BarChartWidget()
+    pie.set_data(stats['sex'].get('Male', 0), stats['sex'].get('Female', 0))
+    bar.set_data(stats['age_groups'])
+    pie.resize(600, 500)
+    bar.resize(600, 500)
+    return timed_ms(lambda: (pie.grab(), bar.grab()))[0]
+
+
+def dataset(rows, seed):
+    """Return the cached database with rows generated residents, generating it if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"residents-{rows}-{seed}.db")
+    if not os.path.exists(path):
+        print(f"generating {rows} residents...", file=sys.stderr)
+        partial = path + '.part'
+        if os.path.exists(partial):
+            os.remove(partial)
+        build_database(partial, rows, seed)
+        os.replace(partial, path)
+    return path
+
+
+def run_size(app, size, rows, seed, patterns, repeat):
+    """Run the selected benchmarks on one database size; returns {name: median ms}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "residents.db")
+        shutil.copy(dataset(rows, seed), db_path)
+        db_manager = DatabaseManager(db_path)
+        ctx = Context(app, db_manager, rows, seed)
+        try:
+            for name, function in BENCHMARKS:
+                if patterns and not any(fnmatch.fnmatch(name, f"*{pattern}*") for pattern in patterns):
+                    continue
+                function(ctx)  # warm-up: caches, imports, lazily built statements
+                samples = [function(ctx) for _ in range(repeat)]
+                results[name] = statistics.median(samples)
+        finally:
+            db_manager.close()
+    return results
+
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(results, path=BASELINE_FILE):
+    """Merge results into the baseline file"""
+    baselines = load_baselines(path)
+    for size, timings in results.items():
+        baselines.setdefault(size, {}).update({name: round(ms, 3) for name, ms in timings.items()})
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def compare(results, baselines, tolerance):
+    """Yield (size, name, median, baseline, regressed) for every result"""
+    for size, timings in results.items():
+        for name, median in timings.items():
+            baseline = baselines.get(size, {}).get(name)
+            regressed = (baseline is not None and median > baseline * (1 + tolerance)
+                         and median - baseline > MIN_REGRESSION_MS)
+            yield size, name, median, baseline, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f"comma-separated database sizes out of {', '.join(SIZES)} (default: %(default)s)")
+    parser.add_argument('--only', action='append', default=[], metavar='PATTERN',
+                        help="run only benchmarks whose name contains PATTERN (repeatable)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline, as a fraction (default: %(default)s)")
+    parser.add_argument('--baselines', default=BASELINE_FILE)
+    parser.add_argument('--update-baselines', action='store_true',
+                        help="store this run's medians as the new baselines instead of comparing")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip().lower() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    app = QApplication(sys.argv[:1])
+    theme.apply(app)
+
+    results = {size: run_size(app, size, SIZES[size], args.seed, args.only, args.repeat) for size in sizes}
+
+    if args.update_baselines:
+        save_baselines(results, args.baselines)
+        print(f"baselines written to {args.baselines}")
+        return 0
+
+    rows = list(compare(results, load_baselines(args.baselines), args.tolerance))
+    regressions = [row for row in rows if row[4]]
+
+    if args.json:
+        print(json.dumps([
+            {'size': size, 'name': name, 'median_ms': median, 'baseline_ms': baseline, 'regressed': regressed}
+            for size, name, median, baseline, regressed in rows
+        ], indent=2))
+    else:
+        print(f"{'size':<6}{'benchmark':<30}{'median':>11}{'baseline':>11}{'change':>9}")
+        for size, name, median, baseline, regressed in rows:
+            if baseline is None:
+                line = f"{size:<6}{name:<30}{median:>8.2f} ms{'-':>11}{'':>9}"
+            else:
+                change = (median / baseline - 1) * 100 if baseline else 0.0
+                line = f"{size:<6}{name:<30}{median:>8.2f} ms{baseline:>8.2f} ms{change:>+8.0f}%"
+            print(line + ("  REGRESSION" if regressed else ""))
+        print(f"\n{len(regressions)} regression(s), tolerance {args.tolerance:.0%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
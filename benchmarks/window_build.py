@@ -0,0 +1,98 @@
+"""
+Screen build benchmark.
+Builds every screen opened from the main window several times and prints the
+median time to construct it and to show it for the first time (which is when
+Qt applies the stylesheet to its widgets).
+
+    python benchmarks/window_build.py [--runs 10]
+
+Runs against a copy of the database in a scratch directory, offscreen unless
+QT_QPA_PLATFORM is already set.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+import theme
+from database_manager import DatabaseManager
+from db_worker import DatabaseWorker
+from main_window import MainWindow
+from window_manager import WindowManager
+
+
+def build_times(app, db_manager, main_window, name, runs, windows):
+    """Return (construct, first show) times in ms for each run of one screen.
+
+    The windows built are added to windows, which the caller keeps until the
+    database worker has stopped so no background load lands on a deleted window.
+    """
+    # The first build also pays for importing the screen's module
+    warm = WindowManager(db_manager, main_window).window(name)
+    windows.append(warm)
+    window_class = warm.__class__
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        window = window_class(db_manager, main_window)
+        built = time.perf_counter()
+        window.show()
+        app.processEvents()
+        shown = time.perf_counter()
+        results.append(((built - start) * 1000, (shown - built) * 1000))
+        window.close()
+        windows.append(window)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how long each screen takes to build")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    theme.apply(app)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "barangay_registration.db")
+        shutil.copy(os.path.join(ROOT, "barangay_registration.db"), db_path)
+        db_manager = DatabaseManager(db_path)
+        db_worker = DatabaseWorker(db_manager)
+        db_worker.start()
+        main_window = MainWindow(db_manager, db_worker)
+
+        results = {}
+        windows = []
+        for name in WindowManager.SCREENS:
+            times = build_times(app, db_manager, main_window, name, args.runs, windows)
+            results[name] = {
+                'construct_ms': statistics.median(construct for construct, _ in times),
+                'first_show_ms': statistics.median(show for _, show in times),
+            }
+
+        db_worker.stop()
+        db_manager.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'screen':<12}{'construct':>12}{'first show':>12}")
+        for name, result in results.items():
+            print(f"{name:<12}{result['construct_ms']:>10.1f} ms{result['first_show_ms']:>9.1f} ms")
+        print(f"\nmedian of {args.runs} runs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Command-line interface for batch jobs on the registry.
+Works on the database without starting the GUI, so it never imports Qt.
+Every command prints its result as JSON on stdout.
+
+    python cli.py stats
+    python cli.py import residents.csv
+    python cli.py export voters.csv.gz --street "Gold Street" --voters
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from database_manager import DatabaseManager
+
+
+def cmd_import(db_manager, args):
+    """Import residents from a CSV file"""
+    from resident_import import import_csv
+
+    summary = import_csv(db_manager, args.file, rejects_path=args.rejects, batch_size=args.batch_size)
+    return summary, 0
+
+
+def cmd_export(db_manager, args):
+    """Export residents to CSV or JSON Lines"""
+    from resident_export import export_residents
+
+    filters = {
+        name: getattr(args, name)
+        for name in ('street', 'sex', 'min_age', 'max_age', 'voter')
+        if getattr(args, name) is not None
+    }
+    count = export_residents(db_manager, args.file, fmt=args.format, compress=args.gzip or None, **filters)
+    return {'file': args.file, 'exported': count}, 0
+
+
+def cmd_stats(db_manager, args):
+    """Print statistics, optionally checking or rebuilding the counters first"""
+    result = {}
+    if args.rebuild:
+        drift = db_manager.rebuild_statistics()
+        result['corrected'] = [_drift_entry(entry) for entry in drift]
+    elif args.verify:
+        drift = db_manager.verify_statistics()
+        result['drift'] = [_drift_entry(entry) for entry in drift]
+    result['statistics'] = db_manager.get_statistics()
+    return result, 1 if result.get('drift') else 0
+
+
+def _drift_entry(entry):
+    """Turn a verify_statistics() tuple into a JSON object"""
+    dimension, value, stored, actual = entry
+    return {'dimension': dimension, 'value': value, 'stored': stored, 'actual': actual}
+
+
+def cmd_search(db_manager, args):
+    """Search residents, best matches first"""
+    records = db_manager.search_records(args.term, limit=args.limit)
+    return {'count': len(records), 'records': [record.copy() for record in records]}, 0
+
+
+def cmd_vacuum(db_manager, args):
+    """Compact the database file"""
+    return {'reclaimed_bytes': db_manager.vacuum()}, 0
+
+
+def cmd_backup(db_manager, args):
+    """Write a consistent copy of the database"""
+    db_manager.backup(args.file)
+    return {'backup': args.file}, 0
+
+
+def cmd_integrity_check(db_manager, args):
+    """Check the database, full-text index and statistics counters"""
+    problems = db_manager.integrity_check()
+    problems += [
+        f"resident_counts: {dimension}={value!r} stored {stored}, actual {actual}"
+        for dimension, value, stored, actual in db_manager.verify_statistics()
+    ]
+    return {'ok': not problems, 'problems': problems}, 1 if problems else 0
+
+
+def build_parser():
+    """Create the argument parser with one subcommand per operation"""
+    parser = argparse.ArgumentParser(description="Barangay registration batch operations")
+    parser.add_argument('--db', default="barangay_registration.db", help="database file (default: %(default)s)")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subcommands.add_parser('import', help="import residents from a CSV file")
+    import_parser.add_argument('file')
+    import_parser.add_argument('--rejects', help="where to write rejected rows (default: <file>.rejects.csv)")
+    import_parser.add_argument('--batch-size', type=int, default=5000, help="rows per transaction")
+    # The only command that may start a new database; the others need an existing one
+    import_parser.set_defaults(handler=cmd_import, creates_db=True)
+
+    export_parser = subcommands.add_parser('export', help="export residents to CSV or JSON Lines")
+    export_parser.add_argument('file', help="output file; .csv, .jsonl, optionally ending in .gz")
+    export_parser.add_argument('--format', choices=('csv', 'jsonl'), help="default: from the file name")
+    export_parser.add_argument('--gzip', action='store_true', help="compress (default: when the file ends in .gz)")
+    export_parser.add_argument('--street')
+    export_parser.add_argument('--sex', choices=('Male', 'Female'))
+    export_parser.add_argument('--min-age', type=int)
+    export_parser.add_argument('--max-age', type=int)
+    voter = export_parser.add_mutually_exclusive_group()
+    voter.add_argument('--voters', dest='voter', action='store_const', const=True, help="only residents with a voter's ID")
+    voter.add_argument('--non-voters', dest='voter', action='store_const', const=False, help="only residents without one")
+    export_parser.set_defaults(handler=cmd_export)
+
+    stats_parser = subcommands.add_parser('stats', help="print resident statistics")
+    check = stats_parser.add_mutually_exclusive_group()
+    check.add_argument('--verify', action='store_true', help="report counter drift (exit status 1 if any)")
+    check.add_argument('--rebuild', action='store_true', help="recompute the counters")
+    stats_parser.set_defaults(handler=cmd_stats)
+
+    search_parser = subcommands.add_parser('search', help="search residents")
+    search_parser.add_argument('term')
+    search_parser.add_argument('--limit', type=int, default=50)
+    search_parser.set_defaults(handler=cmd_search)
+
+    vacuum_parser = subcommands.add_parser('vacuum', help="compact the database file")
+    vacuum_parser.set_defaults(handler=cmd_vacuum)
+
+    backup_parser = subcommands.add_parser('backup', help="copy the database while it is in use")
+    backup_parser.add_argument('file')
+    backup_parser.set_defaults(handler=cmd_backup)
+
+    check_parser = subcommands.add_parser('integrity-check', help="check for corruption (exit status 1 if any)")
+    check_parser.set_defaults(handler=cmd_integrity_check)
+
+    return parser
+
+
+def main(argv=None):
+    """Run one command and return the process exit status"""
+    args = build_parser().parse_args(argv)
+
+    if not getattr(args, 'creates_db', False) and not os.path.isfile(args.db):
+        print(json.dumps({'error': f"database file not found: {args.db}"}), file=sys.stderr)
+        return 1
+
+    try:
+        db_manager = DatabaseManager(args.db)
+    except sqlite3.Error as error:
+        print(json.dumps({'error': str(error)}), file=sys.stderr)
+        return 1
+
+    try:
+        result, status = args.handler(db_manager, args)
+    except (OSError, ValueError, sqlite3.Error) as error:
+        print(json.dumps({'error': str(error)}), file=sys.stderr)
+        return 1
+    finally:
+        db_manager.close()
+
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
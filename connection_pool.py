@@ -0,0 +1,124 @@
+"""
+Connection pooling for the SQLite database.
+Keeps connections open for reuse so queries don't reopen the file every time.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Applied once to every new connection; override per pool with the pragmas argument.
+# WAL lets the admin station read while the kiosks insert, and NORMAL sync is
+# still crash-safe in WAL mode (only the last commits can roll back on power loss).
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds to wait on a locked database
+    'cache_size': -8000,  # negative = KiB, so roughly 8 MB of page cache
+    'mmap_size': 67108864,  # 64 MB of memory-mapped reads
+    'temp_store': 'MEMORY',
+}
+
+
+class ConnectionPool:
+    """Hands out long-lived SQLite connections.
+
+    Each thread that calls connection() gets its own connection that stays
+    open until close_all(). Short-lived worker threads should use acquire()
+    instead, which borrows from a small bounded pool and returns the
+    connection when the block exits. Functions in connect_hooks are called
+    with every new connection once its PRAGMAs are applied.
+    """
+
+    def __init__(self, db_name, max_size=4, pragmas=None, timeout=5.0):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+
+        self._local = threading.local()
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._all_connections = []
+        self._pooled_count = 0
+        self._closed = False
+        self.connect_hooks = []
+
+    def _open(self):
+        """Open a new connection and apply the configured PRAGMAs"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        for hook in self.connect_hooks:
+            hook(conn)
+
+        with self._lock:
+            self._all_connections.append(conn)
+        return conn
+
+    def connection(self):
+        """Return the calling thread's long-lived connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection from the bounded pool for the duration of a block"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._pooled_count < self.max_size
+                if can_open:
+                    self._pooled_count += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._pooled_count -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("Timed out waiting for a pooled connection")
+
+        try:
+            yield conn
+        finally:
+            if not self._closed:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+
+    def close_all(self):
+        """Close every connection opened by this pool"""
+        with self._lock:
+            self._closed = True
+            connections, self._all_connections = self._all_connections, []
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        self._local = threading.local()
@@ -2,163 +2,1035 @@
 Database management module for barangay registration system.
 naa diri mahitabo ang crud dunction
 """
+import itertools
+import logging
+import random
+import re
 import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import migrations
+from connection_pool import ConnectionPool
+from instrumentation import metrics
+from resident import Resident
+
+logger = logging.getLogger(__name__)
+
+# Writes that still hit a lock after busy_timeout are retried with jittered backoff
+WRITE_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+# Columns covered by the residents_fts full-text index, in index order
+SEARCH_COLUMNS = ('surname', 'firstname', 'middlename', 'street', 'voter_id', 'contact_number')
+
+# bm25 column weights for residents_fts: surname, firstname, middlename,
+# street, voter_id, contact_number (name matches rank first)
+SEARCH_WEIGHTS = (10.0, 10.0, 5.0, 1.0, 2.0, 2.0)
+
+# Searches with at most this many matches are ranked by bm25; scoring costs a
+# few microseconds per match, so broader ones are listed newest first instead
+RANKED_SEARCH_MAX = 500
+
+# Searches whose ordered ids are kept, so later pages aren't matched or ranked again
+SEARCH_CACHE_SIZE = 16
+
+# Columns of the residents table in SELECT * order
+COLUMNS = Resident.FIELDS + ('created_at',)
+
+# SELECT list of the columns a full record carries, plain and qualified for joins
+RECORD_SELECT = ', '.join(Resident.FIELDS)
+RESIDENT_RECORD_SELECT = ', '.join(f'residents.{column}' for column in Resident.FIELDS)
+
+# Columns page() can order by; each has an index and id breaks ties
+PAGE_ORDER_COLUMNS = ('id', 'surname', 'firstname', 'voter_id', 'street', 'sex', 'age', 'created_at')
+NOCASE_COLUMNS = ('surname', 'firstname')
+
+# Columns an INSERT supplies (everything but id and created_at), in table order
+INSERT_COLUMNS = COLUMNS[1:-1]
+
+# Rows per transaction for add_records()
+BULK_BATCH_SIZE = 1000
+
+# add_records() batches at least this big are full-text indexed in one
+# statement instead of row by row through the insert trigger
+FULLTEXT_BULK_ROWS = 100
+
+# get_records() switches from an IN (...) list to a temp table above this many ids
+MAX_IN_LIST_IDS = 500
+
+# Upper bounds of the statistics age groups; anyone older lands in a final open group
+AGE_GROUP_EDGES = (17, 30, 45, 60)
+
+# What get_crosstab() can count residents by
+CROSSTAB_COLUMNS = ('sex', 'street', 'civil_status', 'age_group')
+
+# Seconds between passive WAL checkpoints triggered by writes
+CHECKPOINT_INTERVAL = 30.0
+
+# changes_since() lists at most this many changes; past that, reloading is cheaper
+MAX_CHANGES = 5000
+
+# Newest resident_changes entries kept when the changelog is pruned
+CHANGELOG_KEEP = 20000
+
+# Changelog entries written between prunes, so the table stays near CHANGELOG_KEEP
+CHANGELOG_PRUNE_INTERVAL = 5000
+
+# add_records() batches of at least this many rows are logged as one 'bulk'
+# changelog entry, which tells readers to reload, instead of one per row
+CHANGELOG_BULK_ROWS = 1000
 
 
 class DatabaseManager:
     """Handles all database operations"""
 
-    def __init__(self, db_name="barangay_registration.db"):
+    def __init__(self, db_name="barangay_registration.db", pool_size=4, pragmas=None,
+                 write_retries=WRITE_RETRIES, checkpoint_interval=CHECKPOINT_INTERVAL, column_cache=False):
         self.db_name = db_name
+        self.pool = ConnectionPool(db_name, max_size=pool_size, pragmas=pragmas)
+        # Lets the diagnostics see each connection's SQL while metrics are being recorded
+        self.pool.connect_hooks.append(lambda conn: metrics.watch(conn, db_name))
+        self.write_retries = write_retries
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_lock = threading.Lock()
+        # Data version the changelog was last pruned at; None until the first write, which prunes
+        self._pruned_version = None
         self.init_database()
+        self.has_fulltext = self._table_exists('residents_fts')
+        self.has_resident_counts = self._table_exists('resident_counts')
+        # FTS5 query -> (data version, ordered ids, whether they are all the matches)
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # Columnar copy of the residents for filtered statistics, loaded on a thread of
+        # its own on first use and brought up to date from the changelog before every use
+        self.column_cache = column_cache
+        self._columns = None
+        self._columns_version = 0
+        self._columns_lock = threading.Lock()
+        self._columns_loader = None
+        self._columns_connection = None
+        self._closing = False
+
+    def connection(self):
+        """Return the calling thread's long-lived connection"""
+        return self.pool.connection()
+
+    def close(self):
+        """Close all pooled connections (called when the application quits)"""
+        self._closing = True
+        loader = self._columns_loader
+        if loader is not None:
+            connection = self._columns_connection
+            if connection is not None:
+                connection.interrupt()
+            loader.join()
+        try:
+            self.checkpoint('TRUNCATE')
+        except sqlite3.Error:
+            pass
+        self.pool.close_all()
+
+    @metrics.measure('db.checkpoint')
+    def checkpoint(self, mode='PASSIVE'):
+        """Copy WAL frames back into the database file"""
+        self._last_checkpoint = time.monotonic()
+        return self.connection().execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+
+    @metrics.measure('db.vacuum')
+    def vacuum(self):
+        """Rebuild the database file to reclaim free space, returning the bytes saved"""
+        conn = self.connection()
+        before = self._file_size(conn)
+        conn.execute('VACUUM')
+        self.checkpoint('TRUNCATE')
+        return before - self._file_size(conn)
+
+    @staticmethod
+    def _file_size(conn):
+        """Return the size of the main database in bytes"""
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        return page_count * page_size
+
+    @metrics.measure('db.backup')
+    def backup(self, path):
+        """Copy the database to path with SQLite's online backup API.
+
+        Safe while other stations are using the database; the copy is a
+        consistent snapshot in rollback-journal mode, ready to open or archive.
+        """
+        target = sqlite3.connect(path)
+        try:
+            self.connection().backup(target)
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+
+    @metrics.measure('db.integrity_check')
+    def integrity_check(self):
+        """Check the database file and the full-text index for corruption.
+
+        Returns a list of problem descriptions; an empty list means healthy.
+        """
+        conn = self.connection()
+        problems = [row[0] for row in conn.execute('PRAGMA integrity_check') if row[0] != 'ok']
+
+        if self.has_fulltext:
+            try:
+                self._run_write(lambda conn: conn.execute(
+                    "INSERT INTO residents_fts (residents_fts, rank) VALUES ('integrity-check', 1)"
+                ))
+            except sqlite3.DatabaseError as error:
+                problems.append(f"residents_fts: {error}")
+
+        return problems
+
+    def _run_write(self, work):
+        """Run work(conn) in an IMMEDIATE transaction, retrying while the database is locked"""
+        conn = self.connection()
+
+        for attempt in range(self.write_retries + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    result = work(conn)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                break
+            except sqlite3.OperationalError as error:
+                if not self._is_locked_error(error) or attempt == self.write_retries:
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+
+        self._maybe_prune_changes(conn)
+        self._maybe_checkpoint()
+        return result
+
+    def _maybe_checkpoint(self):
+        """Run a passive checkpoint if the interval has elapsed since the last one"""
+        if time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+            return
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            self.checkpoint('PASSIVE')
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            self._checkpoint_lock.release()
+
+    def _maybe_prune_changes(self, conn):
+        """Prune the changelog once CHANGELOG_PRUNE_INTERVAL entries were written since the last prune"""
+        try:
+            version = self._data_version(conn)
+            if self._pruned_version is not None and version - self._pruned_version < CHANGELOG_PRUNE_INTERVAL:
+                return
+            # Set first: prune_changes() is a write too and comes back through here
+            self._pruned_version = version
+            self.prune_changes()
+        except sqlite3.OperationalError:
+            pass
+
+    @staticmethod
+    def _is_locked_error(error):
+        """Check whether an OperationalError is a transient lock/busy error"""
+        message = str(error).lower()
+        return 'locked' in message or 'busy' in message
 
     def init_database(self):
-        """Create the database and tables if they don't exist"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS residents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                surname TEXT NOT NULL,
-                firstname TEXT NOT NULL,
-                middlename TEXT,
-                sex TEXT,
-                dob TEXT,
-                age INTEGER,
-                birthplace TEXT,
-                civil_status TEXT,
-                nationality TEXT,
-                street TEXT,
-                contact_number TEXT,
-                email TEXT,
-                years_residency INTEGER,
-                voter_id TEXT,
-                household_relation TEXT,
-                emergency_name TEXT,
-                emergency_relation TEXT,
-                emergency_contact TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        """Create the database and bring its schema up to date"""
+        migrations.migrate(self.connection())
 
-        conn.commit()
-        conn.close()
+    def _table_exists(self, name):
+        """Check whether a table (or virtual table) exists in the database"""
+        row = self.connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone()
+        return row is not None
 
+    @metrics.measure('db.add_record')
     def add_record(self, record):
         """Insert a new record into the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO residents (
-                surname, firstname, middlename, sex, dob, age, birthplace,
-                civil_status, nationality, street, contact_number, email,
-                years_residency, voter_id, household_relation, emergency_name,
-                emergency_relation, emergency_contact
+        def insert(conn):
+            return conn.execute('''
+                INSERT INTO residents (
+                    surname, firstname, middlename, sex, dob, age, birthplace,
+                    civil_status, nationality, street, contact_number, email,
+                    years_residency, voter_id, household_relation, emergency_name,
+                    emergency_relation, emergency_contact
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                record['surname'], record['firstname'], record['middlename'],
+                record['sex'], record['dob'], record['age'], record['birthplace'],
+                record['civil_status'], record['nationality'], record['street'],
+                record['contact_number'], record['email'], record['years_residency'],
+                record['voter_id'], record['household_relation'], record['emergency_name'],
+                record['emergency_relation'], record['emergency_contact']
+            )).lastrowid
+
+        return self._run_write(insert)
+
+    @metrics.measure('db.add_records')
+    def add_records(self, records, batch_size=BULK_BATCH_SIZE, progress=None):
+        """Insert many records, batch_size rows per transaction.
+
+        records can be any iterable of dicts (as taken by add_record) or of
+        tuples in INSERT_COLUMNS order; it is consumed one batch at a time.
+        A batch that violates a constraint or holds a malformed record (a
+        dict missing a column, a tuple of the wrong length) is rolled back
+        on its own and the remaining batches still go in. progress(inserted, failed), if given,
+        is called with running row counts after every batch.
+
+        Returns a dict with the number of rows inserted, the inserted id
+        ranges as (first_id, last_id) pairs, and the failed batches as
+        (index of first row, row count, error message).
+        """
+        placeholders = ', '.join('?' * len(INSERT_COLUMNS))
+        insert_sql = f"INSERT INTO residents ({', '.join(INSERT_COLUMNS)}) VALUES ({placeholders})"
+        result = {'inserted': 0, 'id_ranges': [], 'failed_batches': []}
+        failed = 0
+        start = 0
+
+        def insert_batch(conn, rows):
+            # The IMMEDIATE transaction keeps other writers out, so the new ids are contiguous
+            before = self._last_assigned_id(conn)
+            change_trigger = None
+            if len(rows) >= CHANGELOG_BULK_ROWS:
+                change_trigger = self._drop_trigger(conn, 'resident_changes_insert')
+            if self.has_fulltext and len(rows) >= FULLTEXT_BULK_ROWS:
+                self._insert_indexing_afterwards(conn, insert_sql, rows, before)
+            else:
+                conn.executemany(insert_sql, rows)
+            if change_trigger is not None:
+                conn.execute(change_trigger)
+                conn.execute("INSERT INTO resident_changes (op, resident_id) VALUES ('bulk', 0)")
+            return before + 1, self._last_assigned_id(conn)
+
+        iterator = iter(records)
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+
+            try:
+                rows = [self._insert_values(record) for record in batch]
+                first_id, last_id = self._run_write(lambda conn: insert_batch(conn, rows))
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError,
+                    KeyError, ValueError) as error:
+                result['failed_batches'].append((start, len(batch), str(error)))
+                failed += len(batch)
+            else:
+                result['inserted'] += len(batch)
+                ranges = result['id_ranges']
+                if ranges and ranges[-1][1] + 1 == first_id:
+                    ranges[-1] = (ranges[-1][0], last_id)
+                else:
+                    ranges.append((first_id, last_id))
+
+            start += len(batch)
+            if progress is not None:
+                progress(result['inserted'], failed)
+
+        return result
+
+    @staticmethod
+    def _insert_values(record):
+        """Return the INSERT_COLUMNS values of a record dict (or Resident) or tuple"""
+        if isinstance(record, Mapping):
+            return tuple(record[column] for column in INSERT_COLUMNS)
+        return tuple(record)
+
+    @staticmethod
+    def _insert_indexing_afterwards(conn, insert_sql, rows, after_id):
+        """Insert rows with the full-text insert trigger off, then index them in one statement.
+
+        Feeding residents_fts one trigger call per row gets slow once the index
+        outgrows the page cache. The trigger is dropped and re-created inside
+        the caller's transaction, so other connections never see it missing.
+        """
+        trigger = DatabaseManager._drop_trigger(conn, 'residents_fts_insert')
+        if trigger is None:
+            conn.executemany(insert_sql, rows)
+            return
+
+        columns = ', '.join(SEARCH_COLUMNS)
+        conn.executemany(insert_sql, rows)
+        conn.execute(
+            f'INSERT INTO residents_fts (rowid, {columns}) SELECT id, {columns} FROM residents WHERE id > ?',
+            (after_id,)
+        )
+        conn.execute(trigger)
+
+    @staticmethod
+    def _drop_trigger(conn, name):
+        """Drop a trigger for the rest of the transaction, returning the SQL that re-creates it (None if absent)"""
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        conn.execute(f'DROP TRIGGER {name}')
+        return row[0]
+
+    @staticmethod
+    def _last_assigned_id(conn):
+        """Return the last AUTOINCREMENT id handed out for residents (0 if none yet)"""
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'residents'").fetchone()
+        return row[0] if row else 0
+
+    @metrics.measure('db.get_all_records')
+    def get_all_records(self, limit=None, offset=0):
+        """Retrieve all records from the database, newest first (optionally one slice)"""
+        conn = self.connection()
+
+        rows = conn.execute(
+            f'SELECT {RECORD_SELECT} FROM residents ORDER BY id DESC LIMIT ? OFFSET ?',
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return self._to_records(rows)
+
+    @metrics.measure('db.get_record')
+    def get_record(self, record_id, columns=None):
+        """Retrieve one record by id, or None if it doesn't exist"""
+        conn = self.connection()
+
+        row = conn.execute(
+            f'SELECT {self._select_list(columns)} FROM residents WHERE id = ?', (record_id,)
+        ).fetchone()
+        return None if row is None else self._convert_row(row, columns)
+
+    @metrics.measure('db.get_records')
+    def get_records(self, record_ids, columns=None):
+        """Retrieve several records by id in one query, in the order the ids were given.
+
+        Ids that don't exist are skipped.
+        """
+        record_ids = list(dict.fromkeys(record_ids))
+        if not record_ids:
+            return []
+
+        if columns is not None and 'id' not in columns:
+            select_columns = ('id',) + tuple(columns)
+        else:
+            select_columns = columns
+        select_list = self._select_list(select_columns)
+        conn = self.connection()
+
+        if len(record_ids) <= MAX_IN_LIST_IDS:
+            placeholders = ', '.join('?' * len(record_ids))
+            rows = conn.execute(
+                f'SELECT {select_list} FROM residents WHERE id IN ({placeholders})', record_ids
+            ).fetchall()
+        else:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS lookup_ids (id INTEGER PRIMARY KEY)')
+            try:
+                conn.execute('DELETE FROM temp.lookup_ids')
+                conn.executemany('INSERT INTO temp.lookup_ids (id) VALUES (?)', ((i,) for i in record_ids))
+                rows = conn.execute(
+                    f'SELECT {select_list} FROM residents WHERE id IN (SELECT id FROM temp.lookup_ids)'
+                ).fetchall()
+            finally:
+                # Only the temp table was written; nothing to keep
+                conn.rollback()
+
+        by_id = {}
+        for row in rows:
+            record = self._convert_row(row, select_columns)
+            by_id[record['id']] = record
+
+        if select_columns is not columns:
+            for record in by_id.values():
+                del record['id']
+        return [by_id[record_id] for record_id in record_ids if record_id in by_id]
+
+    def iter_records(self, chunk_size=500, columns=None):
+        """Yield records newest first, reading chunk_size rows at a time.
+
+        Pass columns to fetch only those fields. The generator borrows a
+        pooled connection until it is exhausted or closed.
+        """
+        select_list = self._select_list(columns)
+
+        with self.pool.acquire() as conn:
+            cursor = conn.execute(f'SELECT {select_list} FROM residents ORDER BY id DESC')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._convert_row(row, columns)
+
+    def iter_record_chunks(self, chunk_size=2000, columns=None, street=None, sex=None,
+                           min_age=None, max_age=None, voter=None):
+        """Yield lists of raw row tuples in registration order, chunk_size rows at a time.
+
+        Rows are plain tuples in columns order (every column if None), for
+        callers like the exporters that write them straight out. The filters
+        narrow the rows: an exact street or sex, an inclusive age range, and
+        voter=True/False for residents with/without a voter's ID.
+        """
+        select_list = ', '.join(COLUMNS) if columns is None else self._select_list(columns)
+        where, params = self._filter_clause(street=street, sex=sex, min_age=min_age, max_age=max_age, voter=voter)
+
+        with self.pool.acquire() as conn:
+            cursor = conn.execute(f'SELECT {select_list} FROM residents{where} ORDER BY id', params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+    @staticmethod
+    def _filter_clause(street=None, sex=None, min_age=None, max_age=None, voter=None):
+        """Build ' WHERE ...' and its parameters for the resident filters ('' if there are none)"""
+        conditions = []
+        params = []
+        if street is not None:
+            conditions.append('street = ?')
+            params.append(street)
+        if sex is not None:
+            conditions.append('sex = ?')
+            params.append(sex)
+        if min_age is not None:
+            conditions.append('age >= ?')
+            params.append(min_age)
+        if max_age is not None:
+            conditions.append('age <= ?')
+            params.append(max_age)
+        if voter is not None:
+            conditions.append("COALESCE(voter_id, '') <> ''" if voter else "COALESCE(voter_id, '') = ''")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+
+    @metrics.measure('db.page')
+    def page(self, after_id=None, limit=50, order='id', descending=True, columns=None):
+        """Return up to limit records following the record with id after_id.
+
+        Uses keyset pagination on (order, id), so every page costs the same
+        however deep it is. Pass the id of the last record of the previous
+        page as after_id (None for the first page). Returns an empty list if
+        that record has since been deleted. Records whose order column is
+        NULL are not reached when ordering by anything other than id.
+        """
+        if order not in PAGE_ORDER_COLUMNS:
+            raise ValueError(f"Cannot page by column: {order}")
+
+        conn = self.connection()
+        select_list = self._select_list(columns)
+        collate = ' COLLATE NOCASE' if order in NOCASE_COLUMNS else ''
+        direction = 'DESC' if descending else 'ASC'
+        before = '<' if descending else '>'
+
+        if order == 'id':
+            order_by = f'id {direction}'
+        else:
+            order_by = f'{order}{collate} {direction}, id {direction}'
+
+        if after_id is None:
+            where, params = '', ()
+        elif order == 'id':
+            where, params = f'WHERE id {before} ?', (after_id,)
+        else:
+            anchor = conn.execute(f'SELECT {order} FROM residents WHERE id = ?', (after_id,)).fetchone()
+            if anchor is None:
+                return []
+            # Written as a range plus tie-break so SQLite can seek the index
+            where = f'WHERE {order} {before}= ?{collate} AND ({order} {before} ?{collate} OR id {before} ?)'
+            params = (anchor[0], anchor[0], after_id)
+
+        rows = conn.execute(
+            f'SELECT {select_list} FROM residents {where} ORDER BY {order_by} LIMIT ?',
+            params + (limit,)
+        ).fetchall()
+        return [self._convert_row(row, columns) for row in rows]
+
+    @metrics.measure('db.get_statistics')
+    def get_statistics(self, age_edges=AGE_GROUP_EDGES, street=None, sex=None, min_age=None, max_age=None,
+                       voter=None):
+        """Count residents in total and by sex, age group, street and civil status.
+
+        age_edges are the inclusive upper bounds of each age group, e.g.
+        (17, 30) gives '0-17', '18-30' and '31+'. Residents without an age
+        are left out of the age groups. The filters narrow the residents
+        counted, as in iter_record_chunks(). Unfiltered counts with the
+        default edges come straight from the trigger-maintained
+        resident_counts table; anything else is counted over the column
+        cache when it is on and loaded, or with GROUP BY queries.
+        """
+        age_edges = sorted(int(edge) for edge in age_edges)
+        filters = self._filters(street=street, sex=sex, min_age=min_age, max_age=max_age, voter=voter)
+        if not filters and self.has_resident_counts and tuple(age_edges) == migrations.COUNTED_AGE_EDGES:
+            return self._get_counted_statistics()
+        columns = self.resident_columns()
+        if columns is not None:
+            return columns.statistics(age_edges, **filters)
+        return self._get_aggregated_statistics(age_edges, filters)
+
+    @metrics.measure('db.get_crosstab')
+    def get_crosstab(self, rows, columns, age_edges=AGE_GROUP_EDGES, street=None, sex=None, min_age=None,
+                     max_age=None, voter=None):
+        """Count residents by two of sex, street, civil_status and age_group.
+
+        Returns {row value: {column value: count}}. Every age group is
+        listed; other values only when some resident has them. Residents
+        without an age are left out of age group tables. The filters are
+        those of get_statistics().
+        """
+        for name in (rows, columns):
+            if name not in CROSSTAB_COLUMNS:
+                raise ValueError(f"Cannot cross-tabulate by: {name}")
+        age_edges = sorted(int(edge) for edge in age_edges)
+        filters = self._filters(street=street, sex=sex, min_age=min_age, max_age=max_age, voter=voter)
+
+        cache = self.resident_columns()
+        if cache is not None:
+            return cache.crosstab(rows, columns, age_edges, **filters)
+
+        where, params = self._filter_clause(**filters)
+        expressions = []
+        for name in (rows, columns):
+            if name == 'age_group':
+                cases = ' '.join(f'WHEN age <= {edge} THEN {index}' for index, edge in enumerate(age_edges))
+                expressions.append(f'CASE WHEN age IS NULL THEN NULL {cases} ELSE {len(age_edges)} END')
+            else:
+                expressions.append(f"COALESCE({name}, '')")
+        labels = self.age_group_labels(age_edges)
+        counts = [
+            tuple(labels[value] if name == 'age_group' else value for name, value in zip((rows, columns), key))
+            + (count,)
+            for *key, count in self.connection().execute(
+                f'SELECT {expressions[0]}, {expressions[1]}, COUNT(*) FROM residents{where} GROUP BY 1, 2', params
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            record['surname'], record['firstname'], record['middlename'],
-            record['sex'], record['dob'], record['age'], record['birthplace'],
-            record['civil_status'], record['nationality'], record['street'],
-            record['contact_number'], record['email'], record['years_residency'],
-            record['voter_id'], record['household_relation'], record['emergency_name'],
-            record['emergency_relation'], record['emergency_contact']
-        ))
-
-        conn.commit()
-        record_id = cursor.lastrowid
-        conn.close()
-        return record_id
-
-    def get_all_records(self):
-        """Retrieve all records from the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM residents ORDER BY id DESC')
-        rows = cursor.fetchall()
-
-        records = [self._row_to_dict(row) for row in rows]
-
-        conn.close()
-        return records
+            if None not in key
+        ]
+
+        def axis(name, position):
+            return labels if name == 'age_group' else sorted({count[position] for count in counts})
+
+        table = {row: dict.fromkeys(axis(columns, 1), 0) for row in axis(rows, 0)}
+        for row, column, count in counts:
+            table[row][column] = count
+        return table
+
+    @staticmethod
+    def _filters(**filters):
+        """Drop the filters that weren't given"""
+        return {name: value for name, value in filters.items() if value is not None}
+
+    def resident_columns(self, wait=False):
+        """Return the column cache, or None when it is off or still loading.
+
+        The first call starts loading the cache on a thread of its own, so
+        the caller (usually the database worker, which every screen shares)
+        counts with SQL meanwhile instead of waiting seconds on a large
+        registry; wait=True waits for the load instead. Changes since the
+        cache was last used, by this station or any other, are applied from
+        the changelog first.
+        """
+        if not self.column_cache:
+            return None
+        # Imported here so that NumPy, which it uses if installed, only loads with the cache
+        from resident_cache import RECORD_COLUMNS, CacheOverflow
+
+        with self._columns_lock:
+            if self._columns is not None:
+                try:
+                    changes = self.get_changes(self._columns_version, columns=RECORD_COLUMNS)
+                    if changes is not None:
+                        self._columns_version, records, deleted_ids = changes
+                        self._columns.add_many((record['id'], record) for record in records)
+                        self._columns.remove_many(deleted_ids)
+                        return self._columns
+                except CacheOverflow:
+                    # Too many distinct values for the cache: statistics go back to SQL
+                    self._columns = None
+                    self.column_cache = False
+                    return None
+                # Too far behind to patch: load it afresh
+                self._columns = None
+            loader = self._start_column_load()
+
+        if not wait:
+            return None
+        loader.join()
+        with self._columns_lock:
+            return self._columns
+
+    def _start_column_load(self):
+        """Start loading the column cache unless a load is running (call with _columns_lock held)"""
+        if self._columns_loader is None:
+            self._columns_loader = threading.Thread(target=self._load_columns_in_background,
+                                                    name='column cache', daemon=True)
+            self._columns_loader.start()
+        return self._columns_loader
+
+    def _load_columns_in_background(self):
+        """Load the column cache and publish it (runs on its own thread)"""
+        from resident_cache import CacheOverflow
+
+        version, columns = 0, None
+        try:
+            version, columns = self._load_columns()
+        except CacheOverflow:
+            self.column_cache = False
+        except sqlite3.Error as error:
+            # Statistics stay on SQL; the next use tries again
+            if not self._closing:
+                logger.warning("Could not load the column cache: %s", error)
+        except Exception:
+            logger.exception("Could not load the column cache")
+        finally:
+            # Always publish, so that a failed load doesn't block the next one
+            with self._columns_lock:
+                self._columns_version, self._columns = version, columns
+                self._columns_loader = None
+
+    @metrics.measure('db.load_columns')
+    def _load_columns(self):
+        """Read the cached columns of every resident, with the data version they reflect"""
+        from resident_cache import ResidentColumns
+
+        with self.pool.acquire() as conn:
+            # Lets close() interrupt a load that is still running at exit
+            self._columns_connection = conn
+            try:
+                # Read first: a change that lands during the load is applied again later, harmlessly
+                version = self._data_version(conn)
+                return version, ResidentColumns.load(conn)
+            finally:
+                self._columns_connection = None
+
+    def data_version(self):
+        """Return the version of the latest change to the residents (0 before any)"""
+        return self._data_version(self.connection())
+
+    @staticmethod
+    def _data_version(conn):
+        return conn.execute('SELECT MAX(version) FROM resident_changes').fetchone()[0] or 0
+
+    @metrics.measure('db.changes_since')
+    def changes_since(self, version, limit=MAX_CHANGES):
+        """List the residents changed after a data version, by any station.
+
+        Returns (latest version, {resident id: 'insert', 'update' or
+        'delete'}), each resident with its last change. Returns None when
+        the changes can't all be listed (more than limit, a bulk insert
+        logged as one 'bulk' entry, already pruned from the changelog, or
+        a version this database never had): the caller should reload
+        everything instead.
+        """
+        conn = self.connection()
+        rows = conn.execute(
+            'SELECT version, op, resident_id FROM resident_changes WHERE version > ? ORDER BY version LIMIT ?',
+            (version, limit + 1)
+        ).fetchall()
+        if not rows:
+            return (version, {}) if self._data_version(conn) == version else None
+        # Versions have no gaps, so a missing first one was pruned
+        if len(rows) > limit or rows[0][0] != version + 1 or any(op == 'bulk' for _, op, _ in rows):
+            return None
+        return rows[-1][0], {resident_id: op for _, op, resident_id in rows}
+
+    def get_changes(self, version, columns=None, limit=MAX_CHANGES):
+        """Return (latest version, changed records, deleted ids) since a data version.
+
+        Records are read as they are now, so a resident added and then
+        deleted only shows up as deleted. Pass columns to fetch only those
+        fields (id is always included). Returns None when changes_since()
+        does.
+        """
+        changes = self.changes_since(version, limit)
+        if changes is None:
+            return None
+        latest, ops = changes
+        if columns is not None and 'id' not in columns:
+            columns = ('id',) + tuple(columns)
+        records = self.get_records([resident_id for resident_id, op in ops.items() if op != 'delete'], columns)
+        found = {record['id'] for record in records}
+        return latest, records, [resident_id for resident_id in ops if resident_id not in found]
+
+    @metrics.measure('db.prune_changes')
+    def prune_changes(self, keep=CHANGELOG_KEEP):
+        """Drop all but the newest keep changelog entries, returning how many were dropped"""
+        return self._run_write(lambda conn: conn.execute(
+            'DELETE FROM resident_changes WHERE version <= (SELECT MAX(version) FROM resident_changes) - ?',
+            (keep,)
+        ).rowcount)
+
+    def _get_counted_statistics(self):
+        """Read statistics from the resident_counts summary table"""
+        conn = self.connection()
+        stats = {
+            'total': 0,
+            'sex': {},
+            'age_groups': dict.fromkeys(self.age_group_labels(migrations.COUNTED_AGE_EDGES), 0),
+            'street': {},
+            'civil_status': {}
+        }
+
+        rows = conn.execute(
+            'SELECT dimension, value, resident_count FROM resident_counts WHERE resident_count > 0'
+        ).fetchall()
+        for dimension, value, count in rows:
+            if dimension == 'total':
+                stats['total'] = count
+            elif dimension == 'age_group':
+                if value:
+                    stats['age_groups'][value] = count
+            else:
+                stats[dimension][value] = count
+
+        return stats
+
+    def _get_aggregated_statistics(self, age_edges, filters=None):
+        """Compute statistics with COUNT/GROUP BY queries over the residents table"""
+        conn = self.connection()
+        labels = self.age_group_labels(age_edges)
+        where, params = self._filter_clause(**(filters or {}))
+
+        total = conn.execute(f'SELECT COUNT(*) FROM residents{where}', params).fetchone()[0]
 
+        def group_counts(column):
+            return dict(conn.execute(
+                f"SELECT COALESCE({column}, ''), COUNT(*) FROM residents{where} GROUP BY 1", params
+            ).fetchall())
+
+        cases = ' '.join(f'WHEN age <= ? THEN {index}' for index in range(len(age_edges)))
+        age_where = f'{where} AND age IS NOT NULL' if where else ' WHERE age IS NOT NULL'
+        age_rows = conn.execute(f'''
+            SELECT CASE {cases} ELSE {len(age_edges)} END AS age_group, COUNT(*)
+            FROM residents{age_where}
+            GROUP BY age_group
+        ''', list(age_edges) + params).fetchall()
+
+        age_groups = dict.fromkeys(labels, 0)
+        for index, count in age_rows:
+            age_groups[labels[index]] = count
+
+        return {
+            'total': total,
+            'sex': group_counts('sex'),
+            'age_groups': age_groups,
+            'street': group_counts('street'),
+            'civil_status': group_counts('civil_status')
+        }
+
+    @metrics.measure('db.verify_statistics')
+    def verify_statistics(self):
+        """Recompute the resident_counts table from scratch and report drift.
+
+        Returns a list of (dimension, value, stored count, actual count) for
+        every counter that doesn't match; an empty list means the counters
+        are exact.
+        """
+        conn = self.connection()
+        return self._statistics_drift(conn)
+
+    @metrics.measure('db.rebuild_statistics')
+    def rebuild_statistics(self):
+        """Rebuild the resident_counts table from scratch, returning the drift it corrected"""
+        def rebuild(conn):
+            drift = self._statistics_drift(conn)
+            migrations.rebuild_resident_counts(conn)
+            return drift
+
+        return self._run_write(rebuild)
+
+    @staticmethod
+    def _statistics_drift(conn):
+        """Compare stored resident_counts with counts computed from residents"""
+        stored = {
+            (dimension, value): count
+            for dimension, value, count in conn.execute(
+                'SELECT dimension, value, resident_count FROM resident_counts'
+            )
+        }
+        actual = {
+            (dimension, value): count
+            for dimension, value, count in conn.execute(migrations.resident_counts_query())
+        }
+
+        drift = []
+        for key in sorted(stored.keys() | actual.keys()):
+            stored_count = stored.get(key, 0)
+            actual_count = actual.get(key, 0)
+            if stored_count != actual_count:
+                drift.append((key[0], key[1], stored_count, actual_count))
+        return drift
+
+    @staticmethod
+    def age_group_labels(age_edges=AGE_GROUP_EDGES):
+        """Return labels like '0-17', '18-30', ..., '61+' for a set of age group edges"""
+        return migrations.age_group_labels(age_edges)
+
+    @metrics.measure('db.update_record')
     def update_record(self, record_id, record):
         """Update an existing record"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE residents
-            SET surname = ?, firstname = ?, middlename = ?, sex = ?,
-                dob = ?, age = ?, birthplace = ?, civil_status = ?,
-                nationality = ?, street = ?, contact_number = ?, email = ?,
-                years_residency = ?, voter_id = ?, household_relation = ?,
-                emergency_name = ?, emergency_relation = ?, emergency_contact = ?
-            WHERE id = ?
-        ''', (
-            record['surname'], record['firstname'], record['middlename'],
-            record['sex'], record['dob'], record['age'], record['birthplace'],
-            record['civil_status'], record['nationality'], record['street'],
-            record['contact_number'], record['email'], record['years_residency'],
-            record['voter_id'], record['household_relation'], record['emergency_name'],
-            record['emergency_relation'], record['emergency_contact'], record_id
-        ))
-
-        conn.commit()
-        conn.close()
+        def update(conn):
+            conn.execute('''
+                UPDATE residents
+                SET surname = ?, firstname = ?, middlename = ?, sex = ?,
+                    dob = ?, age = ?, birthplace = ?, civil_status = ?,
+                    nationality = ?, street = ?, contact_number = ?, email = ?,
+                    years_residency = ?, voter_id = ?, household_relation = ?,
+                    emergency_name = ?, emergency_relation = ?, emergency_contact = ?
+                WHERE id = ?
+            ''', (
+                record['surname'], record['firstname'], record['middlename'],
+                record['sex'], record['dob'], record['age'], record['birthplace'],
+                record['civil_status'], record['nationality'], record['street'],
+                record['contact_number'], record['email'], record['years_residency'],
+                record['voter_id'], record['household_relation'], record['emergency_name'],
+                record['emergency_relation'], record['emergency_contact'], record_id
+            ))
+
+        self._run_write(update)
 
+    @metrics.measure('db.delete_record')
     def delete_record(self, record_id):
         """Delete a record from the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        self._run_write(lambda conn: conn.execute('DELETE FROM residents WHERE id = ?', (record_id,)))
 
-        cursor.execute('DELETE FROM residents WHERE id = ?', (record_id,))
+    @metrics.measure('db.search_records')
+    def search_records(self, search_term, limit=None, offset=0):
+        """Search records by name, middle name, street, voter's ID or contact number.
 
-        conn.commit()
-        conn.close()
+        Every word in the search term must match the start of a word in one
+        of those fields ("dela cruz juan", "0917"). Searches with up to
+        RANKED_SEARCH_MAX matches come best matches first. Broader searches,
+        where the ranking says little, come newest first. The ordered ids are
+        kept per data version, so later pages only read their records.
+        """
+        if not self.has_fulltext:
+            return self._search_records_like(search_term, limit, offset)
 
-    def search_records(self, search_term):
-        """Search records by surname or firstname only"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        match_query = self._fulltext_query(search_term)
+        if not match_query:
+            return []
+
+        ids, complete = self._search_ids(match_query)
+        end = None if limit is None else offset + limit
+        if complete or (end is not None and end <= len(ids)):
+            return self.get_records(ids[offset:end])
+
+        # Deep into a broad search: past the kept ids
+        rows = self.connection().execute(f'''
+            SELECT {RESIDENT_RECORD_SELECT} FROM residents_fts
+            JOIN residents ON residents.id = residents_fts.rowid
+            WHERE residents_fts MATCH ?
+            ORDER BY residents_fts.rowid DESC
+            LIMIT ? OFFSET ?
+        ''', (match_query, -1 if limit is None else limit, offset)).fetchall()
+        return self._to_records(rows)
+
+    def _search_ids(self, match_query):
+        """Return (ids, complete) for an FTS5 query.
+
+        When the query has at most RANKED_SEARCH_MAX matches, ids are all of
+        them best first and complete is True. Otherwise ids are the newest
+        RANKED_SEARCH_MAX + 1 matches, newest first.
+        """
+        conn = self.connection()
+        # Read first: results newer than the version are only ever re-ranked, never missed
+        version = self._data_version(conn)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(match_query)
+            if cached is not None and cached[0] == version:
+                self._search_cache.move_to_end(match_query)
+                return cached[1:]
+
+        # Matches in rowid order stop at the cap, so a broad search costs no more than this
+        ids = [rowid for rowid, in conn.execute(
+            'SELECT rowid FROM residents_fts WHERE residents_fts MATCH ? ORDER BY rowid DESC LIMIT ?',
+            (match_query, RANKED_SEARCH_MAX + 1)
+        )]
+        complete = len(ids) <= RANKED_SEARCH_MAX
+        if complete:
+            ids = [rowid for rowid, in conn.execute(f'''
+                SELECT rowid FROM residents_fts
+                WHERE residents_fts MATCH ?
+                ORDER BY bm25(residents_fts, {', '.join(map(str, SEARCH_WEIGHTS))}), rowid DESC
+            ''', (match_query,))]
+
+        with self._search_cache_lock:
+            self._search_cache[match_query] = (version, ids, complete)
+            self._search_cache.move_to_end(match_query)
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return ids, complete
+
+    def _search_records_like(self, search_term, limit=None, offset=0):
+        """Fallback search for SQLite builds without FTS5 (surname or firstname only)"""
+        conn = self.connection()
 
         search_pattern = f'%{search_term}%'
-        cursor.execute('''
-            SELECT * FROM residents
+        rows = conn.execute(f'''
+            SELECT {RECORD_SELECT} FROM residents
             WHERE surname LIKE ? OR firstname LIKE ?
             ORDER BY id DESC
-        ''', (search_pattern, search_pattern))
+            LIMIT ? OFFSET ?
+        ''', (search_pattern, search_pattern, -1 if limit is None else limit, offset)).fetchall()
+
+        return self._to_records(rows)
 
-        rows = cursor.fetchall()
-        records = [self._row_to_dict(row) for row in rows]
+    def matches_search(self, record, search_term):
+        """Check in Python whether a record would be returned by search_records(search_term).
 
-        conn.close()
-        return records
+        Used to narrow an already loaded result set without another query.
+        """
+        if not self.has_fulltext:
+            term = search_term.casefold()
+            return any(term in (record[column] or '').casefold() for column in ('surname', 'firstname'))
+
+        tokens = self._search_tokens(search_term)
+        if not tokens:
+            return False
+        words = [
+            word
+            for column in SEARCH_COLUMNS
+            for word in self._search_tokens(str(record[column] or ''))
+        ]
+        return all(any(word.startswith(token) for word in words) for token in tokens)
 
     @staticmethod
-    def _row_to_dict(row):
-        """Convert database row to dictionary"""
-        return {
-            'id': row[0],
-            'surname': row[1],
-            'firstname': row[2],
-            'middlename': row[3],
-            'sex': row[4],
-            'dob': row[5],
-            'age': row[6],
-            'birthplace': row[7],
-            'civil_status': row[8],
-            'nationality': row[9],
-            'street': row[10],
-            'contact_number': row[11],
-            'email': row[12],
-            'years_residency': row[13],
-            'voter_id': row[14],
-            'household_relation': row[15],
-            'emergency_name': row[16],
-            'emergency_relation': row[17],
-            'emergency_contact': row[18]
-        }
+    def _fulltext_query(search_term):
+        """Turn free text into an FTS5 query of quoted prefix terms joined by AND"""
+        tokens = re.findall(r'[^\W_]+', search_term)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    @staticmethod
+    def _search_tokens(text):
+        """Split text into case- and accent-folded words the way the FTS5 tokenizer does"""
+        decomposed = unicodedata.normalize('NFKD', text.casefold())
+        folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+        return re.findall(r'[^\W_]+', folded)
+
+    @staticmethod
+    def _select_list(columns):
+        """Build the SELECT list for a column projection (None means a full record)"""
+        if columns is None:
+            return RECORD_SELECT
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        return ', '.join(columns)
+
+    @staticmethod
+    def _to_records(rows):
+        """Convert full rows to a list of Residents"""
+        return list(map(Resident, rows))
+
+    @staticmethod
+    def _convert_row(row, columns):
+        """Convert a full row to a Resident, or a projected row to a dictionary"""
+        if columns is None:
+            return Resident(row)
+        return dict(zip(columns, row))
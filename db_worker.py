@@ -0,0 +1,132 @@
+"""
+Background database worker.
+Runs DatabaseManager calls off the GUI thread and hands results back through Qt signals.
+"""
+import itertools
+import logging
+import queue
+import sqlite3
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseWorker(QThread):
+    """Runs database jobs one at a time on its own thread and connection.
+
+    submit() queues a call and returns a job id; its on_result/on_error
+    callbacks run later on the GUI thread. Jobs submitted with the same key
+    supersede each other: an older job that hasn't started is skipped, one
+    that is already running is interrupted, and its callbacks never run.
+    """
+
+    job_finished = pyqtSignal(int, object)
+    job_failed = pyqtSignal(int, object)
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._jobs = queue.Queue()
+        self._job_ids = itertools.count(1)
+        self._callbacks = {}
+        self._latest_by_key = {}
+        self._lock = threading.Lock()
+        self._running_job = None
+        self._connection = None
+
+        # The worker object lives on the GUI thread, so these are queued connections
+        self.job_finished.connect(self._deliver_result)
+        self.job_failed.connect(self._deliver_error)
+
+    def submit(self, function, *args, key=None, on_result=None, on_error=None, **kwargs):
+        """Queue function(*args, **kwargs) to run on the worker thread"""
+        job_id = next(self._job_ids)
+        self._callbacks[job_id] = (on_result, on_error)
+
+        if key is not None:
+            with self._lock:
+                previous = self._latest_by_key.get(key)
+                self._latest_by_key[key] = job_id
+                if previous is not None and previous == self._running_job and self._connection is not None:
+                    self._connection.interrupt()
+            if previous is not None:
+                self._callbacks.pop(previous, None)
+
+        self._jobs.put((job_id, key, function, args, kwargs))
+        return job_id
+
+    def cancel(self, key):
+        """Drop the latest job submitted with key, interrupting it if it's running"""
+        with self._lock:
+            job_id = self._latest_by_key.pop(key, None)
+            if job_id is not None and job_id == self._running_job and self._connection is not None:
+                self._connection.interrupt()
+        if job_id is not None:
+            self._callbacks.pop(job_id, None)
+
+    def stop(self):
+        """Finish the queued jobs and wait for the thread to exit.
+
+        Keyed jobs (searches, page loads) that haven't started are skipped;
+        others, such as queued saves, still run. No callbacks are called.
+        """
+        if not self.isRunning():
+            return
+        self._callbacks.clear()
+        with self._lock:
+            self._latest_by_key.clear()
+        self._jobs.put(None)
+        self.wait()
+
+    def _is_current(self, job_id, key):
+        """Check that no newer job with the same key has been submitted (call with the lock held)"""
+        return key is None or self._latest_by_key.get(key) == job_id
+
+    def run(self):
+        """Worker thread loop"""
+        self._connection = self.db_manager.connection()
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            job_id, key, function, args, kwargs = job
+            with self._lock:
+                if not self._is_current(job_id, key):
+                    continue
+                self._running_job = job_id
+
+            try:
+                result = function(*args, **kwargs)
+            except sqlite3.OperationalError as error:
+                with self._lock:
+                    superseded = not self._is_current(job_id, key)
+                if not (superseded and 'interrupt' in str(error)):
+                    self.job_failed.emit(job_id, error)
+            except Exception as error:
+                self.job_failed.emit(job_id, error)
+            else:
+                self.job_finished.emit(job_id, result)
+            finally:
+                with self._lock:
+                    self._running_job = None
+
+    def _deliver_result(self, job_id, result):
+        """Run a finished job's result callback on the GUI thread"""
+        on_result, _ = self._callbacks.pop(job_id, (None, None))
+        if on_result is not None:
+            on_result(result)
+
+    def _deliver_error(self, job_id, error):
+        """Run a failed job's error callback on the GUI thread"""
+        if job_id not in self._callbacks:
+            return
+        _, on_error = self._callbacks.pop(job_id)
+        if on_error is not None:
+            on_error(error)
+        else:
+            logger.error("Database job failed: %s", error, exc_info=error)
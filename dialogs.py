@@ -4,10 +4,10 @@ diri ang admin log in og update window
 Contains login and record update dialogs.
 """
 from PyQt6.QtWidgets import *
-from PyQt6.QtCore import Qt, QDate, QRegularExpression
-from PyQt6.QtGui import QRegularExpressionValidator
-from styles import Styles
-import re
+from PyQt6.QtCore import Qt, QDate, QRegularExpression, QTimer
+from PyQt6.QtGui import QFont, QRegularExpressionValidator
+import validators
+from instrumentation import metrics, DEFAULT_METRICS_FILE
 
 
 class AdminLoginWindow(QDialog):
@@ -19,7 +19,7 @@ class AdminLoginWindow(QDialog):
         self.setFixedSize(400, 250)
         self.setModal(True)
         self._center_on_parent(parent)
-        self.setStyleSheet(Styles.DIALOG_BASE)
+        self.setProperty("page", "dialog")
         self._setup_ui()
 
     def _center_on_parent(self, parent):
@@ -39,12 +39,7 @@ class AdminLoginWindow(QDialog):
         # Title
         title = QLabel("Admin Login")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 20px;
-            font-weight: bold;
-            color: #0D47A1;
-            margin-bottom: 10px;
-        """)
+        title.setProperty("role", "dialogTitle")
         layout.addWidget(title)
 
         # Form fields
@@ -60,14 +55,13 @@ class AdminLoginWindow(QDialog):
         self.password_field.setPlaceholderText("Enter password")
         self.password_field.setMinimumHeight(40)
 
-        self.username_field.setStyleSheet(Styles.LOGIN_FIELD_STYLE)
-        self.password_field.setStyleSheet(Styles.LOGIN_FIELD_STYLE)
+        self.username_field.setProperty("variant", "login")
+        self.password_field.setProperty("variant", "login")
 
-        label_style = "font-weight: 600; color: #333333; font-size: 14px;"
         username_label = QLabel("Username:")
         password_label = QLabel("Password:")
-        username_label.setStyleSheet(label_style)
-        password_label.setStyleSheet(label_style)
+        username_label.setProperty("role", "loginLabel")
+        password_label.setProperty("role", "loginLabel")
 
         form_layout.addRow(username_label, self.username_field)
         form_layout.addRow(password_label, self.password_field)
@@ -78,8 +72,8 @@ class AdminLoginWindow(QDialog):
         self.login_btn = QPushButton("Login")
         self.cancel_btn = QPushButton("Cancel")
 
-        self.login_btn.setStyleSheet(Styles.BUTTON_PRIMARY)
-        self.cancel_btn.setStyleSheet(Styles.BUTTON_DANGER)
+        self.login_btn.setProperty("variant", "primary")
+        self.cancel_btn.setProperty("variant", "danger")
 
         button_layout.addStretch()
         button_layout.addWidget(self.login_btn)
@@ -103,28 +97,10 @@ class AdminLoginWindow(QDialog):
             self.accept()
         else:
             msg = QMessageBox(self)
+            msg.setObjectName("messageBox")
             msg.setIcon(QMessageBox.Icon.Critical)
             msg.setWindowTitle("Login Failed")
             msg.setText("Invalid username or password!\nPlease check your credentials and try again.")
-            msg.setStyleSheet("""
-                QMessageBox {
-                    background-color: white;
-                }
-                QLabel { 
-                    color: black; 
-                }
-                QPushButton {
-                    background-color: #0D47A1;
-                    color: white;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #1565C0;
-                }
-            """)
             msg.exec()
 
             self.password_field.clear()
@@ -142,7 +118,7 @@ class UpdateRecordDialog(QDialog):
         self.setModal(True)
         self.resize(800, 600)
         self._center_on_parent(parent)
-        self.setStyleSheet("QDialog { background-color: white; font-family: 'Segoe UI'; }")
+        self.setProperty("page", "dialog")
         self._setup_ui()
 
     def _center_on_parent(self, parent):
@@ -161,20 +137,20 @@ class UpdateRecordDialog(QDialog):
 
         # Title
         title = QLabel("Update Registration Record")
-        title.setStyleSheet("font-size: 20px; font-weight: bold; color: #0D47A1; margin-bottom: 10px;")
+        title.setProperty("role", "dialogTitle")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
 
         # Scrollable form
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background-color: white; }")
+        scroll.setProperty("role", "formScroll")
 
         form_widget = QWidget()
         form_layout = QGridLayout(form_widget)
         form_layout.setHorizontalSpacing(15)
         form_layout.setVerticalSpacing(8)
-        form_widget.setStyleSheet(Styles.FORM_FIELD_STYLE)
+        form_widget.setProperty("form", True)
 
         self._create_form_fields(form_layout)
 
@@ -186,8 +162,8 @@ class UpdateRecordDialog(QDialog):
         save_btn = QPushButton("Save Changes")
         cancel_btn = QPushButton("Cancel")
 
-        save_btn.setStyleSheet(Styles.BUTTON_PRIMARY)
-        cancel_btn.setStyleSheet(Styles.BUTTON_DANGER)
+        save_btn.setProperty("variant", "primary")
+        cancel_btn.setProperty("variant", "danger")
 
         save_btn.setMinimumHeight(40)
         cancel_btn.setMinimumHeight(40)
@@ -206,7 +182,7 @@ class UpdateRecordDialog(QDialog):
     def _add_section_header(self, title_text, layout, row):
         """Add a section header to the form"""
         label = QLabel(title_text)
-        label.setStyleSheet("font-size: 13px; font-weight: bold; color: #1565C0; margin: 8px 0 4px 0; padding: 0;")
+        label.setProperty("role", "sectionHeader")
         layout.addWidget(label, row, 0, 1, 4)
         return row + 1
 
@@ -251,7 +227,7 @@ class UpdateRecordDialog(QDialog):
         sex_widget = QWidget()
         sex_widget.setLayout(sex_layout)
         sex_widget.setMinimumHeight(35)
-        sex_widget.setStyleSheet("QWidget { background-color: transparent; border: none; padding: 5px; }")
+        sex_widget.setProperty("role", "radioGroup")
 
         form_layout.addWidget(QLabel("Sex: *"), row, 2)
         form_layout.addWidget(sex_widget, row, 3)
@@ -262,65 +238,7 @@ class UpdateRecordDialog(QDialog):
         self.dob.setDisplayFormat("dd/MM/yyyy")
         self.dob.setDate(QDate.fromString(self.record['dob'], "dd/MM/yyyy"))
         self.dob.setMinimumHeight(28)
-        # Apply consistent styling with register_window
-        self.dob.setStyleSheet("""
-            QDateEdit {
-                padding: 8px 12px;
-                border: 2px solid #999999;
-                border-radius: 6px;
-                font-size: 12px;
-                background-color: white;
-                color: black;
-                min-width: 200px;
-                min-height: 20px;
-            }
-            QDateEdit:focus {
-                border: 2px solid #1976D2;
-                background-color: #ffffff;
-            }
-            QDateEdit::drop-down {
-                border: none;
-                width: 30px;
-            }
-            QCalendarWidget {
-                background-color: white;
-                border: 2px solid #1976D2;
-            }
-            QCalendarWidget QWidget {
-                background-color: white;
-            }
-            QCalendarWidget QAbstractItemView:enabled {
-                color: black;
-                background-color: white;
-                selection-background-color: #E3F2FD;
-                selection-color: black;
-                border: 1px solid #1976D2;
-            }
-            QCalendarWidget QAbstractItemView:disabled {
-                color: #BDBDBD;
-            }
-            QCalendarWidget QToolButton {
-                color: black;
-                background-color: white;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-                padding: 5px;
-            }
-            QCalendarWidget QToolButton:hover {
-                background-color: #E3F2FD;
-                border: 1px solid #1976D2;
-            }
-            QCalendarWidget QMenu {
-                background-color: white;
-                color: black;
-            }
-            QCalendarWidget QSpinBox {
-                background-color: white;
-                color: black;
-                selection-background-color: #E3F2FD;
-                selection-color: black;
-            }
-        """)
+        self.dob.setObjectName("recordDob")
         form_layout.addWidget(QLabel("Date of Birth: *"), row, 0)
         form_layout.addWidget(self.dob, row, 1)
 
@@ -423,81 +341,37 @@ class UpdateRecordDialog(QDialog):
 
     def _show_message(self, icon, title, text, buttons=QMessageBox.StandardButton.Ok):
         """Helper for styled QMessageBox with black text"""
-        msg = QMessageBox(icon, title, text, buttons, self)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: white;
-            }
-            QLabel {
-                color: black;
-                font-size: 13px;
-            }
-            QPushButton {
-                background-color: #1976D2;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #0D47A1;
-            }
-        """)
+        msg = QMessageBox(self)
+        # Named before the buttons are added, so they are polished with the message box style
+        msg.setObjectName("messageBox")
+        msg.setIcon(icon)
+        msg.setWindowTitle(title)
+        msg.setText(text)
+        msg.setStandardButtons(buttons)
         return msg.exec()
 
     def _validate_contact_number(self, number, field_name):
         """Validate Philippine mobile number format"""
-        if not number:
-            return True  # Optional field
-
-        if len(number) != 11:
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Contact Number",
-                               f"{field_name} must be exactly 11 digits.")
+        error = validators.contact_number_error(number, field_name)
+        if error:
+            self._show_message(QMessageBox.Icon.Warning, "Invalid Contact Number", error)
             return False
-
-        if not number.startswith('09'):
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Contact Number",
-                               f"{field_name} must start with '09'.")
-            return False
-
         return True
 
     def _validate_email(self, email):
         """Validate email format"""
-        if not email:
-            return True  # Optional field
-
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Email",
-                               "Please enter a valid email address.\nExample: user@example.com")
+        error = validators.email_error(email)
+        if error:
+            self._show_message(QMessageBox.Icon.Warning, "Invalid Email", error)
             return False
         return True
 
     def _validate_voter_id(self, voter_id):
         """Validate voter's ID format"""
-        if not voter_id:
-            return True  # Optional field
-
-        # Remove hyphens for validation
-        voter_id_clean = voter_id.replace('-', '').replace(' ', '')
-
-        # Check if it contains only digits
-        if not voter_id_clean.isdigit():
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Voter's ID",
-                               "Voter's ID should contain only numbers and hyphens.\nExample: 1234-5678-9012")
+        error = validators.voter_id_error(voter_id)
+        if error:
+            self._show_message(QMessageBox.Icon.Warning, "Invalid Voter's ID", error)
             return False
-
-        # Check length (typically 12 digits for Philippine voter ID)
-        if len(voter_id_clean) < 10 or len(voter_id_clean) > 20:
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Voter's ID",
-                               "Voter's ID should be between 10-20 digits.")
-            return False
-
         return True
 
     def _validate_required_dropdowns(self):
@@ -584,3 +458,284 @@ class UpdateRecordDialog(QDialog):
             'emergency_relation': self.emergency_relation.text(),
             'emergency_contact': self.emergency_contact.text()
         }
+
+
+class ExportDialog(QDialog):
+    """Dialog for choosing which resident records to export and where"""
+
+    FORMATS = [("CSV (Excel)", 'csv', ".csv"), ("JSON Lines", 'jsonl', ".jsonl")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Records")
+        self.setModal(True)
+        self.setFixedSize(450, 470)
+        self._center_on_parent(parent)
+        self.setProperty("page", "dialog")
+        self.path = None
+        self._setup_ui()
+
+    def _center_on_parent(self, parent):
+        """Center dialog on parent window"""
+        if parent:
+            parent_geo = parent.geometry()
+            x = parent_geo.x() + (parent_geo.width() - 450) // 2
+            y = parent_geo.y() + (parent_geo.height() - 470) // 2
+            self.move(x, y)
+
+    def _setup_ui(self):
+        """Initialize UI components"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 20, 30, 20)
+        layout.setSpacing(10)
+
+        # Title
+        title = QLabel("Export Records")
+        title.setProperty("role", "dialogTitle")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+
+        form_widget = QWidget()
+        form_widget.setProperty("form", True)
+        form_layout = QFormLayout(form_widget)
+        form_layout.setSpacing(12)
+
+        self.street = QComboBox()
+        self.street.addItems(["All Streets"] + validators.STREETS)
+        form_layout.addRow(QLabel("Street:"), self.street)
+
+        self.sex = QComboBox()
+        self.sex.addItems(["All", "Male", "Female"])
+        form_layout.addRow(QLabel("Sex:"), self.sex)
+
+        age_layout = QHBoxLayout()
+        self.min_age = QSpinBox()
+        self.min_age.setRange(0, 120)
+        self.max_age = QSpinBox()
+        self.max_age.setRange(0, 120)
+        self.max_age.setValue(120)
+        age_layout.addWidget(self.min_age)
+        age_layout.addWidget(QLabel("to"))
+        age_layout.addWidget(self.max_age)
+        form_layout.addRow(QLabel("Age:"), age_layout)
+
+        self.voter = QComboBox()
+        self.voter.addItems(["All Residents", "Registered Voters", "Non-Voters"])
+        form_layout.addRow(QLabel("Voter Status:"), self.voter)
+
+        self.file_format = QComboBox()
+        self.file_format.addItems([label for label, _, _ in self.FORMATS])
+        form_layout.addRow(QLabel("Format:"), self.file_format)
+
+        self.compress = QCheckBox("Compress (gzip)")
+        form_layout.addRow(QLabel(""), self.compress)
+
+        layout.addWidget(form_widget)
+        layout.addStretch()
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        export_btn = QPushButton("Export")
+        cancel_btn = QPushButton("Cancel")
+
+        export_btn.setProperty("variant", "primary")
+        cancel_btn.setProperty("variant", "danger")
+
+        export_btn.setMinimumHeight(40)
+        cancel_btn.setMinimumHeight(40)
+        export_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        cancel_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        export_btn.clicked.connect(self.choose_file)
+        cancel_btn.clicked.connect(self.reject)
+
+        button_layout.addStretch()
+        button_layout.addWidget(export_btn)
+        button_layout.addSpacing(10)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+    def choose_file(self):
+        """Ask where to save the export and accept"""
+        if self.min_age.value() > self.max_age.value():
+            QMessageBox.warning(self, "Invalid Age Range", "The minimum age can't be higher than the maximum age.")
+            return
+
+        label, _, extension = self.FORMATS[self.file_format.currentIndex()]
+        if self.compress.isChecked():
+            extension += ".gz"
+        path, _ = QFileDialog.getSaveFileName(self, "Export Records", f"residents{extension}",
+                                              f"{label} (*{extension})")
+        if not path:
+            return
+        if not path.endswith(extension):
+            path += extension
+
+        self.path = path
+        self.accept()
+
+    def get_export_options(self):
+        """Return the chosen format and filters as keyword arguments for export_residents()"""
+        options = {
+            'fmt': self.FORMATS[self.file_format.currentIndex()][1],
+            'compress': self.compress.isChecked(),
+        }
+        if self.street.currentIndex() > 0:
+            options['street'] = self.street.currentText()
+        if self.sex.currentIndex() > 0:
+            options['sex'] = self.sex.currentText()
+        # Leaving the full range keeps residents with no age recorded
+        if self.min_age.value() > self.min_age.minimum():
+            options['min_age'] = self.min_age.value()
+        if self.max_age.value() < self.max_age.maximum():
+            options['max_age'] = self.max_age.value()
+        if self.voter.currentIndex() > 0:
+            options['voter'] = self.voter.currentIndex() == 1
+        return options
+
+
+class DiagnosticsDialog(QDialog):
+    """Panel showing the recorded timings and slow calls, with a JSON dump"""
+
+    REFRESH_MS = 1000
+    COLUMNS = ["Timing", "Calls", "Mean (ms)", "p50 (ms)", "p95 (ms)", "Max (ms)", "Rows"]
+    SUMMARY_KEYS = ['calls', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms', 'rows']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(900, 650)
+        self.setProperty("page", "dialog")
+        self._setup_ui()
+
+        # Polls while open; metrics are written from several threads and have no signals
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def _setup_ui(self):
+        """Initialize UI components"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 20, 30, 20)
+        layout.setSpacing(10)
+
+        # Title
+        title = QLabel("Diagnostics")
+        title.setProperty("role", "dialogTitle")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+
+        self.record_check = QCheckBox("Record timings")
+        self.record_check.setChecked(metrics.enabled)
+        self.record_check.toggled.connect(self._set_recording)
+        self.since_label = QLabel()
+        record_layout = QHBoxLayout()
+        record_layout.addWidget(self.record_check)
+        record_layout.addStretch()
+        record_layout.addWidget(self.since_label)
+        layout.addLayout(record_layout)
+
+        self.timings_table = QTableWidget(0, len(self.COLUMNS))
+        self.timings_table.setObjectName("metricsTable")
+        self.timings_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.timings_table.verticalHeader().setVisible(False)
+        self.timings_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.timings_table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.timings_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.timings_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.timings_table, 3)
+
+        slow_label = QLabel(f"Slow calls (over {metrics.slow_call_ms:g} ms):")
+        slow_label.setProperty("role", "sectionHeader")
+        layout.addWidget(slow_label)
+
+        self.slow_calls_text = QPlainTextEdit()
+        self.slow_calls_text.setReadOnly(True)
+        self.slow_calls_text.setFont(QFont("Consolas", 9))
+        layout.addWidget(self.slow_calls_text, 2)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        save_btn = QPushButton("Save JSON")
+        close_btn = QPushButton("Close")
+
+        reset_btn.setProperty("variant", "warning")
+        save_btn.setProperty("variant", "primary")
+        close_btn.setProperty("variant", "secondary")
+
+        reset_btn.clicked.connect(self.reset_metrics)
+        save_btn.clicked.connect(self.save_json)
+        close_btn.clicked.connect(self.close)
+
+        button_layout.addWidget(reset_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(save_btn)
+        button_layout.addSpacing(10)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def _set_recording(self, enabled):
+        metrics.set_enabled(enabled)
+        self.refresh()
+
+    def refresh(self):
+        """Show the current snapshot"""
+        snapshot = metrics.snapshot()
+        self.since_label.setText(f"Since {snapshot['since']}")
+
+        timings = snapshot['timings']
+        self.timings_table.setRowCount(len(timings))
+        for row, (name, summary) in enumerate(timings.items()):
+            values = [name] + [f"{summary[key]:g}" for key in self.SUMMARY_KEYS]
+            for column, value in enumerate(values):
+                item = self.timings_table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    self.timings_table.setItem(row, column, item)
+                item.setText(value)
+
+        text = self._format_slow_calls(snapshot['slow_calls'])
+        if text != self.slow_calls_text.toPlainText():
+            self.slow_calls_text.setPlainText(text)
+
+    def _format_slow_calls(self, slow_calls):
+        """Newest first, each with its statements and their query plans"""
+        if not slow_calls:
+            return "No slow calls recorded."
+        lines = []
+        for call in reversed(slow_calls):
+            lines.append(f"{call['at']}  {call['name']}  {call['ms']:.1f} ms  [{call['thread']}]")
+            for statement in call['statements']:
+                lines.append(f"    {' '.join(statement['sql'].split())}")
+                for step in statement['plan'] or []:
+                    lines.append(f"        {step}")
+            lines.append("")
+        return '\n'.join(lines)
+
+    def reset_metrics(self):
+        """Clear what has been recorded so far"""
+        metrics.reset()
+        self.refresh()
+
+    def save_json(self):
+        """Write the snapshot to a JSON file of the user's choice"""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Metrics", metrics.path or DEFAULT_METRICS_FILE,
+                                              "JSON (*.json)")
+        if not path:
+            return
+        try:
+            metrics.write(path)
+        except OSError as error:
+            QMessageBox.warning(self, "Save Failed", f"The metrics could not be written:\n{error}")
@@ -0,0 +1,252 @@
+"""
+Runtime metrics for database calls and UI hot spots.
+Methods decorated with metrics.measure() record their latency in a histogram
+(and, when they return a list, how many rows they returned). While recording,
+every SQL statement is seen through sqlite3 trace callbacks, and calls slower
+than the slow-call threshold keep their statements with an EXPLAIN QUERY PLAN
+of each SELECT.
+
+Recording is off unless the BARANGAY_METRICS environment variable is set to
+a report path, the app is started with --metrics[=PATH], or it is switched
+on from the diagnostics panel. While it is off, a measured call costs one
+attribute check and no trace callbacks are installed.
+"""
+import bisect
+import functools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+
+
+METRICS_ENV = 'BARANGAY_METRICS'
+METRICS_FLAG = '--metrics'
+DEFAULT_METRICS_FILE = 'metrics.json'
+
+SLOW_CALL_ENV = 'BARANGAY_SLOW_CALL_MS'
+DEFAULT_SLOW_CALL_MS = 100.0
+
+# Upper bounds of the histogram buckets in ms; the last bucket is open
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# How many slow calls are kept, and how many statements of each
+SLOW_CALLS_KEPT = 100
+STATEMENTS_PER_CALL = 20
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, plus call and row totals"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, ms, rows=None):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if rows is not None:
+            self.rows += rows
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of calls"""
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(bound, round(self.max_ms, 3))
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'calls': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 3),
+            'rows': self.rows,
+            'buckets': dict(zip([str(bound) for bound in BUCKET_BOUNDS_MS] + ['inf'], self.buckets)),
+        }
+
+
+class Metrics:
+    """Collects histograms and slow calls; shared through the module-level metrics"""
+
+    def __init__(self, path=None, slow_call_ms=DEFAULT_SLOW_CALL_MS):
+        self.path = path
+        self.enabled = path is not None
+        self.slow_call_ms = slow_call_ms
+        self.started = time.time()
+        self.histograms = {}
+        self.slow_calls = deque(maxlen=SLOW_CALLS_KEPT)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self._explain_lock = threading.Lock()
+        self._explain_connections = {}
+
+    def measure(self, name):
+        """Decorator that records the latency of every call to a function under name"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                return self._call(name, function, args, kwargs)
+            return wrapper
+        return decorate
+
+    def _call(self, name, function, args, kwargs):
+        """Run a measured call while recording"""
+        stack = self._statement_stack()
+        statements = []
+        stack.append(statements)
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+        rows = len(result) if isinstance(result, list) else None
+        self.record(name, elapsed_ms, rows, statements)
+        return result
+
+    def _statement_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def record(self, name, elapsed_ms, rows=None, statements=()):
+        """Add one call to the histogram for name, keeping it if it was slow"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(elapsed_ms, rows)
+
+        if elapsed_ms >= self.slow_call_ms:
+            self.slow_calls.append({
+                'name': name,
+                'ms': round(elapsed_ms, 3),
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'thread': threading.current_thread().name,
+                'statements': [
+                    {'sql': sql, 'plan': self._explain(db_name, sql)} for db_name, sql in statements
+                ],
+            })
+
+    # SQL statements
+
+    def watch(self, conn, db_name):
+        """Follow the statements run on a connection (trace callback installed while recording)"""
+        with self._lock:
+            self._connections.append((conn, db_name))
+        if self.enabled:
+            self._set_trace(conn, db_name)
+
+    def _set_trace(self, conn, db_name):
+        """Install or remove the trace callback; returns False if the connection has been closed"""
+        callback = None
+        if self.enabled:
+            def callback(sql):
+                self._on_statement(db_name, sql)
+        try:
+            conn.set_trace_callback(callback)
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def _on_statement(self, db_name, sql):
+        """sqlite3 trace callback: attach a statement to the innermost measured call"""
+        stack = getattr(self._local, 'stack', None)
+        if not stack or sql.startswith('--'):  # "-- TRIGGER name" lines
+            return
+        statements = stack[-1]
+        if len(statements) < STATEMENTS_PER_CALL:
+            statements.append((db_name, sql))
+
+    def _explain(self, db_name, sql):
+        """Return EXPLAIN QUERY PLAN lines for a read statement, or None"""
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        with self._explain_lock:
+            try:
+                conn = self._explain_connections.get(db_name)
+                if conn is None:
+                    conn = sqlite3.connect(db_name, check_same_thread=False)
+                    self._explain_connections[db_name] = conn
+                return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+            except sqlite3.Error as error:
+                return [f"(no plan: {error})"]
+
+    # Control
+
+    def set_enabled(self, enabled):
+        """Start or stop recording"""
+        self.enabled = enabled
+        with self._lock:
+            connections = list(self._connections)
+        open_connections = [(conn, db_name) for conn, db_name in connections if self._set_trace(conn, db_name)]
+        with self._lock:
+            self._connections = open_connections + self._connections[len(connections):]
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.histograms = {}
+            self.slow_calls.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Return everything recorded as a JSON-serialisable dict"""
+        with self._lock:
+            histograms = {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+        return {
+            'enabled': self.enabled,
+            'since': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+            'slow_call_ms': self.slow_call_ms,
+            'timings': histograms,
+            'slow_calls': list(self.slow_calls),
+        }
+
+    def write(self, path=None):
+        """Write the snapshot as JSON and return its path"""
+        path = path or self.path or DEFAULT_METRICS_FILE
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file, indent=1)
+        return path
+
+
+def metrics_path(argv=None, environ=None):
+    """Return where to write metrics, from --metrics[=PATH] or the environment (None if off)"""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+
+    for arg in argv[1:]:
+        if arg == METRICS_FLAG:
+            return DEFAULT_METRICS_FILE
+        if arg.startswith(METRICS_FLAG + '='):
+            return arg.split('=', 1)[1] or DEFAULT_METRICS_FILE
+    return environ.get(METRICS_ENV) or None
+
+
+def _slow_call_ms(environ=None):
+    environ = os.environ if environ is None else environ
+    try:
+        return float(environ.get(SLOW_CALL_ENV, DEFAULT_SLOW_CALL_MS))
+    except ValueError:
+        return DEFAULT_SLOW_CALL_MS
+
+
+# Shared metrics registry
+metrics = Metrics(metrics_path(), _slow_call_ms())
@@ -2,25 +2,82 @@
 """
 
 mao ni sya ang entry point og mag initialize sa app sa main window
+
+Pass --trace-startup[=PATH] (or set BARANGAY_TRACE_STARTUP) to write a
+startup trace, and --exit-after-startup to quit once the landing page is up.
+Pass --kiosk to open the registration form in kiosk mode for registration drives.
+Pass --metrics[=PATH] (or set BARANGAY_METRICS) to record database and UI
+timings from the start and write them as JSON on exit.
 """
 import sys
-from PyQt6.QtWidgets import QApplication
-from database_manager import DatabaseManager
-from main_window import MainWindow
+from startup_trace import tracer
+
+with tracer.phase("import PyQt6"):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+with tracer.phase("import application modules"):
+    import theme
+    from database_manager import DatabaseManager
+    from instrumentation import metrics
+    from db_worker import DatabaseWorker
+    from main_window import MainWindow
+
+EXIT_AFTER_STARTUP_FLAG = '--exit-after-startup'
+KIOSK_FLAG = '--kiosk'
 
 
 def main():
     """Initialize and run the application"""
+    exit_after_startup = EXIT_AFTER_STARTUP_FLAG in sys.argv
+
     # Create application instance
-    app = QApplication(sys.argv)
+    with tracer.phase("QApplication"):
+        app = QApplication(sys.argv)
 
+    # One stylesheet for the whole application, parsed once
+    with tracer.phase("apply stylesheet"):
+        theme.apply(app)
 
     # Initialize database manager
-    db_manager = DatabaseManager()
+    with tracer.phase("DatabaseManager.init_database"):
+        # The column cache loads on the first filtered statistics and keeps them off the disk
+        db_manager = DatabaseManager(column_cache=True)
+
+    # Start the background worker that runs database calls off the GUI thread
+    with tracer.phase("start database worker"):
+        db_worker = DatabaseWorker(db_manager)
+        db_worker.start()
+        # A second one for exports, so that searches and page loads don't queue behind them
+        export_worker = DatabaseWorker(db_manager)
+        export_worker.start()
+
+    # Stop the workers before closing the connections they use
+    app.aboutToQuit.connect(db_worker.stop)
+    app.aboutToQuit.connect(export_worker.stop)
+    app.aboutToQuit.connect(db_manager.close)
 
     # Create and show main window
-    main_window = MainWindow(db_manager)
-    main_window.show()
+    with tracer.phase("MainWindow"):
+        main_window = MainWindow(db_manager, db_worker, export_worker)
+    with tracer.phase("MainWindow.show"):
+        main_window.show()
+
+    # Registration drives go straight to the form
+    if KIOSK_FLAG in sys.argv:
+        main_window.open_kiosk()
+
+    # Runs on the first pass of the event loop, once the landing page has been painted
+    QTimer.singleShot(0, lambda: tracer.mark("first frame"))
+    if tracer.enabled:
+        app.aboutToQuit.connect(tracer.write)
+    if metrics.enabled:
+        app.aboutToQuit.connect(metrics.write)
+
+    if exit_after_startup:
+        QTimer.singleShot(0, app.quit)
+    else:
+        # Build the other screens while the user looks at the landing page
+        main_window.prewarm_windows()
 
     # Start event loop
     sys.exit(app.exec())
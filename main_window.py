@@ -5,21 +5,22 @@ Provides navigation to registration and admin sections.
 """
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QGraphicsDropShadowEffect
-from styles import Styles
-from dialogs import AdminLoginWindow
-from register_window import RegisterWindow
-from admin_dashboard import AdminDashboard
-from statistics_window import StatisticsWindow
+from background_widget import BackgroundWidget
+from startup_trace import tracer
+from window_manager import WindowManager
 
 
 class MainWindow(QWidget):
     """Main landing page window"""
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, db_worker, export_worker=None):
         super().__init__()
         self.db_manager = db_manager
+        self.db_worker = db_worker
+        # Runs exports, which can take seconds, without holding up db_worker (default: db_worker)
+        self.export_worker = export_worker or db_worker
+        self.windows = WindowManager(db_manager, self)
         self.setWindowTitle("REGISTRATION")
         self.resize(900, 500)
         self._setup_ui()
@@ -27,16 +28,14 @@ class MainWindow(QWidget):
     def _setup_ui(self):
         """Initialize UI components"""
         # Background image
-        self.background = QLabel(self)
-        pixmap = QPixmap("Borcelle University FINAL_BACKGROUND.png")
-        self.background.setPixmap(pixmap)
-        self.background.setScaledContents(True)
+        self.background = BackgroundWidget("Borcelle University FINAL_BACKGROUND.png", self)
         self.background.resize(self.size())
 
         # Create buttons with custom sizes
-        reg_button = self._create_button("REGISTER", self.open_register_window)
-        admin_button = self._create_button("ADMIN", self.open_admin_login)
-        stats_button = self._create_button("STATISTICS", self.open_statistics)
+        with tracer.phase("create menu buttons"):
+            reg_button = self._create_button("REGISTER", self.open_register_window)
+            admin_button = self._create_button("ADMIN", self.open_admin_login)
+            stats_button = self._create_button("STATISTICS", self.open_statistics)
 
         # Layout
         main_layout = QVBoxLayout(self)
@@ -57,22 +56,7 @@ class MainWindow(QWidget):
         """Create a styled button with shadow effect"""
         button = QPushButton(text)
 
-        # Custom stylesheet with larger dimensions
-        button.setStyleSheet("""
-            QPushButton {
-                font-size: 16px;
-                font-weight: bold;
-                color: #0D47A1;
-                border: 3px solid #0D47A1;
-                background-color: white;
-                border-radius: 12px;
-                padding: 15px 35px;
-            }
-            QPushButton:hover {
-                background-color: #0D47A1;
-                color: white;
-            }
-        """)
+        button.setProperty("variant", "menu")
 
         button.setCursor(Qt.CursorShape.PointingHandCursor)
         button.clicked.connect(callback)
@@ -98,22 +82,27 @@ class MainWindow(QWidget):
         """Handle window resize to scale background"""
         self.background.resize(self.size())
 
+    def prewarm_windows(self):
+        """Build the other screens in idle time once the landing page is up"""
+        self.windows.prewarm()
+
     def open_register_window(self):
         """Open the registration form window"""
-        self.reg_window = RegisterWindow(self.db_manager, self)
-        self.reg_window.show()
-        self.hide()
+        self.windows.open('register')
+
+    def open_kiosk(self):
+        """Open the registration form in kiosk mode (queued saves, no confirmation dialogs)"""
+        self.windows.window('register').set_kiosk_mode(True)
+        self.windows.open('register')
 
     def open_admin_login(self):
         """Open admin login dialog and dashboard if successful"""
+        from dialogs import AdminLoginWindow
+
         login_dialog = AdminLoginWindow(self)
         if login_dialog.exec() == QDialog.DialogCode.Accepted:
-            self.admin_dashboard = AdminDashboard(self.db_manager, self)
-            self.admin_dashboard.show()
-            self.hide()
+            self.windows.open('admin')
 
     def open_statistics(self):
         """Open statistics window"""
-        self.stats_window = StatisticsWindow(self.db_manager, self)
-        self.stats_window.show()
-        self.hide()
+        self.windows.open('statistics')
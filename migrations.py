@@ -0,0 +1,272 @@
+"""
+Schema migrations for the barangay registration database.
+Each step bumps PRAGMA user_version so existing databases upgrade in place.
+"""
+
+
+def _create_residents_table(conn):
+    """Version 1: base residents table (already present on pre-migration databases)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            surname TEXT NOT NULL,
+            firstname TEXT NOT NULL,
+            middlename TEXT,
+            sex TEXT,
+            dob TEXT,
+            age INTEGER,
+            birthplace TEXT,
+            civil_status TEXT,
+            nationality TEXT,
+            street TEXT,
+            contact_number TEXT,
+            email TEXT,
+            years_residency INTEGER,
+            voter_id TEXT,
+            household_relation TEXT,
+            emergency_name TEXT,
+            emergency_relation TEXT,
+            emergency_contact TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_secondary_indexes(conn):
+    """Version 2: indexes for name lookups, filters and created_at ordering"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_surname ON residents (surname COLLATE NOCASE)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_firstname ON residents (firstname COLLATE NOCASE)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_voter_id ON residents (voter_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_street ON residents (street)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_sex ON residents (sex)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_age ON residents (age)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_residents_created_at ON residents (created_at)')
+
+
+def fts5_available(conn):
+    """Check whether this SQLite build was compiled with the FTS5 extension"""
+    options = {row[0] for row in conn.execute('PRAGMA compile_options')}
+    return 'ENABLE_FTS5' in options
+
+
+def _add_fulltext_index(conn):
+    """Version 3: FTS5 index over the searchable columns, kept in sync by triggers"""
+    if not fts5_available(conn):
+        # search_records falls back to LIKE when the table is missing
+        return
+
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS residents_fts USING fts5(
+            surname, firstname, middlename, street, voter_id, contact_number,
+            content='residents',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS residents_fts_insert AFTER INSERT ON residents BEGIN
+            INSERT INTO residents_fts (rowid, surname, firstname, middlename, street, voter_id, contact_number)
+            VALUES (new.id, new.surname, new.firstname, new.middlename, new.street, new.voter_id, new.contact_number);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS residents_fts_delete AFTER DELETE ON residents BEGIN
+            INSERT INTO residents_fts (residents_fts, rowid, surname, firstname, middlename, street, voter_id, contact_number)
+            VALUES ('delete', old.id, old.surname, old.firstname, old.middlename, old.street, old.voter_id, old.contact_number);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS residents_fts_update AFTER UPDATE ON residents BEGIN
+            INSERT INTO residents_fts (residents_fts, rowid, surname, firstname, middlename, street, voter_id, contact_number)
+            VALUES ('delete', old.id, old.surname, old.firstname, old.middlename, old.street, old.voter_id, old.contact_number);
+            INSERT INTO residents_fts (rowid, surname, firstname, middlename, street, voter_id, contact_number)
+            VALUES (new.id, new.surname, new.firstname, new.middlename, new.street, new.voter_id, new.contact_number);
+        END
+    ''')
+    conn.execute("INSERT INTO residents_fts (residents_fts) VALUES ('rebuild')")
+
+
+# Age group edges baked into the resident_counts triggers. Frozen with migration 4:
+# changing the groups needs a new migration that recreates the triggers.
+COUNTED_AGE_EDGES = (17, 30, 45, 60)
+
+# Dimensions kept in resident_counts, as (dimension, SQL expression over a residents row)
+COUNTED_DIMENSIONS = (
+    ('sex', "COALESCE({row}sex, '')"),
+    ('street', "COALESCE({row}street, '')"),
+    ('civil_status', "COALESCE({row}civil_status, '')"),
+)
+
+
+def age_group_expression(row=''):
+    """SQL CASE giving the age group label of a residents row ('' when age is unknown)"""
+    cases = []
+    lower = 0
+    for edge in COUNTED_AGE_EDGES:
+        cases.append(f"WHEN {row}age <= {edge} THEN '{lower}-{edge}'")
+        lower = edge + 1
+    return f"CASE WHEN {row}age IS NULL THEN '' {' '.join(cases)} ELSE '{lower}+' END"
+
+
+def age_group_labels(age_edges):
+    """Return labels like '0-17', '18-30', ..., '61+' for a set of age group edges"""
+    labels = []
+    lower = 0
+    for edge in age_edges:
+        labels.append(f'{lower}-{edge}')
+        lower = edge + 1
+    labels.append(f'{lower}+')
+    return labels
+
+
+def _counted_values(row):
+    """SQL VALUES rows of (dimension, value) that one residents row contributes to"""
+    values = ["('total', '')"]
+    values += [f"('{dimension}', {expression.format(row=row)})" for dimension, expression in COUNTED_DIMENSIONS]
+    values.append(f"('age_group', {age_group_expression(row)})")
+    return ', '.join(values)
+
+
+def resident_counts_query():
+    """SQL that recomputes every resident_counts row from the residents table"""
+    parts = ["SELECT 'total', '', COUNT(*) FROM residents"]
+    for dimension, expression in COUNTED_DIMENSIONS:
+        parts.append(f"SELECT '{dimension}', {expression.format(row='')}, COUNT(*) FROM residents GROUP BY 2")
+    parts.append(f"SELECT 'age_group', {age_group_expression()}, COUNT(*) FROM residents GROUP BY 2")
+    return ' UNION ALL '.join(parts)
+
+
+def rebuild_resident_counts(conn):
+    """Replace the contents of resident_counts with freshly computed counts"""
+    conn.execute('DELETE FROM resident_counts')
+    conn.execute(f'INSERT INTO resident_counts (dimension, value, resident_count) {resident_counts_query()}')
+
+
+def _add_resident_counts(conn):
+    """Version 4: summary counts by sex, age group, street and civil status kept exact by triggers"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS resident_counts (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            resident_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+
+    increment = '''
+        INSERT INTO resident_counts (dimension, value, resident_count)
+        SELECT column1, column2, 1 FROM (VALUES {values}) WHERE true
+        ON CONFLICT (dimension, value) DO UPDATE SET resident_count = resident_count + 1;
+    '''
+    decrement = '''
+        UPDATE resident_counts SET resident_count = resident_count - 1
+        WHERE (dimension, value) IN (VALUES {values});
+    '''
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS resident_counts_insert AFTER INSERT ON residents BEGIN
+            {increment.format(values=_counted_values('new.'))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS resident_counts_delete AFTER DELETE ON residents BEGIN
+            {decrement.format(values=_counted_values('old.'))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS resident_counts_update
+        AFTER UPDATE OF sex, age, street, civil_status ON residents BEGIN
+            {decrement.format(values=_counted_values('old.'))}
+            {increment.format(values=_counted_values('new.'))}
+        END
+    ''')
+    rebuild_resident_counts(conn)
+
+
+def _add_change_log(conn):
+    """Version 5: changelog of resident inserts, updates and deletes, written by triggers.
+
+    Every change gets the next version number, so a station can ask which
+    residents changed since the version it last saw, whoever wrote them.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS resident_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            resident_id INTEGER NOT NULL
+        )
+    ''')
+    for op, event, row in (('insert', 'INSERT', 'new'), ('update', 'UPDATE', 'new'), ('delete', 'DELETE', 'old')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS resident_changes_{op} AFTER {event} ON residents BEGIN
+                INSERT INTO resident_changes (op, resident_id) VALUES ('{op}', {row}.id);
+            END
+        ''')
+
+
+def _index_one_letter_prefixes(conn):
+    """Version 6: recreate residents_fts with a prefix index for one-letter searches too"""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'residents_fts'").fetchone()
+    if not exists or not fts5_available(conn):
+        # Without the index (and its triggers) from version 3 there is nothing to redo
+        return
+
+    # The insert/update/delete triggers name the table, so they keep working once it is back
+    conn.execute('DROP TABLE IF EXISTS residents_fts')
+    conn.execute('''
+        CREATE VIRTUAL TABLE residents_fts USING fts5(
+            surname, firstname, middlename, street, voter_id, contact_number,
+            content='residents',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        )
+    ''')
+    conn.execute("INSERT INTO residents_fts (residents_fts) VALUES ('rebuild')")
+
+
+# Position in the list is the schema version the step upgrades to (index 0 -> version 1).
+# Only ever append; never edit or reorder a step that has shipped.
+MIGRATIONS = [
+    _create_residents_table,
+    _add_secondary_indexes,
+    _add_fulltext_index,
+    _add_resident_counts,
+    _add_change_log,
+    _index_one_letter_prefixes,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    """Return the schema version stored in the database file"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration and return the list of versions applied"""
+    applied = []
+
+    for version, step in enumerate(MIGRATIONS, start=1):
+        if schema_version(conn) >= version:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another station may have migrated while we waited for the lock
+            if schema_version(conn) < version:
+                step(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                applied.append(version)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    if applied:
+        conn.execute('ANALYZE')
+        conn.commit()
+
+    return applied
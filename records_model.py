@@ -0,0 +1,246 @@
+"""
+Table model for the admin records view.
+Rows are pulled from SQLite a page at a time as the view scrolls.
+"""
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from instrumentation import metrics
+
+
+COLUMN_HEADERS = [
+    "ID", "Surname", "First Name", "Middle Name", "Sex", "Date of Birth",
+    "Age", "Place of Birth", "Civil Status", "Nationality",
+    "Street", "Contact Number", "Email", "Years of Residency",
+    "Voter's ID", "Household Relation", "Emergency Contact"
+]
+
+# Record key shown in each column; None marks the combined emergency contact column
+COLUMN_KEYS = [
+    'id', 'surname', 'firstname', 'middlename', 'sex', 'dob',
+    'age', 'birthplace', 'civil_status', 'nationality',
+    'street', 'contact_number', 'email', 'years_residency',
+    'voter_id', 'household_relation', None
+]
+
+
+class ResidentTableModel(QAbstractTableModel):
+    """Lazily-loaded model of resident records (all records or a search result).
+
+    With a db_worker, pages load on the worker thread and rows appear when
+    they arrive; without one they load synchronously in fetchMore().
+    sync() catches up with changes made since the first page was read.
+    """
+
+    PAGE_SIZE = 200
+
+    first_page_loaded = pyqtSignal()
+    load_failed = pyqtSignal(object)
+
+    def __init__(self, db_manager, db_worker=None, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.db_worker = db_worker
+        self.search_term = ''
+        self._records = []
+        self._exhausted = False
+        self._loading = False
+        # Data version the loaded rows are up to date with (None until the first page is in)
+        self.version = None
+        self._job_key = ('records', id(self))
+        self._changes_key = ('record changes', id(self))
+
+    def set_search_term(self, search_term):
+        """Show records matching search_term (all records when empty), starting over"""
+        if self.db_worker is not None:
+            self.db_worker.cancel(self._job_key)
+            self.db_worker.cancel(self._changes_key)
+
+        self.beginResetModel()
+        self.search_term = search_term
+        self._records = []
+        self._exhausted = False
+        self._loading = False
+        self.version = None
+        self.endResetModel()
+        self.fetchMore()
+
+    def refine_search(self, search_term):
+        """Narrow the loaded results to a longer search term without querying again.
+
+        Only possible when the new term extends the current one (so its
+        matches are a subset) and every current match is already loaded.
+        Returns False when a fresh query is needed instead.
+        """
+        if not self.search_term or self._loading or not self._exhausted:
+            return False
+        if not search_term.casefold().startswith(self.search_term.casefold()):
+            return False
+
+        matches = [record for record in self._records if self.db_manager.matches_search(record, search_term)]
+        self.beginResetModel()
+        self.search_term = search_term
+        self._records = matches
+        self.endResetModel()
+        return True
+
+    def refresh(self):
+        """Drop loaded rows and start again from the first page"""
+        self.set_search_term(self.search_term)
+
+    def sync(self):
+        """Apply the records added, updated or deleted since the rows were loaded.
+
+        Does nothing when nothing changed. Search results are ranked, so
+        any change reruns the search; the full listing is patched in place.
+        """
+        if self.version is None:
+            return
+        if self.db_worker is None:
+            self._apply_changes(self._fetch_changes(self.version))
+            return
+        self.db_worker.submit(self._fetch_changes, self.version, key=self._changes_key,
+                              on_result=self._apply_changes, on_error=self.load_failed.emit)
+
+    def _fetch_changes(self, version):
+        """Read the changes since version (runs on the worker thread when there is one)"""
+        if self.search_term:
+            changes = self.db_manager.changes_since(version)
+            return None if changes is None else (changes[0], [], list(changes[1]))
+        return self.db_manager.get_changes(version)
+
+    @metrics.measure('ui.records_model.apply_changes')
+    def _apply_changes(self, changes):
+        """Patch the loaded rows with changed records, or reload when that isn't possible"""
+        if changes is None:
+            self.refresh()
+            return
+        version, records, deleted_ids = changes
+        if version == self.version:
+            return
+        if self.search_term:
+            self.refresh()
+            return
+
+        self.version = version
+        rows = {record['id']: row for row, record in enumerate(self._records)}
+        for row in sorted((rows[record_id] for record_id in deleted_ids if record_id in rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._records[row]
+            self.endRemoveRows()
+
+        for record in records:
+            self._put_record(record)
+
+    def _put_record(self, record):
+        """Replace a loaded record, or insert a new one where it belongs in the newest-first list"""
+        # Rows are ordered by descending id; find the first row with an id not above this one
+        low, high = 0, len(self._records)
+        while low < high:
+            middle = (low + high) // 2
+            if self._records[middle]['id'] > record['id']:
+                low = middle + 1
+            else:
+                high = middle
+        row = low
+
+        if row < len(self._records) and self._records[row]['id'] == record['id']:
+            self._records[row] = record
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMN_HEADERS) - 1))
+        elif row < len(self._records) or self._exhausted:
+            # Past the last loaded row it arrives with a later page instead
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._records.insert(row, record)
+            self.endInsertRows()
+
+    def is_loading(self):
+        """Check whether a page is still being loaded"""
+        return self._loading
+
+    def record_id(self, row):
+        """Return the database id of the record shown in a row"""
+        return self._records[row]['id']
+
+    def _fetch_page(self, search_term, after_id, offset):
+        """Load one page of records (runs on the worker thread when there is one).
+
+        Returns (data version, records). The version is only read with the
+        first page, and before it, so no change can slip between the two.
+        """
+        version = self.db_manager.data_version() if after_id is None and offset == 0 else None
+        if search_term:
+            # Ranked search results have no stable key, so they page by offset
+            return version, self.db_manager.search_records(search_term, limit=self.PAGE_SIZE, offset=offset)
+        return version, self.db_manager.page(after_id=after_id, limit=self.PAGE_SIZE)
+
+    @metrics.measure('ui.records_model.append_page')
+    def _append_page(self, page):
+        """Add a loaded page to the end of the model"""
+        version, records = page
+        self._loading = False
+        first_page = self.version is None
+        if first_page:
+            self.version = version
+        if len(records) < self.PAGE_SIZE:
+            self._exhausted = True
+
+        if records:
+            first = len(self._records)
+            self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+            self._records.extend(records)
+            self.endInsertRows()
+
+        if first_page:
+            self.first_page_loaded.emit()
+
+    def _page_failed(self, error):
+        """Stop paging after a failed load and report it"""
+        self._loading = False
+        self._exhausted = True
+        self.load_failed.emit(error)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMN_HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        after_id = self._records[-1]['id'] if self._records else None
+        args = (self.search_term, after_id, len(self._records))
+
+        if self.db_worker is None:
+            self._append_page(self._fetch_page(*args))
+            return
+
+        self._loading = True
+        self.db_worker.submit(
+            self._fetch_page, *args,
+            key=self._job_key, on_result=self._append_page, on_error=self._page_failed
+        )
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        record = self._records[index.row()]
+        key = COLUMN_KEYS[index.column()]
+        if key is None:
+            return f"{record['emergency_name']} ({record['emergency_relation']}) - {record['emergency_contact']}"
+
+        value = record[key]
+        return '' if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMN_HEADERS[section]
+        return None
@@ -4,21 +4,48 @@ diri mag register ang mga tao
 """
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, QDate, QRegularExpression
-from PyQt6.QtGui import QRegularExpressionValidator
-from styles import Styles
-import re
+from PyQt6.QtGui import QKeySequence, QRegularExpressionValidator, QShortcut
+import validators
 
 
 class RegisterWindow(QWidget):
-    """Registration form window"""
+    """Registration form window.
+
+    In kiosk mode (see set_kiosk_mode) the form is meant to stay open for a
+    whole registration drive: Add Record queues the save in the background
+    and clears the form at once, and the outcome of each save is shown in a
+    status line instead of a message box, so the clerk can keep typing.
+    """
+
+    # Choices offered by the drop-downs (after their "Select ..." placeholder)
+    CIVIL_STATUSES = ["Single", "Married", "Widowed", "Separated", "Divorced"]
+    NATIONALITIES = [
+        "Filipino", "American", "Chinese", "Japanese", "Korean",
+        "British", "Australian", "Canadian", "Indian", "Other"
+    ]
+    STREETS = validators.STREETS
+    HOUSEHOLD_RELATIONS = [
+        "Head of Family", "Spouse", "Son", "Daughter",
+        "Father", "Mother", "Brother", "Sister", "Grandfather", "Grandmother",
+        "Grandson", "Granddaughter", "Uncle", "Aunt", "Nephew", "Niece",
+        "Cousin", "Son-in-law", "Daughter-in-law", "Other"
+    ]
+    EMERGENCY_RELATIONS = [
+        "Spouse", "Parent", "Sibling", "Child",
+        "Grandparent", "Grandchild", "Uncle/Aunt", "Cousin",
+        "Friend", "Neighbor", "Other"
+    ]
 
     def __init__(self, db_manager, main_window):
         super().__init__()
         self.db_manager = db_manager
         self.main_window = main_window
+        self.db_worker = main_window.db_worker
+        self.kiosk_mode = False
+        self._pending_saves = 0
+        self._failed_records = []
         self.setWindowTitle("Barangay Registration Form")
-        self.showMaximized()
-        self.setStyleSheet("background-color: white; font-family: 'Segoe UI'; font-size: 18px;")
+        self.setProperty("page", "register")
         self._setup_ui()
 
     def _setup_ui(self):
@@ -29,69 +56,58 @@ class RegisterWindow(QWidget):
 
         # Title
         title = QLabel("Barangay Registration Form")
-        title.setStyleSheet("font-size: 40px; font-weight: bold; color: #0D47A1;")
+        title.setProperty("role", "pageTitle")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(title)
 
+        # Save status line (kiosk mode only)
+        main_layout.addWidget(self._create_status_bar())
+
         # Scroll Area for the form
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background-color: white; }")
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setProperty("role", "formScroll")
 
         # Form container
         form_container = QWidget()
+        form_container.setProperty("form", True)
         form_layout = QGridLayout()
         form_layout.setHorizontalSpacing(15)
         form_layout.setVerticalSpacing(6)
         form_layout.setContentsMargins(0, 0, 0, 0)
         form_container.setLayout(form_layout)
 
-        # Enhanced form field style with explicit black text for all states
-        form_container.setStyleSheet(Styles.FORM_FIELD_STYLE + """
-            QLineEdit {
-                color: black !important;
-                background-color: white;
-            }
-            QLineEdit:focus {
-                color: black !important;
-            }
-            QSpinBox {
-                color: black !important;
-                background-color: white;
-            }
-            QSpinBox:focus {
-                color: black !important;
-            }
-            QComboBox {
-                color: black !important;
-                background-color: white;
-            }
-            QComboBox:focus {
-                color: black !important;
-            }
-            QComboBox:editable {
-                color: black !important;
-            }
-            QComboBox QAbstractItemView {
-                color: black !important;
-                background-color: white;
-                selection-background-color: #E3F2FD;
-                selection-color: black !important;
-            }
-            QTextEdit {
-                color: black !important;
-                background-color: white;
-            }
-            QTextEdit:focus {
-                color: black !important;
-            }
-        """)
-
         # Create all form sections
         self._create_form_fields(form_layout)
 
-        scroll.setWidget(form_container)
-        main_layout.addWidget(scroll)
+        self.scroll.setWidget(form_container)
+        main_layout.addWidget(self.scroll)
+
+        # Ctrl+Enter registers from any field (enabled in kiosk mode)
+        self.submit_shortcut = QShortcut(QKeySequence("Ctrl+Return"), self)
+        self.submit_shortcut.activated.connect(self.add_record)
+        self.submit_shortcut.setEnabled(False)
+
+    def _create_status_bar(self):
+        """Create the line that reports queued saves in kiosk mode"""
+        self.status_label = QLabel()
+        self.status_label.setProperty("role", "saveStatus")
+
+        self.retry_btn = QPushButton("Retry")
+        self.retry_btn.setProperty("variant", "warning")
+        self.retry_btn.clicked.connect(self.retry_failed_saves)
+        self.retry_btn.hide()
+
+        status_layout = QHBoxLayout()
+        status_layout.setContentsMargins(0, 4, 0, 4)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        status_layout.addWidget(self.retry_btn)
+
+        self.status_bar = QWidget()
+        self.status_bar.setLayout(status_layout)
+        self.status_bar.hide()
+        return self.status_bar
 
     def _create_form_fields(self, form_layout):
         """Create all form input fields organized by section"""
@@ -127,61 +143,7 @@ class RegisterWindow(QWidget):
         self.dob.setDisplayFormat("dd/MM/yyyy")
         self.dob.setDate(QDate.currentDate())
         self.dob.setMinimumHeight(28)
-        # Style the calendar popup for visibility
-        self.dob.setStyleSheet("""
-            QDateEdit {
-                padding: 8px;
-                border: 2px solid #999999;
-                border-radius: 6px;
-                font-size: 13px;
-                background-color: white;
-                color: black;
-            }
-            QDateEdit:focus {
-                border: 2px solid #1976D2;
-            }
-            QCalendarWidget {
-                background-color: white;
-                border: 2px solid #1976D2;
-            }
-            QCalendarWidget QWidget {
-                background-color: white;
-            }
-            QCalendarWidget QAbstractItemView:enabled {
-                color: black;
-                background-color: white;
-                selection-background-color: #E3F2FD;
-                selection-color: black;
-                border: 1px solid #1976D2;
-            }
-            QCalendarWidget QAbstractItemView:disabled {
-                color: #BDBDBD;
-            }
-            QCalendarWidget QToolButton {
-                color: black;
-                background-color: white;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-                padding: 5px;
-            }
-            QCalendarWidget QToolButton:hover {
-                background-color: #E3F2FD;
-                border: 1px solid #1976D2;
-            }
-            QCalendarWidget QMenu {
-                background-color: white;
-                color: black;
-            }
-            QCalendarWidget QSpinBox {
-                background-color: white;
-                color: black;
-                selection-background-color: #E3F2FD;
-                selection-color: black;
-            }
-            QCalendarWidget QWidget#qt_calendar_navigationbar {
-                background-color: white;
-            }
-        """)
+        self.dob.setObjectName("registerDob")
         form_layout.addWidget(QLabel("Date of Birth: *"), row, 0)
         form_layout.addWidget(self.dob, row, 1)
 
@@ -197,7 +159,7 @@ class RegisterWindow(QWidget):
         form_layout.addWidget(self.birthplace, row, 1)
 
         self.civil_status = QComboBox()
-        self.civil_status.addItems(["Select Civil Status", "Single", "Married", "Widowed", "Separated", "Divorced"])
+        self.civil_status.addItems(["Select Civil Status"] + self.CIVIL_STATUSES)
         self.civil_status.setMinimumHeight(35)
         form_layout.addWidget(QLabel("Civil Status:"), row, 2)
         form_layout.addWidget(self.civil_status, row, 3)
@@ -205,10 +167,7 @@ class RegisterWindow(QWidget):
         row += 1
         # Changed to ComboBox with common nationalities
         self.nationality = QComboBox()
-        self.nationality.addItems([
-            "Filipino", "American", "Chinese", "Japanese", "Korean",
-            "British", "Australian", "Canadian", "Indian", "Other"
-        ])
+        self.nationality.addItems(self.NATIONALITIES)
         self.nationality.setMinimumHeight(35)
         form_layout.addWidget(QLabel("Nationality:"), row, 0)
         form_layout.addWidget(self.nationality, row, 1)
@@ -217,11 +176,7 @@ class RegisterWindow(QWidget):
         row = self._add_section_header("Contact Information", form_layout, row + 1)
 
         self.street = QComboBox()
-        self.street.addItems([
-            "Select Street", "Gold Street", "Bronze Street", "Silver Street",
-            "Platinum Street", "Diamond Street", "Pearl Street", "Ruby Street",
-            "Emerald Street", "Sapphire Street", "Jade Street"
-        ])
+        self.street.addItems(["Select Street"] + self.STREETS)
         self.street.setMinimumHeight(35)
         form_layout.addWidget(QLabel("Street: *"), row, 0)
         form_layout.addWidget(self.street, row, 1, 1, 3)
@@ -261,12 +216,7 @@ class RegisterWindow(QWidget):
         row += 1
         # Household Relation as ComboBox
         self.household_relation = QComboBox()
-        self.household_relation.addItems([
-            "Select Relation", "Head of Family", "Spouse", "Son", "Daughter",
-            "Father", "Mother", "Brother", "Sister", "Grandfather", "Grandmother",
-            "Grandson", "Granddaughter", "Uncle", "Aunt", "Nephew", "Niece",
-            "Cousin", "Son-in-law", "Daughter-in-law", "Other"
-        ])
+        self.household_relation.addItems(["Select Relation"] + self.HOUSEHOLD_RELATIONS)
         self.household_relation.setMinimumHeight(35)
         form_layout.addWidget(QLabel("Household Relation:"), row, 0)
         form_layout.addWidget(self.household_relation, row, 1)
@@ -281,11 +231,7 @@ class RegisterWindow(QWidget):
 
         # Emergency Relation as ComboBox
         self.emergency_relation = QComboBox()
-        self.emergency_relation.addItems([
-            "Select Relation", "Spouse", "Parent", "Sibling", "Child",
-            "Grandparent", "Grandchild", "Uncle/Aunt", "Cousin",
-            "Friend", "Neighbor", "Other"
-        ])
+        self.emergency_relation.addItems(["Select Relation"] + self.EMERGENCY_RELATIONS)
         self.emergency_relation.setMinimumHeight(35)
         form_layout.addWidget(QLabel("Relationship:"), row, 2)
         form_layout.addWidget(self.emergency_relation, row, 3)
@@ -307,7 +253,7 @@ class RegisterWindow(QWidget):
     def _add_section_header(self, title_text, layout, row):
         """Add a section header to the form"""
         label = QLabel(title_text)
-        label.setStyleSheet("font-size: 13px; font-weight: bold; color: #1565C0; margin: 8px 0 4px 0;")
+        label.setProperty("role", "sectionHeader")
         layout.addWidget(label, row, 0, 1, 4)
         return row + 1
 
@@ -327,7 +273,7 @@ class RegisterWindow(QWidget):
         sex_widget = QWidget()
         sex_widget.setLayout(sex_layout)
         sex_widget.setMinimumHeight(35)
-        sex_widget.setStyleSheet("QWidget { background-color: transparent; border: none; padding: 5px; }")
+        sex_widget.setProperty("role", "radioGroup")
 
         return sex_widget
 
@@ -336,8 +282,8 @@ class RegisterWindow(QWidget):
         self.add_btn = QPushButton("Add Record")
         self.back_btn = QPushButton("Back")
 
-        self.add_btn.setStyleSheet(Styles.BUTTON_PRIMARY)
-        self.back_btn.setStyleSheet(Styles.BUTTON_DANGER)
+        self.add_btn.setProperty("variant", "primary")
+        self.back_btn.setProperty("variant", "danger")
 
         self.back_btn.clicked.connect(self.go_back)
         self.add_btn.clicked.connect(self.add_record)
@@ -354,89 +300,57 @@ class RegisterWindow(QWidget):
 
     def _show_message(self, icon, title, text, buttons=QMessageBox.StandardButton.Ok):
         """Helper for styled QMessageBox with black text"""
-        msg = QMessageBox(icon, title, text, buttons, self)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: white;
-            }
-            QLabel {
-                color: black;
-                font-size: 13px;
-            }
-            QPushButton {
-                background-color: #1976D2;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #0D47A1;
-            }
-        """)
+        msg = QMessageBox(self)
+        # Named before the buttons are added, so they are polished with the message box style
+        msg.setObjectName("messageBox")
+        msg.setIcon(icon)
+        msg.setWindowTitle(title)
+        msg.setText(text)
+        msg.setStandardButtons(buttons)
         return msg.exec()
 
-    def _validate_contact_number(self, number, field_name):
-        """Validate Philippine mobile number format"""
-        if not number:
-            return True  # Optional field
+    def _warn(self, title, text):
+        """Point out a problem with the entered data (in the status line in kiosk mode)"""
+        if self.kiosk_mode:
+            self._set_status(f"{title}: {text}", 'error')
+        else:
+            self._show_message(QMessageBox.Icon.Warning, title, text)
 
-        if len(number) != 11:
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Contact Number",
-                               f"{field_name} must be exactly 11 digits.")
-            return False
+    def _set_status(self, text, state):
+        """Show text in the status line; state is 'pending', 'saved' or 'error'"""
+        self.status_label.setText(text)
+        self.status_label.setProperty("state", state)
+        # Dynamic property changes only restyle a widget when it is polished again
+        self.status_label.style().polish(self.status_label)
 
-        if not number.startswith('09'):
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Contact Number",
-                               f"{field_name} must start with '09'.")
+    def _validate_contact_number(self, number, field_name):
+        """Validate Philippine mobile number format"""
+        error = validators.contact_number_error(number, field_name)
+        if error:
+            self._warn("Invalid Contact Number", error)
             return False
-
         return True
 
     def _validate_email(self, email):
         """Validate email format"""
-        if not email:
-            return True  # Optional field
-
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Email",
-                               "Please enter a valid email address.\nExample: user@example.com")
+        error = validators.email_error(email)
+        if error:
+            self._warn("Invalid Email", error)
             return False
         return True
 
     def _validate_voter_id(self, voter_id):
         """Validate voter's ID format"""
-        if not voter_id:
-            return True  # Optional field
-
-        # Remove hyphens for validation
-        voter_id_clean = voter_id.replace('-', '').replace(' ', '')
-
-        # Check if it contains only digits
-        if not voter_id_clean.isdigit():
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Voter's ID",
-                               "Voter's ID should contain only numbers and hyphens.\nExample: 1234-5678-9012")
-            return False
-
-        # Check length (typically 12 digits for Philippine voter ID)
-        if len(voter_id_clean) < 10 or len(voter_id_clean) > 20:
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Invalid Voter's ID",
-                               "Voter's ID should be between 10-20 digits.")
+        error = validators.voter_id_error(voter_id)
+        if error:
+            self._warn("Invalid Voter's ID", error)
             return False
-
         return True
 
     def _validate_required_dropdowns(self):
         """Validate that required dropdowns are selected"""
         if self.street.currentText() == "Select Street":
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Missing Information",
-                               "Please select a street.")
+            self._warn("Missing Information", "Please select a street.")
             return False
         return True
 
@@ -444,16 +358,12 @@ class RegisterWindow(QWidget):
         """Validate and save new record to database"""
         # Required fields validation
         if not self.surname.text().strip():
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Missing Information",
-                               "Surname is required.")
+            self._warn("Missing Information", "Surname is required.")
             self.surname.setFocus()
             return
 
         if not self.firstname.text().strip():
-            self._show_message(QMessageBox.Icon.Warning,
-                               "Missing Information",
-                               "First Name is required.")
+            self._warn("Missing Information", "First Name is required.")
             self.firstname.setFocus()
             return
 
@@ -513,10 +423,74 @@ class RegisterWindow(QWidget):
             'emergency_contact': self.emergency_contact.text().strip()
         }
 
-        self.db_manager.add_record(record)
+        if self.kiosk_mode:
+            self._queue_save(record)
+            self.reset()
+            return
+
+        # Saved in the background; the button stays disabled until the save finishes
+        self.add_btn.setEnabled(False)
+        self.db_worker.submit(self.db_manager.add_record, record,
+                              on_result=self._on_record_saved, on_error=self._on_save_failed)
+
+    def _on_record_saved(self, _record_id):
+        """Confirm a successful save and reset the form"""
+        self.add_btn.setEnabled(True)
         self._show_message(QMessageBox.Icon.Information, "Success", "Successfully Registered!")
         self.clear_form()
 
+    def _on_save_failed(self, error):
+        """Report a failed save, keeping the entered data so it can be retried"""
+        self.add_btn.setEnabled(True)
+        self._show_message(QMessageBox.Icon.Critical, "Database Error", f"Could not save the record:\n{error}")
+
+    def set_kiosk_mode(self, enabled):
+        """Switch between queued saves with a status line (kiosk) and confirming each save in a dialog"""
+        self.kiosk_mode = enabled
+        self.status_bar.setVisible(enabled)
+        self.submit_shortcut.setEnabled(enabled)
+        # Clicking Add Record leaves the keyboard focus in the form
+        self.add_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus if enabled else Qt.FocusPolicy.StrongFocus)
+        if enabled and not self.status_label.text():
+            self._set_status("Ready. Press Ctrl+Enter or Add Record to register.", 'saved')
+
+    def _queue_save(self, record):
+        """Save a record in the background and report the outcome in the status line"""
+        self._pending_saves += 1
+        self._set_status(f"Saving {self._record_name(record)}... ({self._pending_saves} pending)", 'pending')
+        self.db_worker.submit(self.db_manager.add_record, record,
+                              on_result=lambda record_id: self._on_queued_save(record, record_id),
+                              on_error=lambda error: self._on_queued_save_failed(record, error))
+
+    def _on_queued_save(self, record, record_id):
+        """Report a queued save that went through"""
+        self._pending_saves -= 1
+        if self._failed_records:
+            return
+        text = f"Registered {self._record_name(record)} (record #{record_id})"
+        if self._pending_saves:
+            text += f", {self._pending_saves} still saving"
+        self._set_status(text, 'saved')
+
+    def _on_queued_save_failed(self, record, error):
+        """Keep a record whose save failed so it can be retried"""
+        self._pending_saves -= 1
+        self._failed_records.append(record)
+        self._set_status(f"{len(self._failed_records)} record(s) not saved, last: "
+                         f"{self._record_name(record)} ({error})", 'error')
+        self.retry_btn.show()
+
+    def retry_failed_saves(self):
+        """Queue the records whose save failed again"""
+        records, self._failed_records = self._failed_records, []
+        self.retry_btn.hide()
+        for record in records:
+            self._queue_save(record)
+
+    @staticmethod
+    def _record_name(record):
+        return f"{record['surname']}, {record['firstname']}"
+
     def clear_form(self):
         """Reset all form fields to default values"""
         self.surname.clear()
@@ -538,6 +512,12 @@ class RegisterWindow(QWidget):
         self.emergency_relation.setCurrentIndex(0)  # Reset to "Select Relation"
         self.emergency_contact.clear()
 
+    def reset(self):
+        """Get a reused window ready for the next registration"""
+        self.clear_form()
+        self.scroll.verticalScrollBar().setValue(0)
+        self.surname.setFocus()
+
     def go_back(self):
         """Return to main window"""
         self.close()
@@ -0,0 +1,61 @@
+"""
+Compact resident record.
+Records read from the database are tuples of their column values that also
+behave like the dicts they replace: record['surname'], get(), keys(),
+items(), values(), 'email' in record, dict(record) and copy() all work, and
+a record compares equal to the dict with the same fields. A tuple needs less
+than half the memory of a dict per resident and is quicker to build from a
+row, which adds up with 100k residents in a table or a search result.
+"""
+from collections.abc import Mapping
+
+
+class Resident(tuple, Mapping):
+    """One resident as a read-only mapping of FIELDS to values"""
+
+    # Columns a record carries, in residents table order (everything but created_at)
+    FIELDS = (
+        'id', 'surname', 'firstname', 'middlename', 'sex', 'dob', 'age', 'birthplace',
+        'civil_status', 'nationality', 'street', 'contact_number', 'email',
+        'years_residency', 'voter_id', 'household_relation', 'emergency_name',
+        'emergency_relation', 'emergency_contact'
+    )
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return _value(self, _INDEX[key])
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __contains__(self, key):
+        return key in _INDEX
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.copy() == dict(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Resident({self.copy()!r})"
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(_values(self)),))
+
+    def copy(self):
+        """Return the record as a new, editable dict"""
+        return dict(zip(self.FIELDS, _values(self)))
+
+
+_INDEX = {name: index for index, name in enumerate(Resident.FIELDS)}
+
+# The tuple methods the mapping methods above hide
+_value = tuple.__getitem__
+_values = tuple.__iter__
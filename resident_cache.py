@@ -0,0 +1,376 @@
+"""
+Columnar in-memory copy of the residents table for statistics.
+Keeps one compact typed array per column the statistics use: codes for sex,
+street and civil status (each value stored once in a dictionary), ages and
+years of residency as bytes, and a voter flag. That is about 14 bytes per
+resident against hundreds for a record. Counts, age groups, cross-tabs and
+filters run over whole columns at once: with NumPy when it is installed,
+otherwise with bytes.translate() and integer bit operations that treat
+each byte of a column as a lane.
+
+The cache is loaded once; DatabaseManager then patches it with the
+residents added, updated and deleted since, read from the changelog.
+"""
+import bisect
+import threading
+from array import array
+
+from migrations import age_group_labels
+
+try:
+    import numpy as np
+except ImportError:  # optional: the byte-lane code below needs only the standard library
+    np = None
+
+
+# Columns stored as dictionary codes, and as small numbers
+CODED_COLUMNS = ('sex', 'street', 'civil_status')
+NUMBER_COLUMNS = ('age', 'years_residency')
+
+# Record fields the cache is built from
+RECORD_COLUMNS = CODED_COLUMNS + NUMBER_COLUMNS + ('voter_id',)
+
+# Rows read at a time while loading
+LOAD_CHUNK_ROWS = 50000
+
+# Stored for a missing or out of range number; one byte holds 0-254
+UNKNOWN_NUMBER = 255
+
+# A coded column holds at most this many distinct values, coded 0-253, so
+# that code + 1 still fits in a byte when counting within a filter
+MAX_CODES = 254
+
+
+class CacheOverflow(Exception):
+    """A value doesn't fit the cache's one-byte columns; the caller should fall back to SQL"""
+
+
+class ResidentColumns:
+    """Column arrays for every resident, ordered by id"""
+
+    def __init__(self):
+        self.ids = array('q')
+        self.codes = {column: array('B') for column in CODED_COLUMNS}
+        self.numbers = {column: array('B') for column in NUMBER_COLUMNS}
+        self.voter = array('B')
+        # Value of each code per coded column, and the code of each value
+        self.values = {column: [] for column in CODED_COLUMNS}
+        self._code_of = {column: {} for column in CODED_COLUMNS}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn):
+        """Read every resident's cached columns through a connection, in one pass.
+
+        Rows are read a chunk at a time and turned into columns; numbers and
+        the voter flag arrive from SQLite ready to store, and coded values
+        go through the dictionaries a whole column at a time. Raises
+        CacheOverflow when a coded column has too many distinct values.
+        """
+        columns = cls()
+        select = ['id'] + [f"COALESCE({name}, '')" for name in CODED_COLUMNS]
+        for name in NUMBER_COLUMNS:
+            select.append(f"CASE WHEN typeof({name}) = 'integer' AND {name} BETWEEN 0 AND {UNKNOWN_NUMBER - 1} "
+                          f"THEN {name} ELSE {UNKNOWN_NUMBER} END")
+        select.append("COALESCE(voter_id, '') <> ''")
+
+        cursor = conn.execute(f"SELECT {', '.join(select)} FROM residents ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(LOAD_CHUNK_ROWS)
+            if not rows:
+                break
+            ids, *fields = zip(*rows)
+            columns.ids.extend(ids)
+            for name, values in zip(CODED_COLUMNS, fields):
+                code_of = columns._code_of[name]
+                for value in sorted(set(values).difference(code_of)):
+                    columns._encode(name, value)
+                columns.codes[name].extend(map(code_of.__getitem__, values))
+            stored = columns._field_arrays()[len(CODED_COLUMNS):]
+            for column, values in zip(stored, fields[len(CODED_COLUMNS):]):
+                column.extend(values)
+        return columns
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self):
+        """Bytes held by the column arrays"""
+        return sum(len(column) * column.itemsize for column in [self.ids] + self._field_arrays())
+
+    # Patching
+
+    def add_many(self, records):
+        """Add or update residents from (id, record) pairs (records are dicts or Residents).
+
+        Adding a resident that is already cached updates it, so a change
+        the cache was loaded with can safely be applied again.
+        """
+        with self._lock:
+            for record_id, record in records:
+                self._put(record_id, record)
+
+    def remove_many(self, record_ids):
+        """Drop residents (ids that aren't cached are ignored)"""
+        with self._lock:
+            for record_id in record_ids:
+                index = self._index(record_id)
+                if index is None:
+                    continue
+                del self.ids[index]
+                for column in self._field_arrays():
+                    del column[index]
+
+    def _put(self, record_id, record):
+        fields = self._fields(record)
+        if not self.ids or record_id > self.ids[-1]:
+            self._insert(len(self.ids), record_id, fields)
+            return
+        index = self._index(record_id)
+        if index is None:
+            self._insert(bisect.bisect_left(self.ids, record_id), record_id, fields)
+            return
+        for column, value in zip(self._field_arrays(), fields):
+            column[index] = value
+
+    def _index(self, record_id):
+        index = bisect.bisect_left(self.ids, record_id)
+        if index < len(self.ids) and self.ids[index] == record_id:
+            return index
+        return None
+
+    def _field_arrays(self):
+        """The arrays _fields() values go in, in the same order"""
+        return [*self.codes.values(), *self.numbers.values(), self.voter]
+
+    def _fields(self, record):
+        """Encode a record's cached fields, before any array is touched"""
+        return ([self._encode(column, record[column]) for column in CODED_COLUMNS]
+                + [_number(record[column]) for column in NUMBER_COLUMNS]
+                + [_voter(record['voter_id'])])
+
+    def _insert(self, index, record_id, fields):
+        if index == len(self.ids):
+            self.ids.append(record_id)
+            for column, value in zip(self._field_arrays(), fields):
+                column.append(value)
+        else:
+            self.ids.insert(index, record_id)
+            for column, value in zip(self._field_arrays(), fields):
+                column.insert(index, value)
+
+    def _encode(self, column, value):
+        """Return the code of a value, adding it to the column's dictionary if new"""
+        value = value or ''
+        code_of = self._code_of[column]
+        code = code_of.get(value)
+        if code is None:
+            if len(code_of) == MAX_CODES:
+                raise CacheOverflow(f"more than {MAX_CODES} distinct values of {column}")
+            code = code_of[value] = len(code_of)
+            self.values[column].append(value)
+        return code
+
+    # Queries. Filters are those of DatabaseManager.get_statistics(): an
+    # exact street or sex, an inclusive age range and voter=True/False.
+
+    def statistics(self, age_edges, **filters):
+        """Counts in the shape DatabaseManager.get_statistics() returns"""
+        with self._lock:
+            lanes = self._lanes(filters)
+            return {
+                'total': lanes.total(),
+                'sex': lanes.counts('sex'),
+                'age_groups': lanes.age_groups(age_edges),
+                'street': lanes.counts('street'),
+                'civil_status': lanes.counts('civil_status'),
+            }
+
+    def crosstab(self, rows, columns, age_edges, **filters):
+        """Count residents by two columns: {row value: {column value: count}}.
+
+        rows and columns are coded columns or 'age_group'. Residents without
+        an age are left out of age group tables.
+        """
+        with self._lock:
+            return self._lanes(filters).crosstab(rows, columns, age_edges)
+
+    def _lanes(self, filters):
+        return (_Lanes if np is None else _NumpyLanes)(self, filters)
+
+
+class _Lanes:
+    """One query over a snapshot of the columns, each column as bytes (one byte per resident).
+
+    Masks are Python ints with one 0/1 byte per resident, combined with &.
+    """
+
+    def __init__(self, columns, filters):
+        self.columns = columns
+        self.size = len(columns.ids)
+        self.mask = self._mask(filters)
+
+    def _column(self, name, age_edges=None):
+        """Return (bytes, labels) for a coded column or for age groups"""
+        if name == 'age_group':
+            labels = age_group_labels(age_edges)
+            table = bytearray(256)
+            lower = 0
+            for group, edge in enumerate(list(age_edges) + [UNKNOWN_NUMBER - 1]):
+                edge = min(edge, UNKNOWN_NUMBER - 1)
+                table[lower:edge + 1] = bytes([group]) * (edge + 1 - lower)
+                lower = edge + 1
+            table[UNKNOWN_NUMBER] = len(labels)  # no age: a code past the labels
+            return self.columns.numbers['age'].tobytes().translate(table), labels
+        return self.columns.codes[name].tobytes(), self.columns.values[name]
+
+    def _mask(self, filters):
+        """The mask of residents that pass the filters, or None for everyone"""
+        selections = []
+        for name in ('street', 'sex'):
+            value = filters.get(name)
+            if value is not None:
+                code = self.columns._code_of[name].get(value)
+                selections.append((self.columns.codes[name], [] if code is None else [code]))
+        min_age, max_age = filters.get('min_age'), filters.get('max_age')
+        if min_age is not None or max_age is not None:
+            low = max(0, min_age or 0)
+            high = min(UNKNOWN_NUMBER - 1, UNKNOWN_NUMBER - 1 if max_age is None else max_age)
+            selections.append((self.columns.numbers['age'], range(low, high + 1)))
+        voter = filters.get('voter')
+        if voter is not None:
+            selections.append((self.columns.voter, [1 if voter else 0]))
+
+        mask = None
+        for column, codes in selections:
+            selected = self._select(column.tobytes(), codes)
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def _select(self, column, codes):
+        return int.from_bytes(column.translate(_select_table(codes)), 'little')
+
+    def total(self):
+        if self.mask is None:
+            return self.size
+        return self.mask.to_bytes(self.size, 'little').count(1)
+
+    def counts(self, name):
+        """{value: count} for a coded column, leaving out values with no residents"""
+        column, labels = self._column(name)
+        counts = self._bincount(column, len(labels))
+        return {label: count for label, count in zip(labels, counts) if count}
+
+    def age_groups(self, age_edges):
+        """{label: count} for every age group, residents without an age left out"""
+        column, labels = self._column('age_group', age_edges)
+        return dict(zip(labels, self._bincount(column, len(labels))))
+
+    def crosstab(self, rows, columns, age_edges):
+        row_column, row_labels = self._column(rows, age_edges)
+        column_column, column_labels = self._column(columns, age_edges)
+        # One code past the labels for residents without an age
+        row_count, column_count = len(row_labels) + 1, len(column_labels) + 1
+        counts = self._bincount_pairs(row_column, column_column, column_count, row_count * column_count)
+
+        # The extra codes (residents without an age) fall outside the grid
+        grid = [counts[row * column_count:row * column_count + len(column_labels)] for row in range(len(row_labels))]
+        # Like the SQL version: every age group, but only the values some resident has
+        row_order = self._axis(rows, row_labels, [sum(line) for line in grid])
+        column_order = self._axis(columns, column_labels, [sum(column) for column in zip(*grid)])
+        return {
+            row_labels[row]: {column_labels[column]: grid[row][column] for column in column_order}
+            for row in row_order
+        }
+
+    @staticmethod
+    def _axis(name, labels, totals):
+        """Codes to list along one side of a cross-tab, in label order"""
+        if name == 'age_group':
+            return range(len(labels))
+        return sorted((code for code, total in enumerate(totals) if total), key=labels.__getitem__)
+
+    def _bincount(self, column, length):
+        """Residents per code 0..length-1 of a byte column, counting only the masked lanes"""
+        if self.mask is None:
+            return [column.count(code) for code in range(length)]
+        # Shift codes up by one, then zero the lanes outside the mask
+        shifted = int.from_bytes(column.translate(_SHIFT_UP), 'little')
+        masked = (shifted & self.mask * 0xFF).to_bytes(self.size, 'little')
+        return [masked.count(code + 1) for code in range(length)]
+
+    def _bincount_pairs(self, rows, columns, column_count, length):
+        """Residents per (row, column) code pair, as a flat list indexed row * column_count + column"""
+        if length <= 255:
+            # Both codes in one byte per lane: row * column_count + column never carries
+            combined = (int.from_bytes(rows, 'little') * column_count
+                        + int.from_bytes(columns, 'little')).to_bytes(self.size, 'little')
+            return self._bincount(combined, length)
+
+        counts = [0] * length
+        shifted = int.from_bytes(columns.translate(_SHIFT_UP), 'little')
+        for row in set(rows):
+            selected = self._select(rows, [row])
+            if self.mask is not None:
+                selected &= self.mask
+            masked = (shifted & selected * 0xFF).to_bytes(self.size, 'little')
+            for column in range(column_count):
+                counts[row * column_count + column] = masked.count(column + 1)
+        return counts
+
+
+class _NumpyLanes(_Lanes):
+    """The same query with NumPy: masks are boolean arrays and counts come from bincount"""
+
+    def _select(self, column, codes):
+        codes = list(codes)
+        values = np.frombuffer(column, dtype=np.uint8)
+        if not codes:
+            return np.zeros(self.size, dtype=bool)
+        if len(codes) == 1:
+            return values == codes[0]
+        if codes == list(range(codes[0], codes[-1] + 1)):
+            return (values >= codes[0]) & (values <= codes[-1])
+        return np.isin(values, codes)
+
+    def total(self):
+        return self.size if self.mask is None else int(np.count_nonzero(self.mask))
+
+    def _bincount(self, column, length):
+        codes = np.frombuffer(column, dtype=np.uint8)
+        if self.mask is None:
+            return np.bincount(codes, minlength=length)[:length].tolist()
+        # Lanes outside the mask become 0, the rest code + 1
+        shifted = np.where(self.mask, codes.astype(np.uint16) + 1, 0)
+        return np.bincount(shifted, minlength=length + 1)[1:length + 1].tolist()
+
+    def _bincount_pairs(self, rows, columns, column_count, length):
+        pairs = np.frombuffer(rows, dtype=np.uint8).astype(np.uint16) * column_count
+        pairs += np.frombuffer(columns, dtype=np.uint8)
+        if self.mask is not None:
+            pairs = np.where(self.mask, pairs + 1, 0)
+            return np.bincount(pairs, minlength=length + 1)[1:length + 1].tolist()
+        return np.bincount(pairs, minlength=length)[:length].tolist()
+
+
+# bytes.translate() table mapping code c to c + 1 (codes stay below 255)
+_SHIFT_UP = bytes(min(code + 1, 255) for code in range(256))
+
+
+def _select_table(codes):
+    """bytes.translate() table mapping the given codes to 1 and everything else to 0"""
+    table = bytearray(256)
+    for code in codes:
+        table[code] = 1
+    return bytes(table)
+
+
+def _number(value):
+    """Store a number in one byte, UNKNOWN_NUMBER if it is missing or doesn't fit"""
+    if isinstance(value, int) and 0 <= value < UNKNOWN_NUMBER:
+        return value
+    return UNKNOWN_NUMBER
+
+
+def _voter(voter_id):
+    return 1 if voter_id else 0
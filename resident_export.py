@@ -0,0 +1,85 @@
+"""
+Export of resident records to CSV or JSON Lines.
+Rows are streamed from the database cursor a chunk at a time, so exports of
+any size run in constant memory.
+"""
+import csv
+import gzip
+import json
+import os
+
+from database_manager import COLUMNS
+
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+# Rows fetched from the cursor and written per chunk
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_format(path):
+    """Guess the export format from a file name (e.g. residents.jsonl.gz -> 'jsonl')"""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return 'jsonl' if name.endswith(('.jsonl', '.json')) else 'csv'
+
+
+def export_residents(db_manager, path, fmt=None, compress=None, columns=None,
+                     chunk_size=EXPORT_CHUNK_SIZE, progress=None, **filters):
+    """Write resident records to path as CSV or JSON Lines.
+
+    fmt is 'csv' or 'jsonl' (guessed from the file name if None) and compress
+    gzips the output (default: when path ends in .gz). columns picks and
+    orders the fields (default: all of them). filters are passed to
+    DatabaseManager.iter_record_chunks(): street, sex, min_age, max_age and
+    voter. progress(rows_written), if given, is called after every chunk.
+
+    The file is written under a temporary name and moved into place when
+    complete, so a failed export never leaves a partial file behind.
+    Returns the number of rows written.
+    """
+    if fmt is None:
+        fmt = export_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compress is None:
+        compress = path.lower().endswith('.gz')
+    columns = tuple(COLUMNS if columns is None else columns)
+
+    chunks = db_manager.iter_record_chunks(chunk_size, columns=columns, **filters)
+    temp_path = f"{path}.part"
+    # Excel only detects UTF-8 in a CSV file with a byte order mark
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    if compress:
+        file = gzip.open(temp_path, 'wt', compresslevel=6, encoding=encoding, newline='')
+    else:
+        file = open(temp_path, 'w', encoding=encoding, newline='')
+
+    written = 0
+    try:
+        with file:
+            if fmt == 'csv':
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                for rows in chunks:
+                    writer.writerows(rows)
+                    written += len(rows)
+                    if progress is not None:
+                        progress(written)
+            else:
+                for rows in chunks:
+                    file.write(''.join(
+                        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows
+                    ))
+                    written += len(rows)
+                    if progress is not None:
+                        progress(written)
+        os.replace(temp_path, path)
+    except BaseException:
+        chunks.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return written
@@ -0,0 +1,259 @@
+"""
+CSV import of resident records.
+Reads the file one row at a time and writes it in large batches, so memory
+use stays flat however many rows the file has. Rows that fail validation are
+copied to a rejects file next to the source with the reason added.
+"""
+import csv
+import itertools
+import os
+import re
+from datetime import datetime
+
+import validators
+from database_manager import INSERT_COLUMNS
+
+
+# Rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = 5000
+
+# Header spellings accepted for each residents column. Headers are compared
+# after lower-casing and dropping everything but letters and digits, so
+# "Voter's ID", "voter_id" and "VOTER ID" all match.
+COLUMN_ALIASES = {
+    'surname': ('surname', 'last name', 'family name'),
+    'firstname': ('firstname', 'first name', 'given name'),
+    'middlename': ('middlename', 'middle name'),
+    'sex': ('sex', 'gender'),
+    'dob': ('dob', 'date of birth', 'birth date', 'birthday'),
+    'age': ('age',),
+    'birthplace': ('birthplace', 'place of birth'),
+    'civil_status': ('civil status',),
+    'nationality': ('nationality',),
+    'street': ('street', 'address'),
+    'contact_number': ('contact number', 'contact', 'mobile number', 'phone'),
+    'email': ('email', 'email address'),
+    'years_residency': ('years residency', 'years of residency'),
+    'voter_id': ("voter's id", 'voter id'),
+    'household_relation': ('household relation', 'relation to household head'),
+    'emergency_name': ('emergency name', 'emergency contact name'),
+    'emergency_relation': ('emergency relation', 'emergency contact relation'),
+    'emergency_contact': ('emergency contact', 'emergency contact number'),
+}
+
+# Columns a file has to provide; the registration form requires the same fields
+REQUIRED_COLUMNS = ('surname', 'firstname', 'sex', 'street')
+
+INTEGER_COLUMNS = ('age', 'years_residency')
+
+SEX_VALUES = {'m': 'Male', 'male': 'Male', 'f': 'Female', 'female': 'Female'}
+
+# Streets the registration form offers, matched regardless of case
+STREET_VALUES = {street.lower(): street for street in validators.STREETS}
+
+# Date formats accepted for dob; stored the way the registration form writes it
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+STORED_DATE_FORMAT = '%d/%m/%Y'
+
+# Bytes read from the start of the file to guess its delimiter
+SNIFF_SIZE = 64 * 1024
+
+
+def _normalize_header(name):
+    """Reduce a header to lower-case letters and digits"""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+_ALIAS_LOOKUP = {
+    _normalize_header(alias): column
+    for column, aliases in COLUMN_ALIASES.items()
+    for alias in aliases
+}
+
+
+def map_columns(header):
+    """Map each residents column to its position in a CSV header row.
+
+    Unknown headers are ignored. Raises ValueError if a required column is
+    missing or two headers map to the same column.
+    """
+    mapping = {}
+    for index, name in enumerate(header):
+        column = _ALIAS_LOOKUP.get(_normalize_header(name))
+        if column is None:
+            continue
+        if column in mapping:
+            raise ValueError(f"Columns '{header[mapping[column]]}' and '{name}' both map to {column}")
+        mapping[column] = index
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in mapping]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return mapping
+
+
+def _detect_dialect(file):
+    """Guess the CSV dialect from the start of an open file and rewind it"""
+    sample = file.read(SNIFF_SIZE)
+    file.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        return csv.excel
+
+
+def _record_error(record):
+    """Return why a mapped record can't be imported, or None if it's valid"""
+    for column in REQUIRED_COLUMNS:
+        if not record[column]:
+            return f"{column} is required."
+
+    sex = SEX_VALUES.get(record['sex'].lower())
+    if sex is None:
+        return f"Unknown sex '{record['sex']}'."
+    record['sex'] = sex
+
+    street = STREET_VALUES.get(record['street'].lower())
+    if street is None:
+        return f"Unknown street '{record['street']}'."
+    record['street'] = street
+
+    for column in INTEGER_COLUMNS:
+        value = record[column]
+        if not value:
+            record[column] = 0
+            continue
+        if not value.isdigit() or int(value) > 120:
+            return f"{column} must be a whole number from 0 to 120."
+        record[column] = int(value)
+
+    if record['dob']:
+        for date_format in DATE_FORMATS:
+            try:
+                record['dob'] = datetime.strptime(record['dob'], date_format).strftime(STORED_DATE_FORMAT)
+                break
+            except ValueError:
+                pass
+        else:
+            return f"Unrecognised date of birth '{record['dob']}'."
+
+    return (validators.contact_number_error(record['contact_number'], "Contact Number")
+            or validators.contact_number_error(record['emergency_contact'], "Emergency Contact Number")
+            or validators.email_error(record['email'])
+            or validators.voter_id_error(record['voter_id']))
+
+
+def validate_rows(rows, mapping):
+    """Validate a batch of raw CSV rows.
+
+    rows is a list of (line number, row) pairs. Returns the valid records as
+    tuples in INSERT_COLUMNS order with the raw rows they came from, and the
+    rejected rows as (line number, row, reason).
+    """
+    positions = [(column, mapping.get(column)) for column in INSERT_COLUMNS]
+    accepted = []
+    rejected = []
+
+    for line_number, row in rows:
+        record = {
+            column: row[index].strip() if index is not None and index < len(row) else ''
+            for column, index in positions
+        }
+        error = _record_error(record)
+        if error:
+            rejected.append((line_number, row, error.replace('\n', ' ')))
+        else:
+            accepted.append((tuple(record[column] for column in INSERT_COLUMNS), (line_number, row)))
+
+    return accepted, rejected
+
+
+def read_rows(file, dialect):
+    """Yield (line number, row) for every non-blank row of an open CSV file"""
+    reader = csv.reader(file, dialect)
+    for row in reader:
+        if any(field.strip() for field in row):
+            yield reader.line_num, row
+
+
+def default_rejects_path(path):
+    """Return the rejects file used for path, e.g. residents.rejects.csv"""
+    root, _ = os.path.splitext(path)
+    return f"{root}.rejects.csv"
+
+
+def import_csv(db_manager, path, rejects_path=None, batch_size=IMPORT_BATCH_SIZE,
+               encoding='utf-8-sig', progress=None):
+    """Import residents from a CSV file.
+
+    Files saved from Excel work as-is: a UTF-8 byte order mark is skipped
+    and the delimiter (comma, semicolon, tab or pipe) is detected. Each batch
+    of batch_size rows is validated and inserted in one transaction. Rejected
+    rows are written to rejects_path (default: next to path) with the CSV line
+    number and reason appended; the file is only created if something is
+    rejected. progress(rows_read, imported, rejected), if given, is called
+    after every batch.
+
+    Returns a dict with the row counts, the inserted id ranges and the
+    rejects file path (None if nothing was rejected).
+    """
+    if rejects_path is None:
+        rejects_path = default_rejects_path(path)
+
+    summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'id_ranges': [], 'rejects_path': None}
+    rejects_file = None
+    rejects_writer = None
+
+    with open(path, newline='', encoding=encoding) as file:
+        dialect = _detect_dialect(file)
+        rows = read_rows(file, dialect)
+        try:
+            _, header = next(rows)
+        except StopIteration:
+            return summary
+        mapping = map_columns(header)
+
+        try:
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                summary['rows'] += len(batch)
+
+                accepted, rejected = validate_rows(batch, mapping)
+                if accepted:
+                    result = db_manager.add_records((values for values, _ in accepted), batch_size=len(accepted))
+                    summary['imported'] += result['inserted']
+                    summary['id_ranges'] = _merge_ranges(summary['id_ranges'], result['id_ranges'])
+                    for start, count, message in result['failed_batches']:
+                        rejected.extend((line_number, row, f"Database error: {message}")
+                                        for _, (line_number, row) in accepted[start:start + count])
+
+                if rejected:
+                    if rejects_writer is None:
+                        rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8-sig')
+                        rejects_writer = csv.writer(rejects_file, dialect)
+                        rejects_writer.writerow(list(header) + ['line', 'reason'])
+                        summary['rejects_path'] = rejects_path
+                    rejected.sort(key=lambda reject: reject[0])
+                    rejects_writer.writerows(list(row) + [line_number, reason]
+                                             for line_number, row, reason in rejected)
+                    summary['rejected'] += len(rejected)
+
+                if progress is not None:
+                    progress(summary['rows'], summary['imported'], summary['rejected'])
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+
+    return summary
+
+
+def _merge_ranges(ranges, new_ranges):
+    """Append id ranges, joining ones that continue the previous range"""
+    for first_id, last_id in new_ranges:
+        if ranges and ranges[-1][1] + 1 == first_id:
+            ranges[-1] = (ranges[-1][0], last_id)
+        else:
+            ranges.append((first_id, last_id))
+    return ranges
@@ -0,0 +1,98 @@
+"""
+Startup tracing.
+Records how long each phase of application startup takes and writes the
+result as a Chrome trace (open it in chrome://tracing or ui.perfetto.dev).
+
+Tracing is off unless the BARANGAY_TRACE_STARTUP environment variable is set
+to the report path, or the app is started with --trace-startup[=PATH]. While
+it is off, phase() costs a dictionary lookup and nothing is recorded.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+TRACE_ENV = 'BARANGAY_TRACE_STARTUP'
+TRACE_FLAG = '--trace-startup'
+DEFAULT_TRACE_FILE = 'startup_trace.json'
+
+
+class StartupTrace:
+    """Collects timed phases and instant marks relative to a common origin"""
+
+    def __init__(self, path=None):
+        self.origin = time.perf_counter()
+        self.path = path
+        self.events = []
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def _timestamp(self):
+        """Microseconds since the trace origin"""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    @contextmanager
+    def phase(self, name, **args):
+        """Time the enclosed block as one phase"""
+        if not self.enabled:
+            yield
+            return
+
+        start = self._timestamp()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name, 'ph': 'X', 'ts': start, 'dur': self._timestamp() - start,
+                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+            })
+
+    def mark(self, name, **args):
+        """Record a point in time, e.g. the first frame being shown"""
+        if not self.enabled:
+            return
+        self.events.append({
+            'name': name, 'ph': 'i', 's': 'p', 'ts': self._timestamp(),
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        })
+
+    def elapsed_ms(self, name):
+        """Return the time from the origin to the end of a phase or mark, or None"""
+        for event in reversed(self.events):
+            if event['name'] == name:
+                return (event['ts'] + event.get('dur', 0)) / 1000
+        return None
+
+    def write(self, path=None):
+        """Write the recorded events as a Chrome trace file and return its path"""
+        path = path or self.path
+        report = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'argv': sys.argv, 'python': sys.version.split()[0]},
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=1)
+        return path
+
+
+def trace_path(argv=None, environ=None):
+    """Return where to write the trace, from --trace-startup[=PATH] or the environment (None if off)"""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+
+    for arg in argv[1:]:
+        if arg == TRACE_FLAG:
+            return DEFAULT_TRACE_FILE
+        if arg.startswith(TRACE_FLAG + '='):
+            return arg.split('=', 1)[1] or DEFAULT_TRACE_FILE
+    return environ.get(TRACE_ENV) or None
+
+
+# Shared tracer; its origin is the moment this module is first imported
+tracer = StartupTrace(trace_path())
@@ -3,25 +3,44 @@ Statistics window showing demographic data visualizations.
 Displays pie chart for gender distribution, bar graph for age groups, and total population.
 """
 from PyQt6.QtWidgets import *
-from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtCore import Qt, QRect, QEvent, QTimer
 from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QBrush, QLinearGradient
-from styles import Styles
 import math
 
+import validators
+from instrumentation import metrics
+
 
 class StatisticsWindow(QWidget):
     """Statistics and data visualization window"""
 
+    # Milliseconds between checks for changes by any station while the window is shown
+    CHANGE_POLL_MS = 3000
+
     def __init__(self, db_manager, main_window):
         super().__init__()
         self.db_manager = db_manager
         self.main_window = main_window
+        self.db_worker = main_window.db_worker
+        # Data version the shown statistics were counted at (None until they load)
+        self.version = None
         self.setWindowTitle("Barangay Statistics")
-        self.showMaximized()
-        self.setStyleSheet("background-color: #f5f5f5; font-family: 'Segoe UI';")
+        self.setProperty("page", "statistics")
         self._setup_ui()
         self._load_statistics()
 
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(self.CHANGE_POLL_MS)
+        self.change_timer.timeout.connect(self._check_for_changes)
+
+    def showEvent(self, event):
+        self.change_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.change_timer.stop()
+        super().hideEvent(event)
+
     def _setup_ui(self):
         """Initialize UI components"""
         layout = QVBoxLayout(self)
@@ -31,30 +50,45 @@ class StatisticsWindow(QWidget):
         # Title
         title = QLabel("Population Statistics Dashboard")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 40px;
-            font-weight: bold;
-            color: #0D47A1;
-            margin: 0px;
-            padding: 0px;
-        """)
+        title.setProperty("role", "pageTitle")
         layout.addWidget(title)
 
+        # Filters
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(10)
+
+        self.street_filter = QComboBox()
+        self.street_filter.addItems(["All Streets"] + validators.STREETS)
+        self.street_filter.currentIndexChanged.connect(self._load_statistics)
+
+        self.voter_filter = QComboBox()
+        self.voter_filter.addItems(["All Residents", "Registered Voters", "Non-Voters"])
+        self.voter_filter.currentIndexChanged.connect(self._load_statistics)
+
+        filter_layout.addStretch()
+        filter_layout.addWidget(QLabel("Street:"))
+        filter_layout.addWidget(self.street_filter)
+        filter_layout.addSpacing(10)
+        filter_layout.addWidget(QLabel("Voter Status:"))
+        filter_layout.addWidget(self.voter_filter)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+
         # Statistics cards row
         cards_layout = QHBoxLayout()
         cards_layout.setSpacing(10)
         cards_layout.setContentsMargins(0, 0, 0, 0)
 
         # Total Population Card
-        self.total_card = self._create_stat_card("Total Population", "0", "#1976D2")
+        self.total_card = self._create_stat_card("Total Population", "0", 'total')
         cards_layout.addWidget(self.total_card)
 
         # Male Card
-        self.male_card = self._create_stat_card("Male Residents", "0", "#2196F3")
+        self.male_card = self._create_stat_card("Male Residents", "0", 'male')
         cards_layout.addWidget(self.male_card)
 
         # Female Card
-        self.female_card = self._create_stat_card("Female Residents", "0", "#E91E63")
+        self.female_card = self._create_stat_card("Female Residents", "0", 'female')
         cards_layout.addWidget(self.female_card)
 
         layout.addLayout(cards_layout)
@@ -62,12 +96,7 @@ class StatisticsWindow(QWidget):
         # Charts container - FLEXIBLE HEIGHT
         charts_container = QWidget()
         charts_container.setMinimumHeight(600)
-        charts_container.setStyleSheet("""
-            QWidget {
-                background-color: white;
-                border-radius: 15px;
-            }
-        """)
+        charts_container.setObjectName("chartsPanel")
 
         charts_layout = QHBoxLayout(charts_container)
         charts_layout.setContentsMargins(20, 20, 20, 20)
@@ -81,11 +110,7 @@ class StatisticsWindow(QWidget):
 
         pie_title = QLabel("Gender Distribution")
         pie_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        pie_title.setStyleSheet("""
-            font-size: 16px;
-            font-weight: bold;
-            color: #333333;
-        """)
+        pie_title.setProperty("role", "chartTitle")
         pie_layout.addWidget(pie_title)
 
         self.pie_chart = PieChartWidget()
@@ -102,11 +127,7 @@ class StatisticsWindow(QWidget):
 
         bar_title = QLabel("Age Group Distribution")
         bar_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        bar_title.setStyleSheet("""
-            font-size: 16px;
-            font-weight: bold;
-            color: #333333;
-        """)
+        bar_title.setProperty("role", "chartTitle")
         bar_layout.addWidget(bar_title)
 
         self.bar_chart = BarChartWidget()
@@ -121,7 +142,7 @@ class StatisticsWindow(QWidget):
         button_layout = QHBoxLayout()
 
         back_btn = QPushButton("Back to Main Menu")
-        back_btn.setStyleSheet(Styles.BUTTON_SECONDARY)
+        back_btn.setProperty("variant", "secondary")
         back_btn.clicked.connect(self.go_back)
         back_btn.setCursor(Qt.CursorShape.PointingHandCursor)
 
@@ -130,17 +151,11 @@ class StatisticsWindow(QWidget):
 
         layout.addLayout(button_layout)
 
-    def _create_stat_card(self, title, value, color):
-        """Create a statistics card widget"""
+    def _create_stat_card(self, title, value, card_key):
+        """Create a statistics card widget (card_key picks its colours from Styles.STAT_CARD_COLORS)"""
         card = QWidget()
         card.setFixedHeight(130)
-        card.setStyleSheet(f"""
-            QWidget {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {color}, stop:1 {self._darken_color(color)});
-                border-radius: 12px;
-            }}
-        """)
+        card.setProperty("statCard", card_key)
 
         layout = QVBoxLayout(card)
         layout.setContentsMargins(15, 15, 15, 15)
@@ -148,21 +163,12 @@ class StatisticsWindow(QWidget):
 
         title_label = QLabel(title)
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("""
-            font-size: 14px;
-            font-weight: 600;
-            color: rgba(255, 255, 255, 0.95);
-            letter-spacing: 0.5px;
-        """)
+        title_label.setProperty("role", "cardTitle")
 
         value_label = QLabel(value)
         value_label.setObjectName("value_label")
         value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        value_label.setStyleSheet("""
-            font-size: 42px;
-            font-weight: bold;
-            color: white;
-        """)
+        value_label.setProperty("role", "cardValue")
 
         layout.addWidget(title_label)
         layout.addWidget(value_label)
@@ -170,25 +176,63 @@ class StatisticsWindow(QWidget):
 
         return card
 
-    def _darken_color(self, hex_color):
-        """Darken a hex color for gradient effect"""
-        color_map = {
-            "#1976D2": "#1565C0",
-            "#2196F3": "#1976D2",
-            "#E91E63": "#C2185B"
-        }
-        return color_map.get(hex_color, hex_color)
+    def _filters(self):
+        """Return the chosen filters as keyword arguments for get_statistics()"""
+        filters = {}
+        if self.street_filter.currentIndex() > 0:
+            filters['street'] = self.street_filter.currentText()
+        if self.voter_filter.currentIndex() > 0:
+            filters['voter'] = self.voter_filter.currentIndex() == 1
+        return filters
 
     def _load_statistics(self):
-        """Load and calculate statistics from database"""
-        records = self.db_manager.get_all_records()
-
-        # Total population
-        total = len(records)
-
-        # Gender distribution
-        male_count = sum(1 for r in records if r['sex'] == 'Male')
-        female_count = sum(1 for r in records if r['sex'] == 'Female')
+        """Load statistics from database in the background"""
+        filters = self._filters()
+        self.db_worker.submit(self._fetch_statistics, filters, key='statistics',
+                              on_result=self._show_statistics, on_error=self._show_database_error)
+        self.bar_chart.set_breakdown({})
+        if filters:
+            # The sex breakdown of each age group only feeds the bar tooltips, so it follows
+            # separately, and only for filtered views: unfiltered ones never need the column cache
+            self.db_worker.submit(self.db_manager.get_crosstab, 'age_group', 'sex', key='statistics.crosstab',
+                                  **filters, on_result=self.bar_chart.set_breakdown,
+                                  on_error=self._show_database_error)
+        else:
+            self.db_worker.cancel('statistics.crosstab')
+
+    def _fetch_statistics(self, filters):
+        """Count the statistics, with the data version read just before (runs on the worker thread)"""
+        return self.db_manager.data_version(), self.db_manager.get_statistics(**filters)
+
+    def _check_for_changes(self):
+        """Reload the statistics if any resident changed since they were counted"""
+        if self.version is None:
+            return
+        self.db_worker.submit(self.db_manager.data_version, key='statistics.version',
+                              on_result=self._on_data_version, on_error=self._show_database_error)
+
+    def _on_data_version(self, version):
+        if self.version is not None and version != self.version:
+            self._load_statistics()
+
+    def _show_database_error(self, error):
+        """Report a failed statistics query"""
+        msg = QMessageBox(self)
+        msg.setObjectName("messageBox")
+        msg.setIcon(QMessageBox.Icon.Critical)
+        msg.setWindowTitle("Database Error")
+        msg.setText(f"Could not load statistics:\n{error}")
+        msg.exec()
+
+    @metrics.measure('ui.statistics.show')
+    def _show_statistics(self, result):
+        """Fill the cards and charts with loaded statistics"""
+        self.version, stats = result
+
+        # Total population and gender distribution
+        total = stats['total']
+        male_count = stats['sex'].get('Male', 0)
+        female_count = stats['sex'].get('Female', 0)
 
         # Update cards
         self.total_card.findChild(QLabel, "value_label").setText(str(total))
@@ -197,30 +241,14 @@ class StatisticsWindow(QWidget):
 
         # Update charts
         self.pie_chart.set_data(male_count, female_count)
+        self.bar_chart.set_data(stats['age_groups'])
 
-        # Age distribution
-        age_groups = {
-            '0-17': 0,
-            '18-30': 0,
-            '31-45': 0,
-            '46-60': 0,
-            '61+': 0
-        }
-
-        for record in records:
-            age = record['age']
-            if age <= 17:
-                age_groups['0-17'] += 1
-            elif age <= 30:
-                age_groups['18-30'] += 1
-            elif age <= 45:
-                age_groups['31-45'] += 1
-            elif age <= 60:
-                age_groups['46-60'] += 1
-            else:
-                age_groups['61+'] += 1
-
-        self.bar_chart.set_data(age_groups)
+    def reset(self):
+        """Bring the statistics up to date when a reused window is shown again"""
+        if self.version is None:
+            self._load_statistics()
+        else:
+            self._check_for_changes()
 
     def go_back(self):
         """Return to main window"""
@@ -242,6 +270,7 @@ class PieChartWidget(QWidget):
         self.female_count = female
         self.update()
 
+    @metrics.measure('ui.pie_chart.paint')
     def paintEvent(self, event):
         """Draw the pie chart"""
         painter = QPainter(self)
@@ -326,12 +355,41 @@ class BarChartWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.age_data = {}
+        self.breakdown = {}
+        self.bar_rects = []
 
     def set_data(self, age_groups):
         """Set bar chart data"""
         self.age_data = age_groups
         self.update()
 
+    def set_breakdown(self, crosstab):
+        """Set the per-sex counts of each age group shown in the bar tooltips"""
+        self.breakdown = crosstab
+
+    def event(self, event):
+        """Show the sex breakdown of the bar under the mouse"""
+        if event.type() == QEvent.Type.ToolTip:
+            position = event.pos()
+            for rect, age_group in self.bar_rects:
+                if rect.contains(position):
+                    QToolTip.showText(event.globalPos(), self._tooltip(age_group), self)
+                    break
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
+    def _tooltip(self, age_group):
+        """Describe one age group's bar"""
+        lines = [f"Age {age_group}: {self.age_data.get(age_group, 0)}"]
+        for sex, count in self.breakdown.get(age_group, {}).items():
+            if count:
+                lines.append(f"{sex or 'Unspecified'}: {count}")
+        return "\n".join(lines)
+
+    @metrics.measure('ui.bar_chart.paint')
     def paintEvent(self, event):
         """Draw the bar chart"""
         painter = QPainter(self)
@@ -339,6 +397,7 @@ class BarChartWidget(QWidget):
 
         width = self.width()
         height = self.height()
+        self.bar_rects = []
 
         if not self.age_data or sum(self.age_data.values()) == 0:
             painter.setFont(QFont('Segoe UI', 12))
@@ -409,6 +468,7 @@ class BarChartWidget(QWidget):
             painter.setBrush(QBrush(gradient))
             painter.setPen(Qt.PenStyle.NoPen)
             painter.drawRoundedRect(x_position, bar_y, bar_width, bar_height, 3, 3)
+            self.bar_rects.append((QRect(x_position, margin_top, bar_width, chart_height), age_group))
 
             # Draw value on top of bar
             if bar_height > 18:
@@ -101,6 +101,9 @@ class Styles:
             border-radius: 9px;
             background-color: #1976D2;
         }
+        QCheckBox {
+            color: black;
+        }
     """
 
     BUTTON_PRIMARY = """
@@ -131,6 +134,10 @@ class Styles:
         QPushButton:hover {
             background-color: #D32F2F;
         }
+        QPushButton:disabled {
+            background-color: #cccccc;
+            color: #666666;
+        }
     """
 
     BUTTON_WARNING = """
@@ -187,14 +194,13 @@ class Styles:
 
     BUTTON_MAIN_WINDOW = """
         QPushButton {
-            font-size: 14px;
+            font-size: 16px;
             font-weight: bold;
             color: #0D47A1;
-            border: 2px solid #0D47A1;
+            border: 3px solid #0D47A1;
             background-color: white;
             border-radius: 12px;
-            padding: 8px 20px;
-            min-width: 140px;
+            padding: 15px 35px;
         }
         QPushButton:hover {
             background-color: #0D47A1;
@@ -203,7 +209,7 @@ class Styles:
     """
 
     TABLE_STYLE = """
-        QTableWidget {
+        QTableView {
             background-color: white;
             border: 1px solid #e0e0e0;
             border-radius: 0px;
@@ -211,16 +217,16 @@ class Styles:
             font-size: 13px;
             font-family: 'Segoe UI', Arial;
         }
-        QTableWidget::item {
+        QTableView::item {
             padding: 12px 15px;
             color: #333333;
             border-bottom: 1px solid #f0f0f0;
         }
-        QTableWidget::item:selected {
+        QTableView::item:selected {
             background-color: #f8f9fa;
             color: #1976D2;
         }
-        QTableWidget::item:hover {
+        QTableView::item:hover {
             background-color: #fafafa;
         }
         QHeaderView::section {
@@ -238,40 +244,40 @@ class Styles:
         QHeaderView::section:hover {
             background-color: #f5f5f5;
         }
-        QTableWidget QScrollBar:vertical {
+        QTableView QScrollBar:vertical {
             border: none;
             background: #fafafa;
             width: 10px;
             margin: 0px;
         }
-        QTableWidget QScrollBar::handle:vertical {
+        QTableView QScrollBar::handle:vertical {
             background: #cccccc;
             min-height: 30px;
             border-radius: 5px;
         }
-        QTableWidget QScrollBar::handle:vertical:hover {
+        QTableView QScrollBar::handle:vertical:hover {
             background: #999999;
         }
-        QTableWidget QScrollBar::add-line:vertical,
-        QTableWidget QScrollBar::sub-line:vertical {
+        QTableView QScrollBar::add-line:vertical,
+        QTableView QScrollBar::sub-line:vertical {
             height: 0px;
         }
-        QTableWidget QScrollBar:horizontal {
+        QTableView QScrollBar:horizontal {
             border: none;
             background: #fafafa;
             height: 10px;
             margin: 0px;
         }
-        QTableWidget QScrollBar::handle:horizontal {
+        QTableView QScrollBar::handle:horizontal {
             background: #cccccc;
             min-width: 30px;
             border-radius: 5px;
         }
-        QTableWidget QScrollBar::handle:horizontal:hover {
+        QTableView QScrollBar::handle:horizontal:hover {
             background: #999999;
         }
-        QTableWidget QScrollBar::add-line:horizontal,
-        QTableWidget QScrollBar::sub-line:horizontal {
+        QTableView QScrollBar::add-line:horizontal,
+        QTableView QScrollBar::sub-line:horizontal {
             width: 0px;
         }
     """
@@ -297,3 +303,158 @@ class Styles:
             font-style: italic;
         }
     """
+
+    # Whole windows; these reach every widget inside the window
+    PAGE_REGISTER = "background-color: white; font-family: 'Segoe UI'; font-size: 18px;"
+    PAGE_DASHBOARD = "background-color: #f5f5f5; font-family: 'Segoe UI';"
+
+    PAGE_TITLE = "font-size: 40px; font-weight: bold; color: #0D47A1; margin: 0px; padding: 0px;"
+    DASHBOARD_TITLE = "font-size: 24px; font-weight: bold; color: #0D47A1; margin-bottom: 20px;"
+    DIALOG_TITLE = "font-size: 20px; font-weight: bold; color: #0D47A1; margin-bottom: 10px;"
+    SECTION_HEADER = "font-size: 13px; font-weight: bold; color: #1565C0; margin: 8px 0 4px 0; padding: 0;"
+    SEARCH_LABEL = "font-size: 14px; font-weight: 600; color: #333;"
+    LOGIN_LABEL = "font-weight: 600; color: #333333; font-size: 14px;"
+    CHART_TITLE = "font-size: 16px; font-weight: bold; color: #333333;"
+    CARD_TITLE = "font-size: 14px; font-weight: 600; color: rgba(255, 255, 255, 0.95); letter-spacing: 0.5px;"
+    CARD_VALUE = "font-size: 42px; font-weight: bold; color: white;"
+    SAVE_STATUS = "font-size: 14px; font-weight: 600; color: #333333;"
+
+    # Kiosk save status line colour by its "state" property
+    SAVE_STATUS_COLORS = {
+        'pending': "#1565C0",
+        'saved': "#2E7D32",
+        'error': "#C62828",
+    }
+
+    SCROLL_AREA = """
+        QScrollArea {
+            border: none;
+            background-color: white;
+        }
+    """
+
+    RADIO_GROUP = """
+        QWidget {
+            background-color: transparent;
+            border: none;
+            padding: 5px;
+        }
+    """
+
+    SEARCH_FIELD = """
+        QLineEdit {
+            padding: 8px;
+            border: 2px solid #999999;
+            border-radius: 6px;
+            font-size: 13px;
+            background-color: white;
+            min-width: 300px;
+            color: black;
+        }
+        QLineEdit:focus {
+            border: 2px solid #1976D2;
+        }
+    """
+
+    DATE_FIELD = """
+        QDateEdit {
+            padding: 8px;
+            border: 2px solid #999999;
+            border-radius: 6px;
+            font-size: 13px;
+            background-color: white;
+            color: black;
+        }
+        QDateEdit:focus {
+            border: 2px solid #1976D2;
+        }
+    """
+
+    DATE_DROP_DOWN = """
+        QDateEdit::drop-down {
+            border: none;
+            width: 30px;
+        }
+    """
+
+    CALENDAR_POPUP = """
+        QCalendarWidget {
+            background-color: white;
+            border: 2px solid #1976D2;
+        }
+        QCalendarWidget QWidget {
+            background-color: white;
+        }
+        QCalendarWidget QAbstractItemView:enabled {
+            color: black;
+            background-color: white;
+            selection-background-color: #E3F2FD;
+            selection-color: black;
+            border: 1px solid #1976D2;
+        }
+        QCalendarWidget QAbstractItemView:disabled {
+            color: #BDBDBD;
+        }
+        QCalendarWidget QToolButton {
+            color: black;
+            background-color: white;
+            border: 1px solid #E0E0E0;
+            border-radius: 4px;
+            padding: 5px;
+        }
+        QCalendarWidget QToolButton:hover {
+            background-color: #E3F2FD;
+            border: 1px solid #1976D2;
+        }
+        QCalendarWidget QMenu {
+            background-color: white;
+            color: black;
+        }
+        QCalendarWidget QSpinBox {
+            background-color: white;
+            color: black;
+            selection-background-color: #E3F2FD;
+            selection-color: black;
+        }
+    """
+
+    MESSAGE_BOX = """
+        QMessageBox {
+            background-color: white;
+        }
+        QLabel {
+            color: black;
+            font-size: 13px;
+        }
+        QPushButton {
+            background-color: #1976D2;
+            color: white;
+            padding: 6px 12px;
+            border-radius: 4px;
+        }
+        QPushButton:hover {
+            background-color: #0D47A1;
+        }
+    """
+
+    CHARTS_PANEL = """
+        QWidget {
+            background-color: white;
+            border-radius: 15px;
+        }
+    """
+
+    # Statistics cards: gradient start and end colour per card
+    STAT_CARD_COLORS = {
+        'total': ("#1976D2", "#1565C0"),
+        'male': ("#2196F3", "#1976D2"),
+        'female': ("#E91E63", "#C2185B"),
+    }
+
+    STAT_CARD = """
+        QWidget {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                stop:0 {start}, stop:1 {end});
+            border-radius: 12px;
+        }}
+    """
@@ -0,0 +1,119 @@
+"""
+Application-wide stylesheet.
+Composes the styles in styles.Styles into one stylesheet that is set once on
+the QApplication. Widgets choose their look with an object name or a dynamic
+property (page, form, role, variant) instead of carrying a stylesheet of
+their own, so Qt parses the styles once instead of for every widget it builds.
+"""
+import re
+
+from styles import Styles
+
+
+# Windows by their "page" property
+PAGES = {
+    'register': Styles.PAGE_REGISTER,
+    'admin': Styles.PAGE_DASHBOARD,
+    'statistics': Styles.PAGE_DASHBOARD,
+}
+
+# Push buttons by their "variant" property
+BUTTON_VARIANTS = {
+    'primary': Styles.BUTTON_PRIMARY,
+    'danger': Styles.BUTTON_DANGER,
+    'warning': Styles.BUTTON_WARNING,
+    'success': Styles.BUTTON_SUCCESS,
+    'secondary': Styles.BUTTON_SECONDARY,
+    'menu': Styles.BUTTON_MAIN_WINDOW,
+}
+
+# Labels by their "role" property
+LABEL_ROLES = {
+    'pageTitle': Styles.PAGE_TITLE,
+    'dashboardTitle': Styles.DASHBOARD_TITLE,
+    'dialogTitle': Styles.DIALOG_TITLE,
+    'sectionHeader': Styles.SECTION_HEADER,
+    'searchLabel': Styles.SEARCH_LABEL,
+    'loginLabel': Styles.LOGIN_LABEL,
+    'chartTitle': Styles.CHART_TITLE,
+    'cardTitle': Styles.CARD_TITLE,
+    'cardValue': Styles.CARD_VALUE,
+    'saveStatus': Styles.SAVE_STATUS,
+}
+
+_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+
+
+def rule(selectors, declarations):
+    """Format one rule"""
+    return f"{selectors} {{ {' '.join(declarations.split())} }}\n"
+
+
+def scoped(style, scope, widget_type=None, cascade=False):
+    """Rewrite a stylesheet written for one widget so it can go in the application stylesheet.
+
+    scope is the selector suffix that identifies the widget, e.g. '#searchField'
+    or '[variant="primary"]'. Selectors starting with widget_type are taken
+    to mean the widget itself and get the scope attached; all other selectors
+    are matched inside the widget. cascade=True makes the widget_type
+    selectors match inside the widget as well, which is what a stylesheet
+    set on a container does.
+    """
+    rules = []
+    for selectors, declarations in _RULE.findall(style):
+        result = []
+        for selector in selectors.split(','):
+            selector = ' '.join(selector.split())
+            if widget_type and re.match(rf'{widget_type}(?![\w-])', selector):
+                result.append(widget_type + scope + selector[len(widget_type):])
+                if not cascade:
+                    continue
+            result.append(f"{scope} {selector}")
+        rules.append(rule(', '.join(result), declarations))
+    return ''.join(rules)
+
+
+def stylesheet():
+    """Build the application stylesheet.
+
+    Rules are ordered from the outside in (windows, containers, single
+    widgets) and their selectors are at least as specific as those of the
+    enclosing levels, so the innermost style wins as it did when each
+    widget carried its own stylesheet.
+    """
+    parts = [scoped(Styles.DIALOG_BASE, '[page="dialog"]', 'QDialog')]
+
+    # Windows: like a stylesheet set on the window, this reaches everything inside it
+    for page, declarations in PAGES.items():
+        parts.append(rule(f'[page="{page}"], [page="{page}"] *', declarations))
+
+    # Containers
+    parts.append(scoped(Styles.FORM_FIELD_STYLE, '[form="true"]'))
+    parts.append(scoped(Styles.SCROLL_AREA, '[role="formScroll"]', 'QScrollArea'))
+    parts.append(scoped(Styles.RADIO_GROUP, '[role="radioGroup"]', 'QWidget', cascade=True))
+    parts.append(scoped(Styles.CHARTS_PANEL, '#chartsPanel', 'QWidget', cascade=True))
+    for card, (start, end) in Styles.STAT_CARD_COLORS.items():
+        parts.append(scoped(Styles.STAT_CARD.format(start=start, end=end),
+                            f'[statCard="{card}"]', 'QWidget', cascade=True))
+    parts.append(scoped(Styles.TABLE_STYLE, '#recordsTable', 'QTableView'))
+    parts.append(scoped(Styles.TABLE_STYLE, '#metricsTable', 'QTableView'))
+
+    # Single widgets
+    for role, declarations in LABEL_ROLES.items():
+        parts.append(rule(f'QLabel[role="{role}"]', declarations))
+    for state, color in Styles.SAVE_STATUS_COLORS.items():
+        parts.append(rule(f'QLabel[role="saveStatus"][state="{state}"]', f"color: {color};"))
+    parts.append(scoped(Styles.DATE_FIELD + Styles.CALENDAR_POPUP, '#registerDob', 'QDateEdit'))
+    parts.append(scoped(Styles.DATE_DROP_DOWN + Styles.CALENDAR_POPUP, '#recordDob', 'QDateEdit'))
+    parts.append(scoped(Styles.SEARCH_FIELD, '#searchField', 'QLineEdit'))
+    parts.append(scoped(Styles.LOGIN_FIELD_STYLE, '[variant="login"]', 'QLineEdit'))
+    for variant, style in BUTTON_VARIANTS.items():
+        parts.append(scoped(style, f'[variant="{variant}"]', 'QPushButton'))
+    parts.append(scoped(Styles.MESSAGE_BOX, '#messageBox', 'QMessageBox'))
+
+    return ''.join(parts)
+
+
+def apply(app):
+    """Set the application stylesheet (once, before any window is built)"""
+    app.setStyleSheet(stylesheet())
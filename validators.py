@@ -0,0 +1,60 @@
+"""
+Validation rules for resident records.
+Shared by the registration form, the update dialog and the CSV importer.
+"""
+import re
+
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Streets of the barangay, as offered by the registration form
+STREETS = [
+    "Gold Street", "Bronze Street", "Silver Street", "Platinum Street", "Diamond Street",
+    "Pearl Street", "Ruby Street", "Emerald Street", "Sapphire Street", "Jade Street"
+]
+
+
+def contact_number_error(number, field_name="Contact Number"):
+    """Return why a Philippine mobile number is invalid, or None if it is valid or blank"""
+    if not number:
+        return None  # Optional field
+
+    if not number.isdigit():
+        return f"{field_name} should contain only numbers."
+
+    if len(number) != 11:
+        return f"{field_name} must be exactly 11 digits."
+
+    if not number.startswith('09'):
+        return f"{field_name} must start with '09'."
+
+    return None
+
+
+def email_error(email):
+    """Return why an email address is invalid, or None if it is valid or blank"""
+    if not email:
+        return None  # Optional field
+
+    if not EMAIL_PATTERN.match(email):
+        return "Please enter a valid email address.\nExample: user@example.com"
+    return None
+
+
+def voter_id_error(voter_id):
+    """Return why a voter's ID is invalid, or None if it is valid or blank"""
+    if not voter_id:
+        return None  # Optional field
+
+    # Remove hyphens for validation
+    voter_id_clean = voter_id.replace('-', '').replace(' ', '')
+
+    # Check if it contains only digits
+    if not voter_id_clean.isdigit():
+        return "Voter's ID should contain only numbers and hyphens.\nExample: 1234-5678-9012"
+
+    # Check length (typically 12 digits for Philippine voter ID)
+    if len(voter_id_clean) < 10 or len(voter_id_clean) > 20:
+        return "Voter's ID should be between 10-20 digits."
+
+    return None
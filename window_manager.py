@@ -0,0 +1,82 @@
+"""
+Lifecycle of the screens opened from the main window.
+Each screen module is imported the first time it is needed and its window is
+kept for reuse, so startup only pays for the landing page.
+"""
+import importlib
+
+from PyQt6.QtCore import QTimer
+
+from startup_trace import tracer
+
+
+class WindowManager:
+    """Builds screens on first use and reuses them afterwards.
+
+    A reused window has its reset() method called before it is shown again,
+    which costs far less than rebuilding its widgets. prewarm() builds the
+    public screens ahead of time, one per pass of the event loop, so the
+    first click doesn't pay for the import and construction either.
+    """
+
+    # Screen name: (module, class)
+    SCREENS = {
+        'register': ('register_window', 'RegisterWindow'),
+        'admin': ('admin_dashboard', 'AdminDashboard'),
+        'statistics': ('statistics_window', 'StatisticsWindow'),
+    }
+
+    # Screens prewarm() builds by default. The admin dashboard loads resident
+    # records as it is built, so it waits until someone has logged in.
+    PREWARM_SCREENS = ('register', 'statistics')
+
+    # Delay before pre-warming starts, so the landing page paints first
+    PREWARM_DELAY_MS = 300
+
+    def __init__(self, db_manager, main_window):
+        self.db_manager = db_manager
+        self.main_window = main_window
+        self._windows = {}
+        self._prewarm_queue = []
+
+    def window(self, name):
+        """Return the window for a screen, building it if needed"""
+        window = self._windows.get(name)
+        if window is None:
+            module_name, class_name = self.SCREENS[name]
+            with tracer.phase(f"import {module_name}"):
+                window_class = getattr(importlib.import_module(module_name), class_name)
+            with tracer.phase(f"build {class_name}"):
+                window = window_class(self.db_manager, self.main_window)
+            self._windows[name] = window
+        return window
+
+    def open(self, name):
+        """Show a screen in place of the main window"""
+        if name in self._prewarm_queue:
+            self._prewarm_queue.remove(name)
+
+        reused = name in self._windows
+        window = self.window(name)
+        if reused:
+            window.reset()
+
+        window.showMaximized()
+        window.raise_()
+        window.activateWindow()
+        self.main_window.hide()
+        return window
+
+    def prewarm(self, names=None, delay_ms=PREWARM_DELAY_MS):
+        """Build the given screens (default: PREWARM_SCREENS) in idle time after delay_ms"""
+        self._prewarm_queue = [name for name in (names or self.PREWARM_SCREENS) if name not in self._windows]
+        if self._prewarm_queue:
+            QTimer.singleShot(delay_ms, self._prewarm_next)
+
+    def _prewarm_next(self):
+        """Build the next queued screen and yield to the event loop before the one after"""
+        if not self._prewarm_queue:
+            return
+        self.window(self._prewarm_queue.pop(0))
+        if self._prewarm_queue:
+            QTimer.singleShot(0, self._prewarm_next)